@@ -0,0 +1,85 @@
+"""Compare time to first byte and first answer token of /api/chat and /api/chat/stream.
+
+OpenAI and the tools are replaced by stubs with fixed latencies, so only
+the endpoints' own behaviour is measured.
+
+Usage: uv run benchmarks/chat_stream.py [--tool-latency 1.0] [--token-delay 0.05] [--tokens 80]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'cli'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tool-latency', type=float, default=1.0, help='Seconds per tool call')
+    parser.add_argument('--token-delay', type=float, default=0.05, help='Seconds between streamed tokens')
+    parser.add_argument('--tokens', type=int, default=80, help='Tokens in the final answer')
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENAI_API_KEY', 'stub')
+    import requests
+    from flask import Flask
+    from werkzeug.serving import make_server
+    from api import routes
+    from main import iter_sse
+    from services.answer_cache import answer_cache
+
+    def execute_function(name, arguments):
+        time.sleep(args.tool_latency)
+        return {'success': True, 'data': {'summary': {}}}
+
+    def create(**kwargs):
+        tokens = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=f'word{n} '))])
+                  for n in range(args.tokens)]
+
+        def stream():
+            for token in tokens:
+                time.sleep(args.token_delay)
+                yield token
+        return stream()
+
+    chatbot = routes.chatbot_service
+    chatbot.tool_executor = SimpleNamespace(execute_function=execute_function)
+    chatbot.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    # Route locally so no tool-selection completion is needed
+    chatbot.intents = SimpleNamespace(match=lambda question, recent_users=None: [
+        ('get_jira_activity', {'identifier': 'john'}), ('get_github_activity', {'identifier': 'john'})
+    ])
+
+    app = Flask(__name__)
+    app.register_blueprint(routes.api_bp, url_prefix='/api')
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/api'
+
+    answer_cache.clear()
+    start = time.perf_counter()
+    requests.post(f'{base_url}/chat', json={'query': 'What is John working on?'})
+    blocking = time.perf_counter() - start
+    print(f"/api/chat         first byte {blocking * 1000:6.0f} ms  first token {blocking * 1000:6.0f} ms  "
+          f"complete {blocking * 1000:6.0f} ms")
+
+    answer_cache.clear()
+    start = time.perf_counter()
+    response = requests.post(f'{base_url}/chat/stream', json={'query': 'What is John working on?'}, stream=True)
+    first_byte = first_token = None
+    for event, _ in iter_sse(response):
+        first_byte = first_byte or time.perf_counter() - start
+        if event == 'token' and first_token is None:
+            first_token = time.perf_counter() - start
+    complete = time.perf_counter() - start
+    print(f"/api/chat/stream  first byte {first_byte * 1000:6.0f} ms  first token {first_token * 1000:6.0f} ms  "
+          f"complete {complete * 1000:6.0f} ms")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
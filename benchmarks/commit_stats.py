@@ -0,0 +1,125 @@
+"""Measure commit diff-stat enrichment against a local stub: the deadline bounds a cold lookup, a warm one fetches nothing.
+
+Each commit detail request takes --detail-latency seconds. The stub
+records how many detail requests were in flight at once, which stays at
+COMMIT_STATS_CONCURRENCY. The first --unavailable commits answer 422, as
+for a SHA GitHub cannot resolve, and are not requested again when warm.
+
+Usage: uv run benchmarks/commit_stats.py [--commits 20] [--unavailable 2] [--detail-latency 0.3] [--deadline 1.0] [--concurrency 4]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+NOW = datetime.now(timezone.utc)
+
+
+def _ts(hours_ago: float) -> str:
+    return (NOW - timedelta(hours=hours_ago)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class StubGitHub(BaseHTTPRequestHandler):
+    commits = 20
+    unavailable = 2
+    detail_latency = 0.3
+    detail_requests = 0
+    in_flight = 0
+    peak_in_flight = 0
+    lock = threading.Lock()
+
+    def _reply(self, body, status=200):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        if parts[0] == 'repos':
+            sha = parts[-1]
+            detail = self._commit_detail(sha)
+            if int(sha[:7], 16) < self.unavailable:
+                self._reply({'message': 'No commit found for SHA: ' + sha}, 422)
+            else:
+                self._reply(detail)
+        elif parts[0] == 'search':
+            self._reply({'total_count': 0, 'items': []})
+        elif len(parts) == 2:
+            self._reply({'login': parts[1], 'name': parts[1].title(), 'public_repos': 1})
+        elif parts[2] == 'repos':
+            self._reply([])
+        else:
+            self._reply([{'type': 'PushEvent', 'repo': {'name': 'acme/app'}, 'created_at': _ts(n),
+                          'payload': {'commits': [{'sha': f'{n:07x}' + '0' * 33, 'message': f'Commit {n}'}]}}
+                         for n in range(self.commits)])
+
+    def _commit_detail(self, sha):
+        with StubGitHub.lock:
+            StubGitHub.detail_requests += 1
+            StubGitHub.in_flight += 1
+            StubGitHub.peak_in_flight = max(StubGitHub.peak_in_flight, StubGitHub.in_flight)
+        time.sleep(self.detail_latency)
+        with StubGitHub.lock:
+            StubGitHub.in_flight -= 1
+        n = int(sha[:7], 16)
+        return {'sha': sha, 'stats': {'additions': 10 * n, 'deletions': n, 'total': 11 * n},
+                'files': [{'filename': f'file{i}.py'} for i in range(n % 5 + 1)]}
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--commits', type=int, default=20, help='Commits in the user\'s push events')
+    parser.add_argument('--unavailable', type=int, default=2, help='Commits whose detail request answers 422')
+    parser.add_argument('--detail-latency', type=float, default=0.3, help='Seconds per commit detail request')
+    parser.add_argument('--deadline', type=float, default=1.0, help='COMMIT_STATS_DEADLINE')
+    parser.add_argument('--concurrency', type=int, default=4, help='COMMIT_STATS_CONCURRENCY')
+    args = parser.parse_args()
+
+    StubGitHub.commits = args.commits
+    StubGitHub.unavailable = args.unavailable
+    StubGitHub.detail_latency = args.detail_latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ['GITHUB_API_URL'] = f'http://127.0.0.1:{server.server_port}'
+    os.environ['IDENTITY_CACHE_FILE'] = os.path.join(tempfile.mkdtemp(), 'identity_cache.db')
+    os.environ['COMMIT_STATS_ENABLED'] = 'true'
+    os.environ['COMMIT_STATS_DEADLINE'] = str(args.deadline)
+    os.environ['COMMIT_STATS_CONCURRENCY'] = str(args.concurrency)
+
+    from services.github_service import GitHubService
+
+    service = GitHubService()
+    for label in ('cold', 'warm'):
+        StubGitHub.detail_requests = 0
+        start = time.perf_counter()
+        # Past the activity cache, so every run assembles the activity again
+        result = service._load_user_activity('user0')
+        elapsed = time.perf_counter() - start
+        summary = result['data']['summary']
+        print(f"{label:<6} {elapsed * 1000:5.0f} ms  {StubGitHub.detail_requests:>2} detail requests  "
+              f"stats for {summary.get('recent_commits_with_stats_7d', 0)}/{summary['recent_commits_7d']} commits  "
+              f"+{summary.get('recent_additions_7d', 0)} -{summary.get('recent_deletions_7d', 0)}")
+        if label == 'cold':
+            # Let the fetches that missed the deadline finish into the store
+            time.sleep(args.commits / args.concurrency * args.detail_latency)
+
+    print(f"peak concurrent detail requests {StubGitHub.peak_in_flight} (cap {args.concurrency})")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare many concurrent chats on the sync (thread per chat) and async (one event loop) chatbots.
+
+OpenAI and the tools are replaced by stubs with fixed latencies, so only
+the services' own concurrency is measured.
+
+Usage: uv run benchmarks/concurrent_chats.py [--chats 200] [--tool-latency 0.5] [--completion-latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+def _chunks(text):
+    return [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))]) for word in text.split()]
+
+
+def _route(question, recent_users=None):
+    return [('get_jira_activity', {'identifier': question}), ('get_github_activity', {'identifier': question})]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--chats', type=int, default=200, help='Concurrent chats')
+    parser.add_argument('--tool-latency', type=float, default=0.5, help='Seconds per tool call')
+    parser.add_argument('--completion-latency', type=float, default=0.5, help='Seconds per OpenAI completion')
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENAI_API_KEY', 'stub')
+    from services.answer_cache import answer_cache
+    from services.async_chatbot_service import AsyncChatbotService
+    from services.chatbot_service import ChatbotService
+
+    questions = [f'user{n}' for n in range(args.chats)]
+
+    def execute_function(name, arguments):
+        time.sleep(args.tool_latency)
+        return {'success': True, 'data': {'summary': {}}}
+
+    def create(**kwargs):
+        time.sleep(args.completion_latency)
+        return iter(_chunks('stub answer'))
+
+    sync_bot = ChatbotService()
+    sync_bot.tool_executor = SimpleNamespace(execute_function=execute_function)
+    sync_bot.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    sync_bot.intents = SimpleNamespace(match=_route)
+
+    async def async_execute_function(name, arguments):
+        await asyncio.sleep(args.tool_latency)
+        return {'success': True, 'data': {'summary': {}}}
+
+    async def async_create(**kwargs):
+        await asyncio.sleep(args.completion_latency)
+
+        async def stream():
+            for chunk in _chunks('stub answer'):
+                yield chunk
+        return stream()
+
+    async_bot = AsyncChatbotService()
+    async_bot.tool_executor = SimpleNamespace(execute_function=async_execute_function)
+    async_bot.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=async_create)))
+    async_bot.intents = SimpleNamespace(match=_route)
+
+    # Async first, before the sync run leaves tool pool threads behind
+    async def run_async():
+        return await asyncio.gather(*(async_bot.chat(question) for question in questions))
+
+    answer_cache.clear()
+    start = time.perf_counter()
+    results = asyncio.run(run_async())
+    assert all(result['success'] for result in results)
+    print(f"async  {args.chats} chats  {time.perf_counter() - start:6.2f} s  threads {threading.active_count()}")
+
+    # Like Flask's threaded server: one thread per in-flight chat
+    answer_cache.clear()
+    peak_threads = threading.active_count()
+    threads = [threading.Thread(target=sync_bot.chat, args=(question,)) for question in questions]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        peak_threads = max(peak_threads, threading.active_count())
+    for thread in threads:
+        thread.join()
+    print(f"sync   {args.chats} chats  {time.perf_counter() - start:6.2f} s  peak threads {peak_threads}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Count connections opened by concurrent requests on a default session vs the shared upstream pool.
+
+A keep-alive stub server counts the TCP connections it accepts. A
+default requests.Session keeps 10 connections per host, so more
+concurrent threads than that discard connections ("Connection pool is
+full") and open new ones, each a fresh TLS handshake against a real API.
+
+Usage: uv run benchmarks/connection_reuse.py [--threads 24] [--rounds 20] [--latency 0.05]
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.05
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubAPI.lock:
+            StubAPI.connections += 1
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        payload = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _CountWarnings(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def _run(session, url, threads, rounds):
+    # Every round is a burst of concurrent requests, like a team lookup or a chat's tool fan-out
+    burst = threading.Barrier(threads)
+
+    def worker():
+        for _ in range(rounds):
+            burst.wait()
+            session.get(url, timeout=10).raise_for_status()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=24, help='Concurrent threads, e.g. tool and JIRA workers')
+    parser.add_argument('--rounds', type=int, default=20, help='Bursts of one request per thread')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub latency per request in seconds')
+    args = parser.parse_args()
+
+    import requests
+    from services.upstream_clients import get_session
+
+    StubAPI.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/rest/api/3/myself'
+
+    warnings = _CountWarnings()
+    logging.getLogger('urllib3.connectionpool').addHandler(warnings)
+
+    for name, session in (('default session', requests.Session()), ('shared pool', get_session('benchmark'))):
+        StubAPI.connections = 0
+        warnings.count = 0
+        elapsed = _run(session, url, args.threads, args.rounds)
+        print(f"{name:<16} {args.threads * args.rounds} requests  {StubAPI.connections:4d} connections  "
+              f"{warnings.count:4d} pool-full warnings  {elapsed * 1000:6.0f} ms")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
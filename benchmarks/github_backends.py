@@ -0,0 +1,140 @@
+"""Compare GitHub request count and latency of the REST and GraphQL backends against a local stub.
+
+Usage: uv run benchmarks/github_backends.py [--latency 0.15] [--users 10]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+NOW = datetime.now(timezone.utc)
+
+
+def _ts(days_ago: float) -> str:
+    return (NOW - timedelta(days=days_ago)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def rest_payload(path: str):
+    parts = path.strip('/').split('/')
+    if path.startswith('/search/issues'):
+        return {'items': [
+            {'number': n, 'title': f'PR {n}', 'state': 'open', 'created_at': _ts(n), 'updated_at': _ts(n),
+             'html_url': f'https://github.com/acme/app/pull/{n}', 'repository_url': 'https://api.github.com/repos/acme/app'}
+            for n in range(1, 6)
+        ]}
+    login = parts[1]
+    if len(parts) == 2:
+        return {'login': login, 'name': login.title(), 'company': 'ACME', 'public_repos': 3}
+    if parts[2] == 'repos':
+        return [{'name': f'repo{n}', 'full_name': f'{login}/repo{n}', 'description': 'Stub', 'language': 'Python',
+                 'updated_at': _ts(n), 'private': False} for n in range(3)]
+    return [{'type': 'PushEvent', 'repo': {'name': 'acme/app'}, 'created_at': _ts(n),
+             'payload': {'commits': [{'sha': f'{n:040d}', 'message': f'Commit {n}'}]}} for n in range(10)]
+
+
+def graphql_payload(body: dict):
+    data = {}
+    for name, login in body['variables'].items():
+        if not name.startswith('login'):
+            continue
+        data[f'u{name[5:]}'] = {
+            'login': login, 'name': login.title(), 'company': 'ACME',
+            'publicRepositories': {'totalCount': 3},
+            'repositories': {'nodes': [
+                {'name': f'repo{n}', 'nameWithOwner': f'{login}/repo{n}', 'description': 'Stub',
+                 'primaryLanguage': {'name': 'Python'}, 'updatedAt': _ts(n), 'isPrivate': False} for n in range(3)
+            ]},
+            'contributionsCollection': {'commitContributionsByRepository': [{'repository': {
+                'nameWithOwner': 'acme/app',
+                'defaultBranchRef': {'target': {'history': {'nodes': [
+                    {'oid': f'{n:040d}', 'message': f'Commit {n}', 'committedDate': _ts(n),
+                     'author': {'user': {'login': login}}} for n in range(10)
+                ]}}}
+            }}]},
+            'pullRequests': {'nodes': [
+                {'number': n, 'title': f'PR {n}', 'state': 'OPEN', 'createdAt': _ts(n), 'updatedAt': _ts(n),
+                 'url': f'https://github.com/acme/app/pull/{n}', 'repository': {'name': 'app'}} for n in range(1, 6)
+            ]}
+        }
+    return {'data': data}
+
+
+class StubGitHub(BaseHTTPRequestHandler):
+    latency = 0.15
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def _reply(self, body):
+        with StubGitHub.lock:
+            StubGitHub.requests_seen += 1
+        time.sleep(self.latency)
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._reply(rest_payload(urlparse(self.path).path))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self._reply(graphql_payload(body))
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.15, help='Stub latency per request in seconds')
+    parser.add_argument('--users', type=int, default=10, help='Users in the team lookup')
+    args = parser.parse_args()
+
+    StubGitHub.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ['GITHUB_API_URL'] = f'http://127.0.0.1:{server.server_port}'
+    os.environ['IDENTITY_CACHE_FILE'] = os.path.join(tempfile.mkdtemp(), 'identity_cache.db')
+
+    from services.activity_cache import activity_cache
+    from services.github_graphql import GitHubGraphQLService
+    from services.github_service import GitHubService, response_cache
+    from services.identity_store import identity_store
+
+    logins = [f'user{n}' for n in range(args.users)]
+    backends = [('rest', GitHubService()), ('graphql', GitHubGraphQLService())]
+
+    # Both backends must produce the same activity shape
+    rest_result = backends[0][1].get_user_activity('user0')['data']
+    activity_cache.clear()
+    graphql_result = backends[1][1].get_user_activity('user0')['data']
+    assert rest_result.keys() == graphql_result.keys()
+    assert rest_result['summary'] == graphql_result['summary'], (rest_result['summary'], graphql_result['summary'])
+
+    for scenario, run in [('single user', lambda service: service.get_user_activity('user0')),
+                          (f'team of {args.users}', lambda service: service.get_users_activity(logins))]:
+        for label, service in backends:
+            response_cache.clear()
+            activity_cache.clear()
+            identity_store._conn.execute('DELETE FROM identities')
+            StubGitHub.requests_seen = 0
+            start = time.perf_counter()
+            run(service)
+            elapsed = time.perf_counter() - start
+            print(f"{scenario:<12} {label:<8} {StubGitHub.requests_seen:>3} requests  {elapsed * 1000:.0f} ms")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
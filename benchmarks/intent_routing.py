@@ -0,0 +1,141 @@
+"""Measure coverage, accuracy and routing latency of the local intent matcher on labelled questions.
+
+Usage: uv run benchmarks/intent_routing.py [--live]
+
+With --live (and OPENAI_API_KEY set) the same questions are also routed by
+the model's tool-selection completion, for its accuracy and latency.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+USERS = {
+    'john': {'name': 'John Doe', 'email': 'john@company.com', 'github': 'johndoe'},
+    'sarah': {'name': 'Sarah Smith', 'email': 'sarah@company.com', 'github': 'sarahsmith'},
+    'mike': {'name': 'Mike Johnson', 'email': 'mike@company.com', 'github': 'mikejohnson'},
+    # Names made of everyday words, which questions use without meaning anyone
+    'will': {'name': 'Will Page', 'email': 'will@company.com', 'github': 'wpage'},
+    'min': {'name': 'Min An', 'email': 'min@company.com', 'github': 'minan'},
+}
+
+JIRA = ('get_jira_activity',)
+GITHUB = ('get_github_activity',)
+BOTH = JIRA + GITHUB
+
+# Question, expected tools, expected users
+QUESTIONS = [
+    ("What is John working on?", BOTH, ['john']),
+    ("what's sarah working on", BOTH, ['sarah']),
+    ("Show me Mike's recent activity", BOTH, ['mike']),
+    ("What has Sarah Smith been up to lately?", BOTH, ['sarah']),
+    ("How busy is johndoe this week?", BOTH, ['john']),
+    ("What JIRA tickets does John have?", JIRA, ['john']),
+    ("sarah's jira tickets", JIRA, ['sarah']),
+    ("Which issues are assigned to Mike?", JIRA, ['mike']),
+    ("Is mike@company.com blocked on any bugs?", JIRA, ['mike']),
+    ("John's PRs", GITHUB, ['john']),
+    ("What repos has Sarah worked on?", GITHUB, ['sarah']),
+    ("Show me the pull requests Mike opened", GITHUB, ['mike']),
+    ("What did sarahsmith commit yesterday?", GITHUB, ['sarah']),
+    ("Compare John and Sarah's activity", BOTH, ['john', 'sarah']),
+    # Left to the model: no activity intent, or nobody named
+    ("Hello!", None, None),
+    ("Who is on the team?", None, None),
+    ("What is John's email address?", None, None),
+    ("What tickets are open in the sprint?", None, None),
+    ("What will the sprint tickets look like?", None, None),
+    ("Who is working on the login page?", None, None),
+    ("What is an open bug?", None, None),
+    # Named in full, the same people route locally
+    ("What is Will Page working on?", BOTH, ['will']),
+    ("Show me Min An's tickets", JIRA, ['min']),
+]
+
+
+def _route_with_model(client, question):
+    from services.ai_tools import TOOLS
+    response = client.chat.completions.create(
+        model='gpt-3.5-turbo',
+        messages=[
+            {'role': 'system', 'content': 'Answer questions about team member activity using JIRA and GitHub tools.'},
+            {'role': 'user', 'content': question},
+        ],
+        tools=TOOLS,
+        tool_choice='auto',
+        max_tokens=200
+    )
+    tool_calls = response.choices[0].message.tool_calls or []
+    return [(call.function.name, json.loads(call.function.arguments)) for call in tool_calls]
+
+
+def _correct(calls, tools, users, mapping):
+    if tools is None:
+        return not calls
+    if not calls:
+        return False
+    expected = {(tool, user) for tool in tools for user in users}
+    return {(name, mapping.find_key(arguments['identifier']) or '') for name, arguments in calls} == expected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--live', action='store_true', help='Also route every question with the model')
+    args = parser.parse_args()
+
+    mapping_file = os.path.join(tempfile.mkdtemp(), 'users.json')
+    with open(mapping_file, 'w') as f:
+        json.dump(USERS, f)
+    os.environ['USER_MAPPING_FILE'] = mapping_file
+
+    from services.intent_router import IntentMatcher
+    from services.user_mapping import UserMapping
+
+    mapping = UserMapping(reload_interval=0)
+    matcher = IntentMatcher(mapping)
+    index = mapping._index
+    client = None
+    if args.live:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    routed = correct = wrong = 0
+    local_time = model_time = 0.0
+    model_correct = 0
+    for question, tools, users in QUESTIONS:
+        start = time.perf_counter()
+        calls = matcher.match(question)
+        local_time += time.perf_counter() - start
+
+        if calls is None:
+            outcome = 'model'
+        else:
+            routed += 1
+            ok = _correct(calls, tools, users, index)
+            correct += ok
+            wrong += not ok
+            outcome = 'local ok' if ok else 'local WRONG'
+        line = f"{question:<48} {outcome:<12}"
+
+        if client:
+            start = time.perf_counter()
+            model_calls = _route_with_model(client, question)
+            model_time += time.perf_counter() - start
+            model_ok = _correct(model_calls, tools, users, index)
+            model_correct += model_ok
+            line += f" model {'ok' if model_ok else 'WRONG'}"
+        print(line)
+
+    print(f"\nlocal route: {routed}/{len(QUESTIONS)} questions, {correct} correct, {wrong} wrong, "
+          f"{local_time / len(QUESTIONS) * 1e6:.0f} us/question")
+    if client:
+        print(f"model route: {model_correct}/{len(QUESTIONS)} correct, "
+              f"{model_time / len(QUESTIONS) * 1000:.0f} ms per tool-selection completion")
+
+
+if __name__ == '__main__':
+    main()
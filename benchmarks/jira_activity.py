@@ -0,0 +1,144 @@
+"""Compare JIRA round trips and latency per user lookup against a local stub.
+
+Usage: uv run benchmarks/jira_activity.py [--latency 0.15] [--runs 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+def _issue(n: int, status: str, days_ago: int) -> dict:
+    updated = (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+    return {
+        'key': f'PROJ-{n}',
+        'fields': {
+            'summary': f'Issue {n}',
+            'status': {'name': status},
+            'priority': {'name': 'Medium'},
+            'updated': updated,
+            'created': updated
+        }
+    }
+
+
+# Few enough that neither list fills up, so no count queries are needed
+ISSUES = [_issue(n, 'Done' if n % 4 == 0 else 'In Progress', n) for n in range(1, 20)]
+
+
+def _matching(jql: str) -> list:
+    """The stub issues a search's JQL selects: open ones, ones updated in the last week, or either"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+    is_open = 'status != Done' in jql
+    is_recent = 'updated >=' in jql
+    return [issue for issue in ISSUES
+            if (is_open and issue['fields']['status']['name'] != 'Done')
+            or (is_recent and datetime.strptime(issue['fields']['updated'], '%Y-%m-%dT%H:%M:%S.%f%z') >= cutoff)]
+
+
+class StubJira(BaseHTTPRequestHandler):
+    latency = 0.15
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        self._seen()
+        if self.path.startswith('/rest/api/3/user/search'):
+            self._reply([{'accountId': 'abc123', 'displayName': 'Stub User',
+                          'emailAddress': 'stub@company.com', 'active': True}])
+        else:
+            jql = parse_qs(urlparse(self.path).query).get('jql', [''])[0]
+            self._reply({'issues': _matching(jql)})
+
+    def do_POST(self):
+        self._seen()
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.startswith('/rest/api/3/search/approximate-count'):
+            self._reply({'count': len(ISSUES)})
+        else:
+            self.send_error(404)
+
+    def _seen(self):
+        with StubJira.lock:
+            StubJira.requests_seen += 1
+        time.sleep(self.latency)
+
+    def _reply(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.15, help='Stub latency per request in seconds')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    StubJira.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubJira)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ['JIRA_BASE_URL'] = f'http://127.0.0.1:{server.server_port}'
+    os.environ.setdefault('JIRA_EMAIL', 'stub@company.com')
+    os.environ.setdefault('JIRA_API_TOKEN', 'stub')
+    # Never read from or written to the app's own identity cache
+    identity_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    identity_file.close()
+    os.environ['IDENTITY_CACHE_FILE'] = identity_file.name
+
+    from services import jira_service
+    from services.activity_cache import activity_cache
+    from services.identity_store import identity_store
+    service = jira_service.JiraService()
+
+    def forget():
+        # Every lookup starts cold, so each mode's round trips are counted in full
+        jira_service.response_cache.clear()
+        jira_service.done_issue_index.clear()
+        activity_cache.clear()
+        identity_store.clear()
+
+    def sequential(username):
+        # Baseline: user search followed by the two searches one after another
+        user = service._find_user(username)['data']
+        service._get_assigned_issues(user['account_id'])
+        service._get_recent_activity(user['account_id'])
+
+    def mode(name):
+        def run(username):
+            jira_service.JIRA_ACTIVITY_QUERY = name
+            # Past the activity cache, so every run fetches
+            service._load_user_activity(username)
+        return run
+
+    for label, fn in [('sequential', sequential), ('parallel', mode('parallel')), ('union', mode('union'))]:
+        StubJira.requests_seen = 0
+        elapsed = 0.0
+        for _ in range(args.runs):
+            forget()
+            start = time.perf_counter()
+            fn('stub@company.com')
+            elapsed += time.perf_counter() - start
+        elapsed /= args.runs
+        print(f"{label:<12} {StubJira.requests_seen / args.runs:.1f} requests/user  {elapsed * 1000:.0f} ms/user")
+
+    server.shutdown()
+    os.remove(identity_file.name)
+
+
+if __name__ == '__main__':
+    main()
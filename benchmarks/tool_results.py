@@ -0,0 +1,138 @@
+"""Compare prompt tokens of full and compacted tool results over a recorded set of questions.
+
+Usage: uv run benchmarks/tool_results.py [--budget 600] [--live]
+
+With --live (and OPENAI_API_KEY set) the follow-up completion is also run
+with both encodings to compare prompt tokens reported by the API and latency.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+# Recorded questions with the tools the model called for them
+QUERIES = [
+    ("What is John working on?", ['get_jira_activity', 'get_github_activity']),
+    ("Show me Sarah's recent activity", ['get_jira_activity', 'get_github_activity']),
+    ("What JIRA tickets does John have?", ['get_jira_activity']),
+    ("Which issues are high priority for Sarah?", ['get_jira_activity']),
+    ("What repos has John worked on?", ['get_github_activity']),
+    ("Has Sarah opened any pull requests this month?", ['get_github_activity']),
+    ("What did John commit this week?", ['get_github_activity']),
+]
+
+
+def _ago(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+
+
+def _jira_activity():
+    from services.jira_service import JiraService
+    service = JiraService.__new__(JiraService)
+    records = [{
+        'key': f'PROJ-{n}',
+        'summary': f'Implement the {n}th part of the billing reconciliation pipeline',
+        'status': ['In Progress', 'To Do', 'In Review', 'Done'][n % 4],
+        'priority': ['High', 'Medium', 'Low'][n % 3],
+        'updated': _ago(n / 2),
+        'created': _ago(n + 20)
+    } for n in range(1, 40)]
+    current, recent = service._split_records(records)
+    return service._build_activity('john@company.com', {
+        'account_id': '5b10ac8d82e05b22cc7d4ef5', 'display_name': 'John Doe'
+    }, current, recent, service._record_totals(records))
+
+
+def _github_activity():
+    from services.github_service import GitHubService
+    service = GitHubService.__new__(GitHubService)
+    repos = [{
+        'name': f'service-{n}',
+        'full_name': f'acme-corp/service-{n}',
+        'description': f'Backend service number {n} handling customer billing events',
+        'language': 'Python',
+        'updated_at': _ago(n).replace('.000+0000', 'Z'),
+        'private': False
+    } for n in range(20)]
+    commits = [{
+        'sha': f'{n:07x}',
+        'message': f'Fix retry handling in the event consumer ({n})',
+        'repository': f'acme-corp/service-{n // 5}',
+        'date': _ago(n / 3).replace('.000+0000', 'Z')
+    } for n in range(20)]
+    prs = [{
+        'number': 100 + n,
+        'title': f'Add idempotency keys to billing events part {n}',
+        'state': 'open' if n % 3 else 'closed',
+        'repository': f'service-{n}',
+        'created_at': _ago(n + 2).replace('.000+0000', 'Z'),
+        'updated_at': _ago(n).replace('.000+0000', 'Z'),
+        'url': f'https://github.com/acme-corp/service-{n}/pull/{100 + n}'
+    } for n in range(12)]
+    return service._build_activity('johndoe', {
+        'name': 'John Doe', 'company': 'ACME', 'public_repos': 42
+    }, repos, commits, prs)
+
+
+def _messages(question, tools, contents):
+    calls = [{
+        'id': f'call_{i}',
+        'type': 'function',
+        'function': {'name': name, 'arguments': json.dumps({'identifier': 'john'})}
+    } for i, name in enumerate(tools)]
+    messages = [
+        {'role': 'system', 'content': 'You answer questions about team member activity from JIRA and GitHub data.'},
+        {'role': 'user', 'content': question},
+        {'role': 'assistant', 'content': None, 'tool_calls': calls},
+    ]
+    messages.extend({'role': 'tool', 'tool_call_id': call['id'], 'content': content}
+                    for call, content in zip(calls, contents))
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=int, default=600, help='Token budget per tool result')
+    parser.add_argument('--live', action='store_true', help='Also time the follow-up completion against OpenAI')
+    args = parser.parse_args()
+
+    from services.result_compactor import compact_tool_result, count_tokens
+
+    results = {'get_jira_activity': _jira_activity(), 'get_github_activity': _github_activity()}
+    client = None
+    if args.live:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    total_raw = total_compact = 0
+    for question, tools in QUERIES:
+        raw = [json.dumps(results[name]) for name in tools]
+        compact = [compact_tool_result(name, results[name], question, args.budget) for name in tools]
+        raw_tokens = sum(count_tokens(content) for content in raw)
+        compact_tokens = sum(count_tokens(content) for content in compact)
+        total_raw += raw_tokens
+        total_compact += compact_tokens
+        line = f"{question:<50} {raw_tokens:>5} -> {compact_tokens:>4} tokens"
+
+        if client:
+            timings = []
+            for contents in (raw, compact):
+                start = time.perf_counter()
+                response = client.chat.completions.create(
+                    model='gpt-3.5-turbo', messages=_messages(question, tools, contents), max_tokens=300
+                )
+                timings.append((response.usage.prompt_tokens, time.perf_counter() - start))
+            line += (f"  prompt {timings[0][0]} -> {timings[1][0]}"
+                     f"  {timings[0][1] * 1000:.0f} -> {timings[1][1] * 1000:.0f} ms")
+        print(line)
+
+    print(f"{'total':<50} {total_raw:>5} -> {total_compact:>4} tokens "
+          f"({100 * (1 - total_compact / total_raw):.0f}% fewer)")
+
+
+if __name__ == '__main__':
+    main()
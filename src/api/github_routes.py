@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from services.github_service import GitHubService
+from services.ai_tools import github_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,9 +7,6 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 github_bp = Blueprint('github', __name__)
 
-# Initialize GitHub service
-github_service = GitHubService()
-
 @github_bp.route('/test-connection')
 def test_github_connection():
     """Test GitHub API connection"""
@@ -28,6 +25,18 @@ def test_github_connection():
             'error': result['error']
         }), 400
 
+@github_bp.route('/rate-limit')
+def get_rate_limit():
+    """Get remaining GitHub rate limit budget per resource"""
+    result = github_service.get_rate_limit()
+    
+    if result['success']:
+        return jsonify(result['data'])
+    else:
+        return jsonify({
+            'error': result['error']
+        }), 400
+
 @github_bp.route('/user/<username>/activity')
 def get_user_activity(username):
     """Get comprehensive GitHub activity for a user"""
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from services.jira_service import JiraService
+from services.ai_tools import jira_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,9 +7,6 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 jira_bp = Blueprint('jira', __name__)
 
-# Initialize JIRA service
-jira_service = JiraService()
-
 @jira_bp.route('/test-connection')
 def test_jira_connection():
     """Test JIRA API connection"""
@@ -1,10 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime
 import sys
 import os
+import json
 import logging
 
 from services.chatbot_service import ChatbotService
+from services import jira_service, github_service
+from services.activity_cache import activity_cache
+from services.answer_cache import answer_cache
+from services.chat_sessions import chat_sessions
+from services.immutable_store import immutable_store
+from services.metrics import metrics
+from services.upstream_clients import pool_stats
 
 # Create Blueprint
 api_bp = Blueprint('api', __name__)
@@ -33,14 +41,17 @@ def chat():
         query = data['query']
         logger.info(f"Received query: {query}")
         
-        # Process with chatbot service
-        result = chatbot_service.chat(query)
+        # Process with chatbot service, continuing the conversation when a session is given
+        result = chatbot_service.chat(query, data.get('session_id'))
         
         if result['success']:
             response = {
                 'query': query,
                 'response': result['response'],
                 'tools_used': result.get('tools_used', []),
+                'cached': result.get('cached', False),
+                'session_id': result.get('session_id'),
+                'data_freshness': result.get('data_freshness'),
                 'timestamp': datetime.now().isoformat(),
                 'status': 'success'
             }
@@ -60,6 +71,52 @@ def chat():
             'message': str(e)
         }), 500
 
+@api_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Chat endpoint streaming tool progress and answer tokens as Server-Sent Events"""
+    data = request.get_json(silent=True)
+    if not data or 'query' not in data:
+        return jsonify({'error': 'Query is required'}), 400
+    
+    query = data['query']
+    logger.info(f"Received streaming query: {query}")
+    
+    def generate():
+        # Sent before any work starts so the client sees the first byte immediately
+        yield f"event: start\ndata: {json.dumps({'query': query})}\n\n"
+        for event in chatbot_service.chat_events(query, data.get('session_id')):
+            name = event.pop('event')
+            yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@api_bp.route('/chat/sessions/<session_id>', methods=['DELETE'])
+def delete_chat_session(session_id):
+    """End a chat session and drop its history"""
+    if not chat_sessions.delete(session_id):
+        return jsonify({'error': 'Session not found'}), 404
+    return jsonify({'status': 'deleted', 'session_id': session_id})
+
+@api_bp.route('/cache/stats')
+def cache_stats():
+    """Upstream response, assembled activity, immutable record and chat answer cache counters"""
+    return jsonify({
+        'jira': jira_service.response_cache.stats(),
+        'github': github_service.response_cache.stats(),
+        'activity': activity_cache.stats(),
+        'immutable': immutable_store.stats(),
+        'answers': answer_cache.stats(),
+        'sessions': chat_sessions.stats()
+    })
+
+@api_bp.route('/metrics')
+def get_metrics():
+    """Retry, circuit breaker and other service metrics, and upstream connection pool usage"""
+    return jsonify(dict(metrics.snapshot(), connections=pool_stats()))
+
 @api_bp.route('/status')
 def api_status():
     """API status endpoint"""
@@ -69,6 +126,10 @@ def api_status():
         'endpoints': [
             {'path': '/test', 'method': 'GET'},
             {'path': '/chat', 'method': 'POST'},
-            {'path': '/status', 'method': 'GET'}
+            {'path': '/chat/stream', 'method': 'POST'},
+            {'path': '/chat/sessions/<session_id>', 'method': 'DELETE'},
+            {'path': '/status', 'method': 'GET'},
+            {'path': '/cache/stats', 'method': 'GET'},
+            {'path': '/metrics', 'method': 'GET'}
         ]
     })
\ No newline at end of file
@@ -0,0 +1,23 @@
+from flask import Blueprint, Response, stream_with_context
+import json
+import logging
+
+from services.ai_tools import jira_service, github_service, user_mapping
+from services.team_service import TeamActivityService
+
+logger = logging.getLogger(__name__)
+
+# Create Blueprint
+team_bp = Blueprint('team', __name__)
+
+# Initialize team service
+team_service = TeamActivityService(jira_service, github_service, user_mapping)
+
+@team_bp.route('/activity')
+def get_team_activity():
+    """Stream JIRA and GitHub activity for every mapped user as newline-delimited JSON"""
+    def generate():
+        for record in team_service.iter_activity():
+            yield json.dumps(record) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
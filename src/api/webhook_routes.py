@@ -0,0 +1,47 @@
+from flask import Blueprint, request, jsonify
+import os
+import logging
+
+from services.ai_tools import jira_service, user_mapping, activity_sync
+from services.webhook_ingest import WebhookIngestor, verify_signature, GITHUB_EVENTS, JIRA_EVENTS
+
+logger = logging.getLogger(__name__)
+
+# Create Blueprint
+webhook_bp = Blueprint('webhooks', __name__)
+
+# Events are applied by a worker thread, started with the app, so request threads return immediately
+ingestor = WebhookIngestor(jira_service, user_mapping, activity_sync)
+
+@webhook_bp.route('/github', methods=['POST'])
+def github_webhook():
+    """Receive GitHub push and pull_request events"""
+    secret = os.getenv('GITHUB_WEBHOOK_SECRET')
+    if not verify_signature(secret, request.get_data(), request.headers.get('X-Hub-Signature-256')):
+        return jsonify({'error': 'Invalid signature'}), 401
+    
+    event = request.headers.get('X-GitHub-Event', '')
+    if event not in GITHUB_EVENTS:
+        return jsonify({'status': 'ignored', 'event': event}), 202
+    
+    if not ingestor.submit('github', event, request.get_json(silent=True) or {}):
+        return jsonify({'error': 'Webhook queue is full'}), 503
+    
+    return jsonify({'status': 'accepted', 'event': event}), 202
+
+@webhook_bp.route('/jira', methods=['POST'])
+def jira_webhook():
+    """Receive JIRA issue created and updated events"""
+    secret = os.getenv('JIRA_WEBHOOK_SECRET')
+    if not verify_signature(secret, request.get_data(), request.headers.get('X-Hub-Signature')):
+        return jsonify({'error': 'Invalid signature'}), 401
+    
+    payload = request.get_json(silent=True) or {}
+    event = payload.get('webhookEvent', '')
+    if event not in JIRA_EVENTS or 'issue' not in payload:
+        return jsonify({'status': 'ignored', 'event': event}), 202
+    
+    if not ingestor.submit('jira', event, payload):
+        return jsonify({'error': 'Webhook queue is full'}), 503
+    
+    return jsonify({'status': 'accepted', 'event': event}), 202
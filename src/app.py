@@ -1,6 +1,7 @@
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
 from dotenv import load_dotenv
+from werkzeug.serving import is_running_from_reloader
 import os
 import sys
 from datetime import datetime
@@ -15,19 +16,52 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
+# Run directly with the debugger and reloader
+DEBUG = os.getenv('FLASK_ENV') == 'development'
+
 try:
     from api.routes import api_bp
     from api.jira_routes import jira_bp
     from api.github_routes import github_bp
+    from api.team_routes import team_bp
+    from api.webhook_routes import webhook_bp, ingestor
     
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(jira_bp, url_prefix='/api/jira')
     app.register_blueprint(github_bp, url_prefix='/api/github')
+    app.register_blueprint(team_bp, url_prefix='/api/team')
+    app.register_blueprint(webhook_bp, url_prefix='/api/webhooks')
     print("All blueprints registered successfully")
 except ImportError as e:
     print(f"Import error: {e}")
     sys.exit(1)
 
+from services.ai_tools import jira_service, user_mapping, activity_sync, activity_prefetcher
+from services.github_graphql import create_github_service
+from services.identity_store import IdentityRefresher
+from services.rate_limiter import BACKGROUND
+
+
+def serving_process() -> bool:
+    """False in the Werkzeug reloader's watcher process, which imports this module but never serves requests"""
+    return __name__ != '__main__' or not DEBUG or is_running_from_reloader()
+
+
+# Background workers run once, in the process that serves requests
+if serving_process():
+    user_mapping.start()
+    ingestor.start()
+    
+    # Resolve mapped users' JIRA account IDs and GitHub logins ahead of the first question
+    IdentityRefresher(jira_service, create_github_service(priority=BACKGROUND), user_mapping).start()
+    
+    if activity_sync:
+        activity_sync.start()
+    
+    # Warms every mapped user's activity now, then keeps recently asked-about users fresh
+    if activity_prefetcher:
+        activity_prefetcher.start()
+
 @app.route('/')
 def home():
     """Serve the web interface"""
@@ -44,10 +78,9 @@ def health_check():
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 8000))
-    debug = os.getenv('FLASK_ENV') == 'development'
     
     print(f"Starting server on port {port}")
     print(f"Health check: http://localhost:{port}/health")
     print(f"Web interface: http://localhost:{port}/")
     
-    app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=DEBUG)
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""ASGI entry point: chat runs natively on asyncio, every other route through the Flask app
+
+Run with: uv run uvicorn asgi:app --app-dir src --port 8000
+"""
+from asgiref.wsgi import WsgiToAsgi
+from datetime import datetime
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the Flask app loads the environment and starts the background workers
+from app import app as flask_app
+from services.async_chatbot_service import AsyncChatbotService
+
+logger = logging.getLogger(__name__)
+
+chatbot_service = AsyncChatbotService()
+
+
+async def _query(request: Request):
+    """The request's JSON body if it carries a query, else None"""
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) and 'query' in data else None
+
+
+async def chat(request: Request):
+    """Main chat endpoint for processing user queries"""
+    try:
+        data = await _query(request)
+        if not data:
+            return JSONResponse({'error': 'Query is required'}, status_code=400)
+
+        query = data['query']
+        logger.info(f"Received query: {query}")
+
+        result = await chatbot_service.chat(query, data.get('session_id'))
+
+        if result['success']:
+            return JSONResponse({
+                'query': query,
+                'response': result['response'],
+                'tools_used': result.get('tools_used', []),
+                'cached': result.get('cached', False),
+                'session_id': result.get('session_id'),
+                'data_freshness': result.get('data_freshness'),
+                'timestamp': datetime.now().isoformat(),
+                'status': 'success'
+            })
+        else:
+            return JSONResponse({
+                'error': result['error'],
+                'query': query,
+                'timestamp': datetime.now().isoformat(),
+                'status': 'error'
+            }, status_code=500)
+
+    except Exception as e:
+        logger.error(f"Chat endpoint error: {str(e)}")
+        return JSONResponse({
+            'error': 'Internal server error',
+            'message': str(e)
+        }, status_code=500)
+
+
+async def chat_stream(request: Request):
+    """Chat endpoint streaming tool progress and answer tokens as Server-Sent Events"""
+    data = await _query(request)
+    if not data:
+        return JSONResponse({'error': 'Query is required'}, status_code=400)
+
+    query = data['query']
+    logger.info(f"Received streaming query: {query}")
+
+    async def generate():
+        # Sent before any work starts so the client sees the first byte immediately
+        yield f"event: start\ndata: {json.dumps({'query': query})}\n\n"
+        async for event in chatbot_service.chat_events(query, data.get('session_id')):
+            name = event.pop('event')
+            yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+app = Starlette(
+    routes=[
+        Route('/api/chat', chat, methods=['POST']),
+        Route('/api/chat/stream', chat_stream, methods=['POST']),
+        Mount('/', app=WsgiToAsgi(flask_app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('PORT', 8000))
+    print(f"Starting ASGI server on port {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
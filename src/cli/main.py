@@ -7,6 +7,7 @@ from rich.prompt import Prompt
 from rich import print as rprint
 import sys
 import os
+import json
 from jira_cli import jira
 
 # Rich console for beautiful output
@@ -21,6 +22,52 @@ def cli():
 # Add JIRA commands
 cli.add_command(jira)
 
+TOOL_LABELS = {
+    'get_jira_activity': 'JIRA',
+    'get_github_activity': 'GitHub',
+}
+
+def iter_sse(response):
+    """Yield (event, data) pairs from a Server-Sent Events response"""
+    event = 'message'
+    # Read byte by byte so each event is handled as soon as it arrives
+    for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+        if line.startswith('event:'):
+            event = line[len('event:'):].strip()
+        elif line.startswith('data:'):
+            yield event, json.loads(line[len('data:'):])
+        elif not line:
+            event = 'message'
+
+def stream_answer(base_url, query, prefix, session_id=None):
+    """Stream an answer from /api/chat/stream, printing tool progress and tokens as they arrive
+    
+    Returns the session id to send with the next question of the conversation.
+    """
+    response = requests.post(f"{base_url}/api/chat/stream", json={'query': query, 'session_id': session_id},
+                             stream=True, timeout=(5, 60))
+    if response.status_code != 200:
+        console.print(f"[red]Error:[/red] {response.status_code}")
+        return session_id
+    
+    started = False
+    for event, data in iter_sse(response):
+        if event == 'tool_start':
+            label = TOOL_LABELS.get(data['tool'], data['tool'])
+            console.print(f"[dim]Looking up {label} activity for {data['arguments'].get('identifier')}...[/dim]")
+        elif event == 'token':
+            if not started:
+                console.print(prefix, end=' ')
+                started = True
+            console.print(data['text'], end='', markup=False, highlight=False)
+        elif event == 'error':
+            console.print(f"[red]Error:[/red] {data['error']}")
+            return session_id
+        elif event == 'done':
+            console.print()
+            session_id = data.get('session_id', session_id)
+    return session_id
+
 @cli.command()
 @click.option('--port', default=8000, help='Server port')
 @click.option('--host', default='localhost', help='Server host')
@@ -60,6 +107,8 @@ def chat(port, host):
         console.print("Make sure the server is running with: uv run src/app.py")
         return
     
+    # Follow-up questions continue the same server-side conversation
+    session_id = None
     while True:
         try:
             query = Prompt.ask("[cyan]You[/cyan]")
@@ -69,17 +118,7 @@ def chat(port, host):
                 break
             
             # Send query to backend
-            response = requests.post(
-                f"{base_url}/api/chat",
-                json={'query': query},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                console.print(f"[green]Bot:[/green] {data['response']}")
-            else:
-                console.print(f"[red]Error:[/red] {response.status_code}")
+            session_id = stream_answer(base_url, query, "[green]Bot:[/green]", session_id)
                 
         except KeyboardInterrupt:
             console.print("\n[yellow]Goodbye![/yellow]")
@@ -94,19 +133,8 @@ def chat(port, host):
 def ask(query, port, host):
     """Ask a single question"""
     try:
-        url = f"http://{host}:{port}/api/chat"
-        response = requests.post(
-            url,
-            json={'query': query},
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            console.print(f"[blue]Query:[/blue] {query}")
-            console.print(f"[green]Response:[/green] {data['response']}")
-        else:
-            console.print(f"[red]Error:[/red] {response.status_code}")
+        console.print(f"[blue]Query:[/blue] {query}")
+        stream_answer(f"http://{host}:{port}", query, "[green]Response:[/green]")
             
     except Exception as e:
         console.print(f"[red]Error:[/red] {str(e)}")
@@ -166,5 +194,42 @@ def github(username, port, host):
     except Exception as e:
         console.print(f"[red]Error:[/red] {str(e)}")
 
+@cli.command()
+@click.option('--port', default=8000, help='Server port')
+@click.option('--host', default='localhost', help='Server host')
+def team(port, host):
+    """Get JIRA and GitHub activity for every mapped user"""
+    try:
+        url = f"http://{host}:{port}/api/team/activity"
+        response = requests.get(url, stream=True, timeout=(5, 120))
+        
+        if response.status_code != 200:
+            console.print(f"[red]Error:[/red] {response.status_code}")
+            return
+        
+        # Results stream in per user as each lookup finishes
+        for line in response.iter_lines():
+            if not line:
+                continue
+            record = json.loads(line)
+            label = "[blue]JIRA[/blue]" if record['service'] == 'jira' else "[magenta]GitHub[/magenta]"
+            
+            if not record['success']:
+                console.print(f"{label} [bold]{record['name']}[/bold]: [red]{record['error']}[/red]")
+                continue
+            
+            summary = record['data']['summary']
+            if record['service'] == 'jira':
+                console.print(f"{label} [bold]{record['name']}[/bold]: "
+                              f"{summary['total_assigned_issues']} assigned issues, "
+                              f"{summary['recent_activity_count']} updated in 7 days")
+            else:
+                console.print(f"{label} [bold]{record['name']}[/bold]: "
+                              f"{summary['recent_commits_7d']} commits and "
+                              f"{summary['recent_prs_7d']} PRs in 7 days")
+    
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {str(e)}")
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
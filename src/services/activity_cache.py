@@ -0,0 +1,228 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from .metrics import metrics
+from .workers import get_pool
+
+logger = logging.getLogger(__name__)
+
+# Seconds a user's activity is served as fresh
+ACTIVITY_SOFT_TTL = float(os.getenv('ACTIVITY_SOFT_TTL', 60))
+# Seconds a user's activity may be served stale while it is refreshed; older results are fetched again first
+ACTIVITY_HARD_TTL = float(os.getenv('ACTIVITY_HARD_TTL', 600))
+ACTIVITY_CACHE_MAX_ENTRIES = int(os.getenv('ACTIVITY_CACHE_MAX_ENTRIES', 1000))
+ACTIVITY_REFRESH_WORKERS = int(os.getenv('ACTIVITY_REFRESH_WORKERS', 4))
+
+
+def as_of(fetched_at: float) -> str:
+    """ISO timestamp (UTC) of when a result was fetched"""
+    return datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(timespec='seconds')
+
+
+def mark_freshness(result: Dict, fetched_at: float, stale: bool = False) -> Dict:
+    """Copy of a successful activity result with 'as_of' and 'stale' added to its data"""
+    if not result.get('success'):
+        return result
+    return dict(result, data=dict(result['data'], as_of=as_of(fetched_at), stale=stale))
+
+
+class ActivityCache:
+    """Stale-while-revalidate cache of assembled user activity, keyed on (service, username)
+
+    A result younger than the soft TTL is returned as is. Between the soft
+    and hard TTL it is returned at once marked stale, and one background
+    refresh per key fetches a new one (on a worker pool for the sync
+    services, as a task on the running loop for the async ones). Older
+    results are dropped and fetched in the caller. Only successful results
+    are kept.
+
+    Each key has a generation that invalidate() moves on. A fetch records
+    the generation it began in and its result is not stored if the key was
+    invalidated meanwhile, so a fetch already in flight cannot put back
+    what a webhook just dropped.
+    """
+
+    def __init__(self, soft_ttl: float = ACTIVITY_SOFT_TTL, hard_ttl: float = ACTIVITY_HARD_TTL,
+                 max_entries: int = ACTIVITY_CACHE_MAX_ENTRIES):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[float, Dict]] = OrderedDict()
+        self._refreshing: Set[Hashable] = set()
+        # Invalidations per key; keys never invalidated are at generation 0
+        self._generations: Dict[Hashable, int] = {}
+        # Strong references to refresh tasks, which the loop only holds weakly
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, Dict]]:
+        """(fetched_at, result) for a key younger than the hard TTL, counting the lookup"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.hard_ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                outcome = 'miss'
+            else:
+                self._entries.move_to_end(key)
+                if time.time() - entry[0] <= self.soft_ttl:
+                    self.fresh_hits += 1
+                    outcome = 'fresh'
+                else:
+                    self.stale_hits += 1
+                    outcome = 'stale'
+        metrics.increment('activity_cache_lookups', result=outcome)
+        return entry
+
+    def missing(self, keys: Iterable[Hashable]) -> List[Hashable]:
+        """The keys get() would have to fetch in the caller, without counting a lookup"""
+        now = time.time()
+        with self._lock:
+            return [key for key in keys
+                    if key not in self._entries or now - self._entries[key][0] > self.hard_ttl]
+
+    def generation(self, key: Hashable) -> int:
+        """How many times key was invalidated; fetches sharing work should only join ones of the same generation"""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def _store(self, key: Hashable, generation: int, fetched_at: float, result: Dict):
+        if not result.get('success'):
+            return
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                # Fetched before an invalidation of the key
+                return
+            self._entries[key] = (fetched_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _claim_refresh(self, key: Hashable) -> bool:
+        """True if no refresh is running for key, which the caller must then start"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _refresh_done(self, key: Hashable, generation: int, fetched_at: float, result: Optional[Dict]):
+        """Store a refreshed result and release the key; None means the refresh was cancelled"""
+        if result is not None:
+            self._store(key, generation, fetched_at, result)
+        with self._lock:
+            self._refreshing.discard(key)
+            if result is not None and not result.get('success'):
+                self.refresh_failures += 1
+
+    def _is_stale(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at > self.soft_ttl
+
+    def get(self, key: Hashable, fetch: Callable[[], Dict]) -> Dict:
+        """A cached result for key, or fetch()'s, refreshing stale results in the background"""
+        entry = self._lookup(key)
+        if entry is not None:
+            fetched_at, result = entry
+            stale = self._is_stale(fetched_at)
+            if stale and self._claim_refresh(key):
+                get_pool('activity-refresh', ACTIVITY_REFRESH_WORKERS).submit(self._refresh, key, fetch)
+            return mark_freshness(result, fetched_at, stale)
+
+        generation, fetched_at = self.generation(key), time.time()
+        result = fetch()
+        self._store(key, generation, fetched_at, result)
+        return mark_freshness(result, fetched_at)
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Dict]):
+        generation, fetched_at, result = self.generation(key), time.time(), None
+        try:
+            result = fetch()
+        except Exception as e:
+            logger.warning(f"Activity refresh for {key} failed: {str(e)}")
+            result = {'success': False, 'error': str(e)}
+        finally:
+            self._refresh_done(key, generation, fetched_at, result)
+
+    def refresh(self, key: Hashable, fetch: Callable[[], Dict]) -> bool:
+        """Fetch key in the caller unless its entry is still fresh or a refresh is already running"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and not self._is_stale(entry[0]):
+            return False
+        if not self._claim_refresh(key):
+            return False
+        self._refresh(key, fetch)
+        return True
+
+    async def get_async(self, key: Hashable, fetch: Callable[[], Awaitable[Dict]]) -> Dict:
+        """get() for coroutine fetches, refreshing stale results in a task on the running loop"""
+        entry = self._lookup(key)
+        if entry is not None:
+            fetched_at, result = entry
+            stale = self._is_stale(fetched_at)
+            if stale and self._claim_refresh(key):
+                task = asyncio.ensure_future(self._refresh_async(key, fetch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return mark_freshness(result, fetched_at, stale)
+
+        generation, fetched_at = self.generation(key), time.time()
+        result = await fetch()
+        self._store(key, generation, fetched_at, result)
+        return mark_freshness(result, fetched_at)
+
+    async def _refresh_async(self, key: Hashable, fetch: Callable[[], Awaitable[Dict]]):
+        generation, fetched_at, result = self.generation(key), time.time(), None
+        try:
+            result = await fetch()
+        except Exception as e:
+            logger.warning(f"Activity refresh for {key} failed: {str(e)}")
+            result = {'success': False, 'error': str(e)}
+        finally:
+            self._refresh_done(key, generation, fetched_at, result)
+
+    def invalidate(self, service: str, username: str):
+        """Drop a user's cached activity, so the next lookup fetches it, and discard fetches already running"""
+        key = (service, username)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Fresh, stale and miss counters and background refreshes"""
+        with self._lock:
+            lookups = self.fresh_hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'soft_ttl': self.soft_ttl,
+                'hard_ttl': self.hard_ttl,
+                'fresh_hits': self.fresh_hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'refreshes_running': len(self._refreshing),
+                'refresh_failures': self.refresh_failures,
+                'hit_rate': round((self.fresh_hits + self.stale_hits) / lookups, 3) if lookups else 0.0
+            }
+
+
+activity_cache = ActivityCache()
@@ -0,0 +1,142 @@
+from typing import Any, Dict, List, Optional, Sequence, Union
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ActivityStore:
+    """SQLite-backed store of synced JIRA and GitHub records per mapped user
+
+    Records are kept as JSON in the same shapes the services return, so
+    activity can be assembled from the store without reshaping. Each
+    (service, username) pair also has a sync state row with its last sync
+    time and the watermark / ETag used to fetch only what changed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                service TEXT NOT NULL,
+                username TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                record_id TEXT NOT NULL,
+                sort_key TEXT NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (service, username, kind, record_id)
+            );
+            CREATE INDEX IF NOT EXISTS records_by_user
+                ON records (service, username, kind, sort_key);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                service TEXT NOT NULL,
+                username TEXT NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (service, username)
+            );
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _rows(service: str, username: str, kind: str, records: List[Dict],
+              id_field: Union[str, Sequence[str]], sort_field: str) -> List[tuple]:
+        fields = (id_field,) if isinstance(id_field, str) else tuple(id_field)
+        return [
+            (service, username, kind, ':'.join(str(record[field]) for field in fields),
+             record[sort_field] or '', json.dumps(record))
+            for record in records
+        ]
+
+    def upsert(self, service: str, username: str, kind: str, records: List[Dict],
+               id_field: Union[str, Sequence[str]], sort_field: str):
+        """Insert or update records, keyed on id_field(s) and ordered by sort_field"""
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)',
+                self._rows(service, username, kind, records, id_field, sort_field)
+            )
+            self._conn.commit()
+
+    def replace(self, service: str, username: str, kind: str, records: List[Dict],
+                id_field: Union[str, Sequence[str]], sort_field: str):
+        """Replace every record of a kind for a user"""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM records WHERE service = ? AND username = ? AND kind = ?', (service, username, kind)
+            )
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)',
+                self._rows(service, username, kind, records, id_field, sort_field)
+            )
+            self._conn.commit()
+
+    def delete(self, service: str, username: str, kind: str, record_id: str):
+        """Remove one record for a user"""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM records WHERE service = ? AND username = ? AND kind = ? AND record_id = ?',
+                (service, username, kind, record_id)
+            )
+            self._conn.commit()
+
+    def records(self, service: str, username: str, kind: str, limit: Optional[int] = None) -> List[Dict]:
+        """Records of a kind for a user, newest first"""
+        query = ('SELECT record FROM records WHERE service = ? AND username = ? AND kind = ? '
+                 'ORDER BY sort_key DESC')
+        params: List[Any] = [service, username, kind]
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def prune(self, service: str, username: str, kind: str, keep: int):
+        """Keep only the newest records of a kind for a user"""
+        with self._lock:
+            self._conn.execute("""
+                DELETE FROM records WHERE service = ? AND username = ? AND kind = ? AND record_id NOT IN (
+                    SELECT record_id FROM records WHERE service = ? AND username = ? AND kind = ?
+                    ORDER BY sort_key DESC LIMIT ?
+                )
+            """, (service, username, kind, service, username, kind, keep))
+            self._conn.commit()
+
+    def get_state(self, service: str, username: str) -> Dict:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT state FROM sync_state WHERE service = ? AND username = ?', (service, username)
+            ).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_state(self, service: str, username: str, state: Dict):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)', (service, username, json.dumps(state))
+            )
+            self._conn.commit()
+
+    def age(self, service: str, username: str) -> Optional[float]:
+        """Seconds since the user was last synced, None if never"""
+        synced_at = self.get_state(service, username).get('synced_at')
+        return time.time() - synced_at if synced_at else None
+
+
+_store: Optional[ActivityStore] = None
+_store_lock = threading.Lock()
+
+
+def get_activity_store() -> ActivityStore:
+    """Get the process-wide activity store, opening it on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ActivityStore(os.getenv('ACTIVITY_STORE_FILE', 'data/activity.db'))
+        return _store
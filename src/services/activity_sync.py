@@ -0,0 +1,186 @@
+from typing import Dict, Optional
+import logging
+import math
+import os
+import threading
+import time
+
+from .activity_cache import mark_freshness
+from .activity_store import ActivityStore, get_activity_store
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_STORE_ENABLED = os.getenv('ACTIVITY_STORE_ENABLED', 'false').lower() == 'true'
+# Seconds between sync passes over every mapped user
+ACTIVITY_SYNC_INTERVAL = float(os.getenv('ACTIVITY_SYNC_INTERVAL', 60))
+# Oldest stored activity the chat tools will answer from
+ACTIVITY_MAX_STALENESS = float(os.getenv('ACTIVITY_MAX_STALENESS', 300))
+# Seconds between full JIRA resyncs, which drop issues no longer assigned to the user
+ACTIVITY_FULL_SYNC_INTERVAL = float(os.getenv('ACTIVITY_FULL_SYNC_INTERVAL', 86400))
+ACTIVITY_REPO_SYNC_INTERVAL = float(os.getenv('ACTIVITY_REPO_SYNC_INTERVAL', 600))
+# Pull requests use the search API, whose budget is much smaller
+ACTIVITY_PR_SYNC_INTERVAL = float(os.getenv('ACTIVITY_PR_SYNC_INTERVAL', 300))
+
+MAX_STORED_ISSUES = 500
+MAX_STORED_COMMITS = 100
+
+
+class ActivitySync:
+    """Incremental sync of mapped users' activity into the local store
+
+    JIRA issues are fetched with 'updated >= -<minutes since last sync>m'
+    and merged, with a periodic full resync. GitHub events are polled
+    with If-None-Match at the interval GitHub asks for (X-Poll-Interval).
+    Repositories and pull requests are refreshed on slower intervals.
+    """
+
+    def __init__(self, jira, github, mapping, store: ActivityStore = None):
+        self.jira = jira
+        self.github = github
+        self.mapping = mapping
+        self.store = store or get_activity_store()
+        self._stop = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='activity-sync', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_all()
+            except Exception as e:
+                logger.error(f"Activity sync failed: {str(e)}")
+            self._stop.wait(ACTIVITY_SYNC_INTERVAL)
+
+    def sync_all(self):
+        """Sync every mapped user once"""
+        for user in list(self.mapping.users.values()):
+            if self._stop.is_set():
+                return
+            if user.get('email'):
+                self.sync_jira(user['email'])
+            if user.get('github'):
+                self.sync_github(user['github'])
+
+    def sync_jira(self, email: str) -> bool:
+        """Pull JIRA issues changed since the last sync for one user"""
+        user_search = self.jira._find_user(email)
+        if not user_search['success']:
+            return False
+
+        now = time.time()
+        state = self.store.get_state('jira', email)
+        found_user = user_search['data']
+        if not found_user:
+            self.store.set_state('jira', email, {'synced_at': now, 'user': None})
+            return True
+
+        account_id = found_user['account_id']
+        full = (not state.get('user') or now - state.get('full_synced_at', 0) > ACTIVITY_FULL_SYNC_INTERVAL)
+        if full:
+            jql = f'assignee = "{account_id}" AND (status != Done OR updated >= -7d) ORDER BY updated DESC'
+        else:
+            # Relative dates avoid JQL's user-timezone interpretation; one extra minute covers clock skew
+            minutes = math.ceil((now - state['synced_at']) / 60) + 1
+            jql = f'assignee = "{account_id}" AND updated >= -{minutes}m ORDER BY updated DESC'
+
+        raw_issues = self.jira._search_issues({
+            'jql': jql,
+            'maxResults': 100,
+            'fields': 'key,summary,status,priority,updated,created'
+        }, max_items=MAX_STORED_ISSUES)
+        if raw_issues is None:
+            return False
+
+        records = [self.jira._parse_issue(issue) for issue in raw_issues]
+        if full:
+            self.store.replace('jira', email, 'issues', records, 'key', 'updated')
+            state['full_synced_at'] = now
+        else:
+            self.store.upsert('jira', email, 'issues', records, 'key', 'updated')
+            self.store.prune('jira', email, 'issues', MAX_STORED_ISSUES)
+
+        state.update(synced_at=now, user=found_user)
+        self.store.set_state('jira', email, state)
+        return True
+
+    def sync_github(self, login: str) -> bool:
+        """Poll GitHub events and refresh repos and PRs when due for one user"""
+        profile_result = self.github._get_profile(login)
+        now = time.time()
+        state = self.store.get_state('github', login)
+        if not profile_result['success']:
+            if "user not found" in profile_result['error'].lower():
+                self.store.set_state('github', login, {'synced_at': now, 'profile': None})
+                return True
+            return False
+
+        if now >= state.get('next_poll_at', 0):
+            poll = self.github.poll_events(login, state.get('etag'))
+            if not poll['success']:
+                return False
+            if poll['modified']:
+                commits = self.github._parse_push_events(poll['data'])
+                self.store.upsert('github', login, 'commits', commits, ('repository', 'sha'), 'date')
+                self.store.prune('github', login, 'commits', MAX_STORED_COMMITS)
+                state['etag'] = poll['etag']
+            state['next_poll_at'] = now + poll['poll_interval']
+
+        # A failed fetch keeps the stored records, is retried on the next pass
+        # and leaves synced_at alone, so the store is not served as current
+        complete = True
+        if now - state.get('repos_synced_at', 0) > ACTIVITY_REPO_SYNC_INTERVAL:
+            repos = self.github._fetch_user_repositories(login)
+            complete &= repos is not None
+            if repos is not None:
+                self.store.replace('github', login, 'repos', repos, 'full_name', 'updated_at')
+                state['repos_synced_at'] = now
+
+        if now - state.get('prs_synced_at', 0) > ACTIVITY_PR_SYNC_INTERVAL:
+            prs = self.github._fetch_pull_requests(login)
+            complete &= prs is not None
+            if prs is not None:
+                self.store.replace('github', login, 'prs', prs, 'url', 'updated_at')
+                state['prs_synced_at'] = now
+
+        state['profile'] = profile_result['data']
+        if complete:
+            state['synced_at'] = now
+        self.store.set_state('github', login, state)
+        return complete
+
+    def _fresh_state(self, service: str, username: str, max_age: float) -> Optional[Dict]:
+        state = self.store.get_state(service, username)
+        if not state.get('synced_at') or time.time() - state['synced_at'] > max_age:
+            return None
+        return state
+
+    def jira_activity(self, email: str, max_age: float = ACTIVITY_MAX_STALENESS) -> Optional[Dict]:
+        """JIRA activity assembled from the store, None if it is missing or too old"""
+        state = self._fresh_state('jira', email, max_age)
+        if not state or not state.get('user'):
+            return None
+
+        records = self.store.records('jira', email, 'issues')
+        current_issues, recent_activity = self.jira._split_records(records)
+        result = self.jira._build_activity(email, state['user'], current_issues, recent_activity,
+                                           self.jira._record_totals(records))
+        return mark_freshness(result, state['synced_at'])
+
+    def github_activity(self, login: str, max_age: float = ACTIVITY_MAX_STALENESS) -> Optional[Dict]:
+        """GitHub activity assembled from the store, None if it is missing or too old"""
+        state = self._fresh_state('github', login, max_age)
+        if not state or not state.get('profile'):
+            return None
+
+        cutoff = self.github._get_date_30_days_ago()
+        commits = self.store.records('github', login, 'commits', limit=20)
+        repos = self.store.records('github', login, 'repos', limit=20)
+        prs = [pr for pr in self.store.records('github', login, 'prs') if pr['updated_at'][:10] >= cutoff]
+        result = self.github._build_activity(login, state['profile'], repos, commits, prs)
+        return mark_freshness(result, state['synced_at'])
@@ -1,16 +1,27 @@
-from typing import Dict, List, Any
+from typing import Any, Dict, List, Optional, Tuple
 from .jira_service import JiraService
-from .github_service import GitHubService
+from .github_graphql import create_github_service
 from .user_mapping import UserMapping
+from .activity_sync import ActivitySync, ACTIVITY_STORE_ENABLED
+from .prefetch import ActivityPrefetcher, PREFETCH_ENABLED, user_interest
+from .rate_limiter import BACKGROUND
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Initialize services
 jira_service = JiraService()
-github_service = GitHubService()
+github_service = create_github_service()
 user_mapping = UserMapping()
 
+# Local activity store kept current by a background sync worker (started in app.py)
+activity_sync = (ActivitySync(jira_service, create_github_service(priority=BACKGROUND), user_mapping)
+                 if ACTIVITY_STORE_ENABLED else None)
+
+# Keeps recently asked-about users warm in the activity cache when there is no store (started in app.py)
+activity_prefetcher = (ActivityPrefetcher(jira_service, create_github_service(priority=BACKGROUND), user_mapping)
+                       if PREFETCH_ENABLED and not activity_sync else None)
+
 TOOLS = [
     {
         "type": "function",
@@ -56,37 +67,15 @@ class ToolExecutor:
         self.jira = jira_service
         self.github = github_service
         self.mapping = user_mapping
+        self.activity = activity_sync
     
     def execute_function(self, function_name: str, arguments: Dict[str, Any]) -> Dict:
         """Execute a function call from OpenAI"""
         try:
-            identifier = arguments['identifier']
-            
-            if function_name == "get_jira_activity":
-                jira_id = self.mapping.get_jira_identifier(identifier)
-                if not jira_id:
-                    return {
-                        'success': False,
-                        'error': f"Could not find JIRA information for '{identifier}'. Available users: {', '.join(self.mapping.list_users())}",
-                        'error_type': 'user_not_found'
-                    }
-                return self.jira.get_user_activity(jira_id)
-            
-            elif function_name == "get_github_activity":
-                github_id = self.mapping.get_github_identifier(identifier)
-                if not github_id:
-                    return {
-                        'success': False,
-                        'error': f"Could not find GitHub information for '{identifier}'. Available users: {', '.join(self.mapping.list_users())}",
-                        'error_type': 'user_not_found'
-                    }
-                return self.github.get_user_activity(github_id)
-            
-            else:
-                return {
-                    'success': False,
-                    'error': f'Unknown function: {function_name}'
-                }
+            result, service, upstream_id = self._resolve(function_name, arguments)
+            if service is None:
+                return result
+            return service.get_user_activity(upstream_id)
         
         except Exception as e:
             logger.error(f"Error executing function {function_name}: {str(e)}")
@@ -95,6 +84,51 @@ class ToolExecutor:
                 'error': f'Function execution failed: {str(e)}'
             }
     
+    def _resolve(self, function_name: str, arguments: Dict[str, Any]) -> Tuple[Optional[Dict], Any, Optional[str]]:
+        """Answer a call without the API, or name the service and identifier to fetch it from
+        
+        Returns (result, None, None) for mapping errors, unknown functions and
+        activity already in the local store, otherwise (None, service,
+        upstream identifier).
+        """
+        identifier = arguments['identifier']
+        
+        if function_name == "get_jira_activity":
+            jira_id = self.mapping.get_jira_identifier(identifier)
+            if not jira_id:
+                return {
+                    'success': False,
+                    'error': f"Could not find JIRA information for '{identifier}'. Available users: {', '.join(self.mapping.list_users())}",
+                    'error_type': 'user_not_found'
+                }, None, None
+            if self.activity:
+                stored = self.activity.jira_activity(jira_id)
+                if stored:
+                    return stored, None, None
+            user_interest.record('jira', jira_id)
+            return None, self.jira, jira_id
+        
+        elif function_name == "get_github_activity":
+            github_id = self.mapping.get_github_identifier(identifier)
+            if not github_id:
+                return {
+                    'success': False,
+                    'error': f"Could not find GitHub information for '{identifier}'. Available users: {', '.join(self.mapping.list_users())}",
+                    'error_type': 'user_not_found'
+                }, None, None
+            if self.activity:
+                stored = self.activity.github_activity(github_id)
+                if stored:
+                    return stored, None, None
+            user_interest.record('github', github_id)
+            return None, self.github, github_id
+        
+        else:
+            return {
+                'success': False,
+                'error': f'Unknown function: {function_name}'
+            }, None, None
+    
     def get_available_tools(self) -> List[Dict]:
         """Get list of available tools for OpenAI"""
         return TOOLS
\ No newline at end of file
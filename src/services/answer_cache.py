@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from .metrics import metrics
+
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', 500))
+# Seconds an answer may be replayed even when its data has not changed
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', 3600))
+
+CONTRACTIONS = {
+    "what's": 'what is',
+    "who's": 'who is',
+    "how's": 'how is',
+    "where's": 'where is',
+    "isn't": 'is not',
+    "hasn't": 'has not',
+    "haven't": 'have not',
+    "didn't": 'did not',
+    "doesn't": 'does not',
+    "they're": 'they are',
+    "he's": 'he is',
+    "she's": 'she is',
+}
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, expand contractions and drop punctuation so near-identical questions match"""
+    text = question.lower().replace('’', "'")
+    for contraction, expansion in CONTRACTIONS.items():
+        text = text.replace(contraction, expansion)
+    # Possessives ("adam's") ask the same thing as the bare name
+    text = re.sub(r"'s\b", '', text)
+    words = (word.strip('.') for word in re.findall(r"[a-z0-9@._-]+", text))
+    return ' '.join(word for word in words if word)
+
+
+# Keys the activity cache adds to results, describing when the data was fetched rather than the data
+FRESHNESS_MARKERS = {'as_of', 'stale'}
+
+
+def fingerprint(results: List[Dict]) -> str:
+    """Hash of the tool results an answer was produced from
+
+    The freshness markers ('as_of', 'stale') are left out, so refetching
+    unchanged data keeps the answer replayable; a replay reports the
+    freshness of the data it was checked against in its done event.
+    """
+    stripped = []
+    for result in results:
+        if isinstance(result.get('data'), dict) and FRESHNESS_MARKERS & result['data'].keys():
+            result = dict(result, data={k: v for k, v in result['data'].items() if k not in FRESHNESS_MARKERS})
+        stripped.append(result)
+    return hashlib.sha1(json.dumps(stripped, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CachedAnswer:
+    """Answer to a question with the tool calls and data fingerprint it came from"""
+
+    def __init__(self, response: Dict[str, Any], tool_calls: List[Tuple[str, Dict]], data_fingerprint: str):
+        self.response = response
+        self.tool_calls = tool_calls
+        self.fingerprint = data_fingerprint
+        self.created_at = time.monotonic()
+
+
+class AnswerCache:
+    """Bounded LRU cache of chat answers keyed on the normalized question
+
+    An entry is only replayed after its tool calls have been re-run (from
+    the upstream response caches, usually) and their results still hash
+    to the stored fingerprint; when the data moved the answer is
+    recomputed and the entry replaced.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl: float = ANSWER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.changed = 0
+        self.evictions = 0
+
+    def get(self, question: str) -> Optional[CachedAnswer]:
+        """Get the entry for a question, None if there is none or it is too old"""
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created_at > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.increment('answer_cache_lookups', result='miss')
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def record(self, hit: bool):
+        """Count whether a found entry's data still matched"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.changed += 1
+        metrics.increment('answer_cache_lookups', result='hit' if hit else 'changed')
+
+    def set(self, question: str, entry: CachedAnswer):
+        """Store an answer, evicting the least recently used entries when full"""
+        key = normalize_question(question)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, changed-data and eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses + self.changed
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'changed': self.changed,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+answer_cache = AnswerCache()
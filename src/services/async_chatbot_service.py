@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from openai import AsyncOpenAI
+from .ai_tools import ToolExecutor, TOOLS
+from .answer_cache import answer_cache, fingerprint
+from .async_github_service import AsyncGitHubService
+from .async_jira_service import AsyncJiraService
+from .chat_sessions import chat_sessions
+from .chatbot_service import ChatbotService, TOOL_CALL_TIMEOUT
+from .intent_router import IntentMatcher, INTENT_FAST_PATH
+from .metrics import metrics
+from .upstream_clients import httpx_timeout
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks while another turn of the same session is running
+SESSION_LOCK_POLL = 0.05
+
+
+class AsyncToolExecutor(ToolExecutor):
+    """ToolExecutor fetching activity with the async JIRA and GitHub clients"""
+
+    def __init__(self):
+        super().__init__()
+        self.jira = AsyncJiraService()
+        self.github = AsyncGitHubService()
+
+    async def execute_function(self, function_name: str, arguments: Dict[str, Any]) -> Dict:
+        """Execute a function call from OpenAI"""
+        try:
+            result, service, upstream_id = self._resolve(function_name, arguments)
+            if service is None:
+                return result
+            return await service.get_user_activity(upstream_id)
+
+        except Exception as e:
+            logger.error(f"Error executing function {function_name}: {str(e)}")
+            return {
+                'success': False,
+                'error': f'Function execution failed: {str(e)}'
+            }
+
+
+class AsyncChatbotService(ChatbotService):
+    """ChatbotService on AsyncOpenAI and the async tools, for the ASGI app
+
+    A turn waiting on OpenAI or a tool holds no thread, so one process can
+    serve many concurrent chats. Sessions, the answer cache and intent
+    routing are shared with the sync service.
+    """
+
+    def __init__(self):
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        if not self.api_key:
+            logger.warning("OpenAI API key not found. Check OPENAI_API_KEY environment variable.")
+            return
+
+        self.client = AsyncOpenAI(api_key=self.api_key, timeout=httpx_timeout('openai'))
+        self.tool_executor = AsyncToolExecutor()
+        self.intents = IntentMatcher(self.tool_executor.mapping)
+
+    async def chat(self, user_message: str, session_id: str = None) -> Dict[str, Any]:
+        """Process user message and return response"""
+        parts = []
+        async for event in self.chat_events(user_message, session_id):
+            if event['event'] == 'token':
+                parts.append(event['text'])
+            elif event['event'] == 'error':
+                return {'success': False, 'error': event['error']}
+            elif event['event'] == 'done':
+                return {
+                    'success': True,
+                    'response': ''.join(parts),
+                    'tools_used': event['tools_used'],
+                    'cached': event['cached'],
+                    'session_id': event['session_id'],
+                    'data_freshness': event['data_freshness']
+                }
+        return {'success': False, 'error': 'No response produced'}
+
+    async def chat_events(self, user_message: str, session_id: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process user message, yielding tool progress and the answer's tokens as they arrive"""
+        if not self.api_key:
+            yield {'event': 'error', 'error': 'OpenAI API key not configured'}
+            return
+
+        session = chat_sessions.get(session_id)
+        # The session lock is shared with sync turns, so poll it instead of blocking the loop
+        while not session.lock.acquire(blocking=False):
+            await asyncio.sleep(SESSION_LOCK_POLL)
+        try:
+            async for event in self._turn_events(user_message, session):
+                yield event
+        finally:
+            session.lock.release()
+
+    async def _turn_events(self, user_message: str, session) -> AsyncIterator[Dict[str, Any]]:
+        """Answer one question within a session"""
+        try:
+            history = session.history()
+
+            # Replay a stored answer to the same opening question when its data has not changed
+            cached = answer_cache.get(user_message) if not history else None
+            if cached:
+                results = await self._run_tools(cached.tool_calls)
+                unchanged = fingerprint(results) == cached.fingerprint
+                answer_cache.record(hit=unchanged)
+                if unchanged:
+                    for event in self._replay_events(user_message, session, cached, results):
+                        yield event
+                    return
+
+            messages = self._messages(user_message, history)
+
+            calls = self.intents.match(user_message, session.users) if INTENT_FAST_PATH else None
+            if calls is not None:
+                # Recognized phrasing: call the tools directly and skip the tool-selection round trip
+                metrics.increment('chat_intent_routes', route='local')
+                call_ids, message = self._local_tool_calls(calls)
+                direct_answer = None
+            else:
+                metrics.increment('chat_intent_routes', route='model')
+                response = await self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    tools=TOOLS,
+                    tool_choice="auto",
+                    temperature=0.7,
+                    max_tokens=1000
+                )
+
+                message = response.choices[0].message
+                calls, call_ids = self._model_tool_calls(message)
+                direct_answer = message.content
+
+            results = []
+
+            if calls:
+                # Follow-ups reuse results fetched earlier in the session
+                results = [session.tool_result(name, arguments) for name, arguments in calls]
+                for index, result in enumerate(results):
+                    if result is not None:
+                        yield {'event': 'tool_end', 'tool': calls[index][0], 'success': True, 'reused': True}
+
+                # Execute the remaining tool calls, reporting each as it finishes
+                pending = [index for index, result in enumerate(results) if result is None]
+                tasks = self._start_tools([calls[index] for index in pending])
+                for index in pending:
+                    yield {'event': 'tool_start', 'tool': calls[index][0], 'arguments': calls[index][1]}
+                async for position, result in self._iter_results([calls[index] for index in pending], tasks):
+                    index = pending[position]
+                    results[index] = result
+                    yield {'event': 'tool_end', 'tool': calls[index][0], 'success': bool(result.get('success'))}
+
+                messages.append(message)
+                messages.extend(self._tool_messages(user_message, calls, call_ids, results))
+
+                # Stream the final response with tool results
+                stream = await self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1000,
+                    stream=True
+                )
+
+                parts = []
+                async for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        parts.append(text)
+                        yield {'event': 'token', 'text': text}
+                final_message = ''.join(parts)
+            else:
+                # No tools needed, use direct response
+                final_message = direct_answer or ''
+                yield {'event': 'token', 'text': final_message}
+
+            yield self._finish_turn(user_message, session, history, final_message, calls, results)
+
+        except Exception as e:
+            logger.error(f"Chatbot error: {str(e)}")
+            yield {'event': 'error', 'error': f"Failed to process message: {str(e)}"}
+
+    async def _run_tools(self, calls: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Run tool calls concurrently and return their results in call order"""
+        results = [None] * len(calls)
+        async for index, result in self._iter_results(calls, self._start_tools(calls)):
+            results[index] = result
+        return results
+
+    def _start_tools(self, calls: List[Tuple[str, Dict]]) -> List[asyncio.Task]:
+        """Start every tool call as a task on the running loop"""
+        tasks = []
+        for function_name, arguments in calls:
+            logger.info(f"Executing tool: {function_name} with args: {arguments}")
+            tasks.append(asyncio.ensure_future(self.tool_executor.execute_function(function_name, arguments)))
+        return tasks
+
+    async def _iter_results(self, calls: List[Tuple[str, Dict]],
+                            tasks: List[asyncio.Task]) -> AsyncIterator[Tuple[int, Dict]]:
+        """Yield (call index, result) as tool calls finish, timing out the stragglers"""
+        # All calls start together, so one deadline bounds each of them
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + TOOL_CALL_TIMEOUT
+        indexes = {task: index for index, task in enumerate(tasks)}
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=max(0, deadline - loop.time()),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in sorted(done, key=indexes.get):
+                yield indexes[task], task.result()
+
+        for task in sorted(pending, key=indexes.get):
+            task.cancel()
+            yield indexes[task], self._timeout_result(calls[indexes[task]][0])
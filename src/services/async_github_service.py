@@ -0,0 +1,303 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import logging
+import httpx
+from .activity_cache import activity_cache
+from .github_service import (
+    GitHubService, COMMIT_STATS_CONCURRENCY, COMMIT_STATS_DEADLINE, COMMIT_STATS_ENABLED, COMMITS_LIMIT,
+    GITHUB_API_URL, GITHUB_MAX_ITEMS, GITHUB_MAX_PAGES, GITHUB_PAGE_SIZE, REPOSITORIES_LIMIT, response_cache
+)
+from .identity_store import identity_store
+from .immutable_store import immutable_store
+from .rate_limiter import github_rate_limiter, INTERACTIVE
+from .resilience import CircuitOpenError, async_send_with_retry
+from .response_cache import ResponseCache
+from .single_flight import async_activity_flights
+from .upstream_clients import get_async_client
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGitHubService(GitHubService):
+    """GitHubService on an async HTTP client, for the ASGI app
+
+    Requests share the sync client's response cache, identity cache, rate
+    limit budget and circuit breaker; parsing and response building are
+    inherited. Always uses the REST backend.
+    """
+
+    def __init__(self, priority: str = INTERACTIVE):
+        super().__init__(priority)
+        self.client = get_async_client('github', headers=self._headers())
+        # Commit detail requests in flight at once for this client's lookups
+        self._stats_slots = asyncio.Semaphore(COMMIT_STATS_CONCURRENCY)
+        # Stats fetches outliving their lookup's deadline, kept referenced until they finish
+        self._stats_tasks = set()
+
+    async def _acquire(self, resource: str) -> bool:
+        """Take a rate limit slot, waiting for one off the event loop only when none is free"""
+        if github_rate_limiter.acquire(resource, self.priority, 0):
+            return True
+        return await asyncio.to_thread(github_rate_limiter.acquire, resource, self.priority, self._max_rate_wait())
+
+    async def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
+        """Make authenticated request to GitHub API"""
+        ttl = self._cache_ttl(endpoint)
+        cache_key = ResponseCache.make_key(endpoint, params)
+        cached = response_cache.lookup(cache_key) if ttl else None
+        if cached and cached.is_fresh():
+            return {'success': True, 'data': cached.data, 'links': cached.links}
+
+        resource = self._rate_limit_resource(endpoint)
+        if not await self._acquire(resource):
+            logger.error(f"GitHub API error: {resource} rate limit budget exhausted")
+            return {'success': False, 'error': "GitHub API rate limit exceeded."}
+
+        try:
+            url = f"{GITHUB_API_URL}{endpoint}"
+            # Conditional requests answered with 304 do not count against the rate limit
+            headers = cached.validators() if cached else None
+            response = await async_send_with_retry(
+                'github', lambda: self.client.get(url, params=params, headers=headers)
+            )
+            github_rate_limiter.record_response(resource, response)
+
+            if response.status_code == 304 and cached:
+                response_cache.revalidated(cache_key, ttl)
+                return {'success': True, 'data': cached.data, 'links': cached.links}
+
+            response.raise_for_status()
+            data = response.json()
+            if ttl:
+                response_cache.set(
+                    cache_key, data, ttl,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    links=response.links
+                )
+            return {'success': True, 'data': data, 'links': response.links}
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            error_msg = self._error_message(e)
+            logger.error(f"GitHub API error: {error_msg}")
+            return {'success': False, 'error': error_msg, 'status_code': self._status_code(e)}
+
+    async def get_user_activity(self, username: str) -> Dict:
+        """Get GitHub activity for a user, served stale-while-revalidate from the activity cache"""
+        return await activity_cache.get_async(('github', username), lambda: self._load_user_activity(username))
+
+    async def _load_user_activity(self, username: str) -> Dict:
+        """Fetch GitHub activity for a user, sharing the fetch with concurrent lookups"""
+        # Lookups after an invalidation do not join a fetch that began before it
+        key = ('github', username)
+        return await async_activity_flights.do(key + (activity_cache.generation(key),), lambda: self._fetch_user_activity(username))
+
+    async def _fetch_user_activity(self, username: str) -> Dict:
+        """Fetch GitHub activity for a user from the API"""
+        tasks = []
+        try:
+            # Fetch the profile alongside the data calls so latency is the slowest call
+            profile_task, repos_task, commits_task, prs_task = tasks = [
+                asyncio.ensure_future(self._get_profile(username)),
+                asyncio.ensure_future(self._get_user_repositories(username)),
+                asyncio.ensure_future(self._get_recent_commits(username)),
+                asyncio.ensure_future(self._search_pull_requests(username)),
+            ]
+
+            profile_result = await profile_task
+            if not profile_result['success']:
+                return self._profile_error(username, profile_result['error'])
+
+            profile = profile_result['data']
+
+            # A failed sub-call contributes no records instead of failing the whole lookup
+            repos = await self._collect(repos_task, 'repositories', username)
+            commits = await self._collect(commits_task, 'commits', username)
+            if COMMIT_STATS_ENABLED:
+                commits = await self._enrich_commits(commits)
+            prs, pr_total = await self._collect(prs_task, 'pull requests', username) or ([], None)
+
+            totals = await self._activity_totals(username, profile, repos, commits, pr_total)
+            return self._build_activity(username, profile, repos, commits, prs, totals)
+
+        except Exception as e:
+            logger.error(f"Error getting GitHub user activity: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Failed to get GitHub activity for '{username}': {str(e)}",
+                'error_type': 'api_error'
+            }
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_users_activity(self, usernames: List[str]) -> Dict[str, Dict]:
+        """Get GitHub activity for several users concurrently"""
+        results = await asyncio.gather(*(self.get_user_activity(username) for username in usernames))
+        return dict(zip(usernames, results))
+
+    async def _activity_totals(self, username: str, profile: Dict, repos: List[Dict],
+                               commits: List[Dict], pr_total: Optional[int]) -> Dict:
+        """Totals for lists that may have been cut off, from counts GitHub already reports
+
+        The commit search is only made when the commit list hit its limit.
+        """
+        commit_total = await self._count_commits(username) if len(commits) >= COMMITS_LIMIT else None
+        return self._merge_totals(profile, repos, commits, pr_total, commit_total)
+
+    async def _get_profile(self, username: str, use_cache: bool = True) -> Dict:
+        """Get a user's profile, skipping the request for users the identity cache knows do not exist
+
+        Fields such as public_repos change, so the profile itself comes from
+        /users/{username}, which the response cache serves for up to an hour.
+        """
+        if use_cache and identity_store.get('github', username) is None:
+            return {'success': False, 'error': "GitHub user not found."}
+
+        result = await self._make_request(f'/users/{username}')
+        self._store_profile(username, result)
+        return result
+
+    async def _collect(self, task: asyncio.Future, label: str, username: str) -> List[Dict]:
+        """Wait for a sub-call and fall back to no records if it raised"""
+        try:
+            return await task
+        except Exception as e:
+            logger.warning(f"Failed to get GitHub {label} for '{username}': {str(e)}")
+            return []
+
+    async def _iter_pages(self, endpoint: str, params: Dict, max_items: int = GITHUB_MAX_ITEMS) -> AsyncIterator[Dict]:
+        """Yield items from a list endpoint lazily, following the Link header's next page
+
+        Stops after max_items items or GITHUB_MAX_PAGES pages. A failed page
+        ends the iteration with whatever was already yielded.
+        """
+        params = dict(params, per_page=min(GITHUB_PAGE_SIZE, max_items))
+        yielded = 0
+        for _ in range(GITHUB_MAX_PAGES):
+            result = await self._make_request(endpoint, params)
+            if not result['success']:
+                return
+
+            for item in result['data']:
+                yield item
+                yielded += 1
+                if yielded >= max_items:
+                    return
+
+            next_page = self._next_page(result)
+            if not next_page:
+                return
+            endpoint, params = next_page
+
+    async def _get_user_repositories(self, username: str) -> List[Dict]:
+        """Get user repositories"""
+        result = await self._make_request(f'/users/{username}/repos', {
+            'sort': 'updated',
+            'per_page': REPOSITORIES_LIMIT
+        })
+
+        if not result['success']:
+            return []
+
+        return self._parse_repositories(result['data'])
+
+    async def _get_recent_commits(self, username: str) -> List[Dict]:
+        """Get recent commits by user, paging through events until enough are found or known ones are reached"""
+        commits = []
+        events = self._iter_pages(f'/users/{username}/events', {})
+        async for event in events:
+            if self._collect_commits(username, commits, event):
+                break
+        await events.aclose()
+
+        return self._remember_commits(username, commits)
+
+    async def _enrich_commits(self, commits: List[Dict]) -> List[Dict]:
+        """Copies of the commits with additions, deletions and files changed, within COMMIT_STATS_DEADLINE"""
+        missing = [key for key in dict.fromkeys((c['repository'], c['full_sha']) for c in commits)
+                   if immutable_store.get('commit_stats', key) is None]
+        if missing:
+            tasks = [asyncio.ensure_future(self._get_commit_stats(*key)) for key in missing]
+            for task in tasks:
+                self._stats_tasks.add(task)
+                task.add_done_callback(self._stats_tasks.discard)
+            # Unfinished fetches keep running and are stored for the next lookup
+            await asyncio.wait(tasks, timeout=COMMIT_STATS_DEADLINE)
+        return self._with_commit_stats(commits)
+
+    async def _get_commit_stats(self, repository: str, sha: str) -> Optional[Dict]:
+        """Fetch one commit's diff stats and keep them in the immutable store"""
+        async with self._stats_slots:
+            result = await self._make_request(f'/repos/{repository}/commits/{sha}')
+        return self._store_commit_stats(repository, sha, result)
+
+    async def _count_commits(self, username: str) -> Optional[int]:
+        """Count the user's commits in the last 30 days with the commit search API"""
+        result = await self._make_request('/search/commits', self._commit_count_params(username))
+
+        if not result['success']:
+            return None
+        return result['data'].get('total_count')
+
+    async def _get_user_pull_requests(self, username: str) -> List[Dict]:
+        """Get user pull requests"""
+        return (await self._search_pull_requests(username))[0]
+
+    async def _search_pull_requests(self, username: str) -> Tuple[List[Dict], Optional[int]]:
+        """Get user pull requests and the total the search matched"""
+        result = await self._make_request('/search/issues', self._pull_request_params(username))
+
+        if not result['success']:
+            return [], None
+
+        return self._parse_pull_requests(result['data'].get('items', [])), result['data'].get('total_count')
+
+    async def poll_events(self, username: str, etag: Optional[str] = None) -> Dict:
+        """Poll a user's public events, honoring ETag and X-Poll-Interval"""
+        resource = 'core'
+        if not await self._acquire(resource):
+            return {'success': False, 'error': "GitHub API rate limit exceeded."}
+
+        try:
+            url = f"{GITHUB_API_URL}/users/{username}/events"
+            headers = {'If-None-Match': etag} if etag else None
+            response = await async_send_with_retry(
+                'github', lambda: self.client.get(url, params={'per_page': 100}, headers=headers)
+            )
+            github_rate_limiter.record_response(resource, response)
+            poll_interval = int(response.headers.get('X-Poll-Interval', 60))
+
+            if response.status_code == 304:
+                return {'success': True, 'modified': False, 'etag': etag, 'poll_interval': poll_interval}
+
+            response.raise_for_status()
+            return {
+                'success': True,
+                'modified': True,
+                'data': response.json(),
+                'etag': response.headers.get('ETag'),
+                'poll_interval': poll_interval
+            }
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            logger.error(f"GitHub API error: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    async def get_rate_limit(self) -> Dict:
+        """Get the remaining rate limit budget, asking GitHub if none has been seen yet"""
+        snapshot = github_rate_limiter.snapshot()
+        if not snapshot:
+            # /rate_limit is free and does not count against any bucket
+            try:
+                response = await self.client.get(f'{GITHUB_API_URL}/rate_limit')
+                response.raise_for_status()
+                github_rate_limiter.record_limits(response.json().get('resources', {}))
+                snapshot = github_rate_limiter.snapshot()
+            except httpx.HTTPError as e:
+                logger.error(f"GitHub API error: {str(e)}")
+                return {'success': False, 'error': str(e)}
+
+        return {'success': True, 'data': snapshot}
+
+    async def test_connection(self) -> Dict:
+        """Test GitHub API connection"""
+        return self._connection_result(await self._make_request('/user'))
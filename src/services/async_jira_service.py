@@ -0,0 +1,263 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import logging
+import httpx
+from .activity_cache import activity_cache
+from .identity_store import identity_store, MISSING
+from .jira_service import (
+    DoneIssueMerge, JiraService, JiraSearchError, CURRENT_ISSUES_LIMIT, JIRA_ACTIVITY_QUERY, JIRA_CACHE_TTLS, JIRA_MAX_ITEMS,
+    JIRA_MAX_PAGES, JIRA_PAGE_SIZE, RECENT_ACTIVITY_LIMIT, response_cache
+)
+from .resilience import CircuitOpenError, async_send_with_retry
+from .response_cache import ResponseCache
+from .single_flight import async_activity_flights
+from .upstream_clients import get_async_client
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncJiraService(JiraService):
+    """JiraService on an async HTTP client, for the ASGI app
+
+    Requests share the sync client's response cache, identity cache and
+    circuit breaker; parsing and response building are inherited.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.client = get_async_client('jira', headers={
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        }, auth=(self.email or '', self.api_token or ''))
+
+    async def _make_request(self, endpoint: str, params: Dict = None, body: Dict = None) -> Dict:
+        """Make authenticated request to JIRA API, POSTing body for read-only query endpoints"""
+        ttl = JIRA_CACHE_TTLS.get(endpoint, 0)
+        cache_key = ResponseCache.make_key(endpoint, dict(params or {}, **(body or {})))
+        if ttl:
+            cached = response_cache.lookup(cache_key)
+            if cached and cached.is_fresh():
+                return {'success': True, 'data': cached.data}
+
+        try:
+            url = f"{self.base_url}/rest/api/3{endpoint}"
+            if body is not None:
+                send = lambda: self.client.post(url, params=params, json=body)
+            else:
+                send = lambda: self.client.get(url, params=params)
+            response = await async_send_with_retry('jira', send)
+            response.raise_for_status()
+            data = response.json()
+            if ttl:
+                response_cache.set(cache_key, data, ttl)
+            return {'success': True, 'data': data}
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            error_msg = self._error_message(e)
+            logger.error(f"JIRA API error: {error_msg}")
+            return {'success': False, 'error': error_msg}
+
+    async def get_user_activity(self, username: str) -> Dict:
+        """Get JIRA activity for a user, served stale-while-revalidate from the activity cache"""
+        return await activity_cache.get_async(('jira', username), lambda: self._load_user_activity(username))
+
+    async def _load_user_activity(self, username: str) -> Dict:
+        """Fetch JIRA activity for a user, sharing the fetch with concurrent lookups"""
+        # Lookups after an invalidation do not join a fetch that began before it
+        key = ('jira', username)
+        return await async_activity_flights.do(key + (activity_cache.generation(key),), lambda: self._fetch_user_activity(username))
+
+    async def _fetch_user_activity(self, username: str) -> Dict:
+        """Fetch JIRA activity for a user from the API"""
+        try:
+            user_search = await self._find_user(username)
+            if not user_search['success']:
+                return user_search
+
+            found_user = user_search['data']
+            if not found_user:
+                return {
+                    'success': False,
+                    'error': f"User '{username}' not found in JIRA. Please check the username or email address.",
+                    'error_type': 'user_not_found'
+                }
+
+            user_id = found_user['account_id']
+            current_issues, recent_activity = await self._get_issues_and_activity(user_id)
+            totals = await self._issue_totals(user_id, current_issues, recent_activity)
+
+            return self._build_activity(username, found_user, current_issues, recent_activity, totals)
+
+        except Exception as e:
+            logger.error(f"Error getting JIRA user activity: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Failed to get JIRA activity for '{username}': {str(e)}",
+                'error_type': 'api_error'
+            }
+
+    async def get_team_activity(self, usernames: List[str], batch_size: int = 20) -> Dict[str, Dict]:
+        """Get JIRA activity for many users with one assignee-in search per batch, batches concurrently"""
+        user_searches = await asyncio.gather(*(self._find_user(username) for username in usernames))
+        results, resolved = self._resolve_team(dict(zip(usernames, user_searches)))
+
+        names = list(resolved)
+        batches = [names[start:start + batch_size] for start in range(0, len(names), batch_size)]
+        searches = await asyncio.gather(*(
+            self._search_assigned_batch([resolved[username]['account_id'] for username in batch])
+            for batch in batches
+        ))
+        for batch, issues_by_assignee in zip(batches, searches):
+            results.update(self._team_batch_results(batch, resolved, issues_by_assignee))
+
+        return results
+
+    async def _search_assigned_batch(self, account_ids: List[str]) -> Optional[Dict[str, List[Dict]]]:
+        """Get raw open or recently updated issues for several assignees, grouped by assignee"""
+        raw_issues = await self._search_issues(self._assigned_batch_params(account_ids),
+                                               max_items=JIRA_MAX_ITEMS * len(account_ids))
+        if raw_issues is None:
+            return None
+        return self._group_by_assignee(raw_issues)
+
+    async def _iter_issue_pages(self, params: Dict, page_size: int = JIRA_PAGE_SIZE,
+                                max_items: int = JIRA_MAX_ITEMS) -> AsyncIterator[List[Dict]]:
+        """Yield pages of raw issues from a JQL search, following nextPageToken
+
+        Stops after max_items issues or JIRA_MAX_PAGES pages. Raises
+        JiraSearchError if a page cannot be fetched.
+        """
+        params = dict(params, maxResults=min(page_size, max_items))
+        remaining = max_items
+        for _ in range(JIRA_MAX_PAGES):
+            result = await self._make_request('/search/jql', params)
+            if not result['success']:
+                raise JiraSearchError(result['error'])
+
+            page = result['data'].get('issues', [])[:remaining]
+            yield page
+            remaining -= len(page)
+            if remaining <= 0:
+                return
+
+            next_page = result['data'].get('nextPageToken')
+            if not next_page or result['data'].get('isLast', False):
+                return
+            params = dict(params, nextPageToken=next_page)
+
+    async def _search_issues(self, params: Dict, max_items: int = JIRA_MAX_ITEMS) -> Optional[List[Dict]]:
+        """Run a JQL search across pages, None if any page fails"""
+        try:
+            pages = self._iter_issue_pages(params, params.get('maxResults', JIRA_PAGE_SIZE), max_items)
+            return [issue async for page in pages for issue in page]
+        except JiraSearchError:
+            return None
+
+    async def _count_issues(self, jql: str) -> Optional[int]:
+        """Get JIRA's approximate count of issues matching a JQL query"""
+        result = await self._make_request('/search/approximate-count', body={'jql': jql})
+        if not result['success']:
+            return None
+        return result['data'].get('count')
+
+    async def _issue_totals(self, user_id: str, current_issues: List[Dict], recent_activity: List[Dict]) -> Dict:
+        """Count queries for whichever lists hit their limit and may be truncated"""
+        queries = self._total_queries(user_id, current_issues, recent_activity)
+        counts = await asyncio.gather(*(self._count_issues(jql) for jql in queries.values()))
+        return {name: count for name, count in zip(queries, counts) if count is not None}
+
+    async def _find_user(self, username: str, use_cache: bool = True) -> Dict:
+        """Find user by username, email, or display name"""
+        if use_cache:
+            cached = identity_store.get('jira', username)
+            if cached is not MISSING:
+                return {'success': True, 'data': cached}
+
+        result = await self._search_user(username)
+        if result['success']:
+            identity_store.put('jira', username, result['data'])
+        return result
+
+    async def _search_user(self, username: str) -> Dict:
+        """Search JIRA for the best matching user"""
+        result = await self._make_request('/user/search', {'query': username})
+
+        if not result['success']:
+            return result
+
+        return self._match_user(username, result['data'])
+
+    async def _get_issues_and_activity(self, user_id: str) -> Tuple[List[Dict], List[Dict]]:
+        """Get assigned issues and recent activity using the configured query mode"""
+        if JIRA_ACTIVITY_QUERY == 'union':
+            return await self._get_issues_and_activity_union(user_id)
+
+        return tuple(await asyncio.gather(self._get_assigned_issues(user_id), self._get_recent_activity(user_id)))
+
+    async def _get_issues_and_activity_union(self, user_id: str) -> Tuple[List[Dict], List[Dict]]:
+        """Get assigned issues and recent activity from one JQL search split locally"""
+        searched_at = time.time()
+        since_minutes, known_done = self._known_done_issues(user_id)
+        try:
+            return await self._search_union(user_id, searched_at, since_minutes, known_done)
+        except JiraSearchError:
+            if since_minutes is None:
+                return [], []
+        # A re-checked key may have been deleted, which fails the whole search
+        try:
+            return await self._search_union(user_id, searched_at, None, [])
+        except JiraSearchError:
+            return [], []
+
+    async def _search_union(self, user_id: str, searched_at: float, since_minutes: Optional[int],
+                            known_done: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        merge = self._done_merge(user_id, searched_at, since_minutes, known_done)
+        pages = self._iter_issue_pages(self._union_params(user_id, since_minutes, known_done))
+        current_issues, recent_activity = [], []
+        # Pages are only pulled until both lists are full, then until the Done issues' window is covered
+        async for page in pages:
+            for issue in page:
+                merge.add(issue)
+            current_issues, recent_activity = self._split_records(merge.records(merge.fresh))
+            if len(current_issues) >= CURRENT_ISSUES_LIMIT and len(recent_activity) >= RECENT_ACTIVITY_LIMIT:
+                break
+        else:
+            merge.ended()
+        await self._finish_merge(merge, pages)
+        self._remember_done_issues(user_id, searched_at, merge)
+        return current_issues, recent_activity
+
+    async def _finish_merge(self, merge: DoneIssueMerge, pages: AsyncIterator[List[Dict]]):
+        """Keep pulling pages until the merge saw its whole window, giving up if a page fails"""
+        try:
+            while not merge.complete:
+                page = await anext(pages, None)
+                if page is None:
+                    merge.ended()
+                    return
+                for issue in page:
+                    merge.add(issue)
+        except JiraSearchError:
+            return
+
+    async def _get_assigned_issues(self, user_id: str) -> List[Dict]:
+        """Get issues assigned to user"""
+        result = await self._make_request('/search/jql', self._assigned_issues_params(user_id))
+
+        if not result['success']:
+            return []
+
+        return [self._parse_issue(issue) for issue in result['data'].get('issues', [])]
+
+    async def _get_recent_activity(self, user_id: str) -> List[Dict]:
+        """Get recent activity for user (last 7 days)"""
+        result = await self._make_request('/search/jql', self._recent_activity_params(user_id))
+
+        if not result['success']:
+            return []
+
+        return self._parse_activity(result['data'].get('issues', []))
+
+    async def test_connection(self) -> Dict:
+        """Test JIRA API connection"""
+        return self._connection_result(await self._make_request('/myself'))
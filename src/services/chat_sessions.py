@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+import uuid
+
+from .result_compactor import count_tokens
+
+CHAT_MAX_SESSIONS = int(os.getenv('CHAT_MAX_SESSIONS', 1000))
+# Seconds of inactivity after which a session is dropped
+CHAT_SESSION_TTL = float(os.getenv('CHAT_SESSION_TTL', 1800))
+# Tokens of earlier turns sent with each question; older turns are summarized
+CHAT_SESSION_TOKEN_CAP = int(os.getenv('CHAT_SESSION_TOKEN_CAP', 2000))
+# Seconds a tool result fetched earlier in the session answers follow-ups
+CHAT_SESSION_TOOL_TTL = float(os.getenv('CHAT_SESSION_TOOL_TTL', 300))
+
+# Questions of dropped turns kept in the summary
+MAX_SUMMARIZED_QUESTIONS = 10
+
+
+class ChatSession:
+    """History of one conversation and the tool results fetched during it"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.turns: List[Tuple[str, str]] = []
+        self.summarized: List[str] = []
+        self.users: List[str] = []
+        self.tool_results: Dict[str, Tuple[float, Dict]] = {}
+        self.last_used = time.monotonic()
+        # One turn at a time, so a follow-up sees the answer it follows
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _tool_key(name: str, arguments: Dict) -> str:
+        return f"{name}:{json.dumps(arguments, sort_keys=True)}"
+
+    def tool_result(self, name: str, arguments: Dict) -> Optional[Dict]:
+        """A result fetched earlier in the session for the same call, if still fresh"""
+        entry = self.tool_results.get(self._tool_key(name, arguments))
+        if entry is None or time.monotonic() - entry[0] > CHAT_SESSION_TOOL_TTL:
+            return None
+        return entry[1]
+
+    def add_turn(self, question: str, answer: str, calls: List[Tuple[str, Dict]], results: List[Dict]):
+        """Record a finished turn and the successful tool results it used"""
+        self.turns.append((question, answer))
+        now = time.monotonic()
+        self.tool_results = {key: entry for key, entry in self.tool_results.items()
+                             if now - entry[0] <= CHAT_SESSION_TOOL_TTL}
+        for (name, arguments), result in zip(calls, results):
+            if result.get('success'):
+                self.tool_results[self._tool_key(name, arguments)] = (now, result)
+
+    def history(self, token_cap: int = CHAT_SESSION_TOKEN_CAP) -> List[Dict[str, str]]:
+        """Messages for earlier turns, dropping the oldest into a summary to stay under the token cap"""
+        while self.turns and sum(count_tokens(q) + count_tokens(a) for q, a in self.turns) > token_cap:
+            question, _ = self.turns.pop(0)
+            self.summarized = (self.summarized + [question])[-MAX_SUMMARIZED_QUESTIONS:]
+
+        messages = []
+        if self.summarized:
+            questions = '; '.join(f'"{question}"' for question in self.summarized)
+            messages.append({
+                "role": "system",
+                "content": f"Earlier in this conversation the user asked: {questions}"
+            })
+        for question, answer in self.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+
+class SessionStore:
+    """Bounded LRU of chat sessions with an inactivity TTL"""
+
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, ttl: float = CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, session_id: Optional[str] = None) -> ChatSession:
+        """Get a live session by id, or start a new one when it is unknown or expired"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None and now - session.last_used > self.ttl:
+                del self._sessions[session_id]
+                self.expired += 1
+                session = None
+
+            if session is None:
+                session = ChatSession(session_id or uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evictions += 1
+
+            session.last_used = now
+            self._sessions.move_to_end(session.session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Live session count and lifecycle counters"""
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'created': self.created,
+                'expired': self.expired,
+                'evictions': self.evictions
+            }
+
+
+chat_sessions = SessionStore()
@@ -1,39 +1,25 @@
 import os
 import json
 import logging
-from typing import Dict, Any
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, as_completed
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from openai import OpenAI
 from .ai_tools import ToolExecutor, TOOLS
+from .answer_cache import answer_cache, CachedAnswer, fingerprint
+from .chat_sessions import chat_sessions
+from .intent_router import IntentMatcher, INTENT_FAST_PATH
+from .metrics import metrics
+from .result_compactor import compact_tool_result
+from .upstream_clients import httpx_timeout
+from .workers import get_pool
 
 logger = logging.getLogger(__name__)
 
+TOOL_MAX_WORKERS = int(os.getenv('TOOL_MAX_WORKERS', 16))
+# Seconds a single tool call may take before the answer is produced without it
+TOOL_CALL_TIMEOUT = float(os.getenv('TOOL_CALL_TIMEOUT', 20))
 
-class ChatbotService:
-    """OpenAI-powered chatbot with JIRA and GitHub tools"""
-    
-    def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        if not self.api_key:
-            logger.warning("OpenAI API key not found. Check OPENAI_API_KEY environment variable.")
-            return
-        
-        self.client = OpenAI(api_key=self.api_key)
-        self.tool_executor = ToolExecutor()
-    
-    def chat(self, user_message: str) -> Dict[str, Any]:
-        """Process user message and return response"""
-        try:
-            if not self.api_key:
-                return {
-                    'success': False,
-                    'error': 'OpenAI API key not configured'
-                }
-            
-            # Create messages for OpenAI
-            messages = [
-                {
-                    "role": "system",
-                    "content": """You are a helpful assistant that can answer questions about team member activities using JIRA and GitHub data.
+SYSTEM_PROMPT = """You are a helpful assistant that can answer questions about team member activities using JIRA and GitHub data.
 
 You have access to two tools:
 - get_jira_activity: Get JIRA issues, tasks, and recent activity for a user
@@ -55,71 +41,261 @@ IMPORTANT ERROR HANDLING:
 - If a user has no activity, mention this clearly
 - Don't make up or hallucinate any information
 
+Tool results carry "as_of", when their data was fetched. If "stale" is true, say the data may be a few minutes old and give its as_of time.
+
+GitHub summaries may include recent_additions_7d and recent_deletions_7d, lines changed over recent_commits_with_stats_7d of the recent commits; say so when that is fewer than recent_commits_7d.
+
+Tool results list records as tables: "columns" names the fields of each row in "rows", and an empty repository cell repeats the row above. "omitted" counts rows left out for brevity; the summary totals are complete.
+
 Be helpful and provide comprehensive answers for broad questions."""
-                },
-                {
-                    "role": "user", 
-                    "content": user_message
+
+
+class ChatbotService:
+    """OpenAI-powered chatbot with JIRA and GitHub tools"""
+    
+    def __init__(self):
+        self.api_key = os.getenv('OPENAI_API_KEY')
+        if not self.api_key:
+            logger.warning("OpenAI API key not found. Check OPENAI_API_KEY environment variable.")
+            return
+        
+        self.client = OpenAI(api_key=self.api_key, timeout=httpx_timeout('openai'))
+        self.tool_executor = ToolExecutor()
+        self.intents = IntentMatcher(self.tool_executor.mapping)
+    
+    def chat(self, user_message: str, session_id: str = None) -> Dict[str, Any]:
+        """Process user message and return response"""
+        parts = []
+        for event in self.chat_events(user_message, session_id):
+            if event['event'] == 'token':
+                parts.append(event['text'])
+            elif event['event'] == 'error':
+                return {'success': False, 'error': event['error']}
+            elif event['event'] == 'done':
+                return {
+                    'success': True,
+                    'response': ''.join(parts),
+                    'tools_used': event['tools_used'],
+                    'cached': event['cached'],
+                    'session_id': event['session_id'],
+                    'data_freshness': event['data_freshness']
                 }
-            ]
+        return {'success': False, 'error': 'No response produced'}
+    
+    def chat_events(self, user_message: str, session_id: str = None) -> Iterator[Dict[str, Any]]:
+        """Process user message, yielding tool progress and the answer's tokens as they arrive
+        
+        Events are tool_start and tool_end per tool call, token for each piece
+        of the answer, then done (with the session id to continue the
+        conversation), or error if the turn failed.
+        """
+        if not self.api_key:
+            yield {'event': 'error', 'error': 'OpenAI API key not configured'}
+            return
+        
+        session = chat_sessions.get(session_id)
+        with session.lock:
+            yield from self._turn_events(user_message, session)
+    
+    def _turn_events(self, user_message: str, session) -> Iterator[Dict[str, Any]]:
+        """Answer one question within a session"""
+        try:
+            history = session.history()
+            
+            # Replay a stored answer to the same opening question when its data has not changed
+            cached = answer_cache.get(user_message) if not history else None
+            if cached:
+                results = self._run_tools(cached.tool_calls)
+                unchanged = fingerprint(results) == cached.fingerprint
+                answer_cache.record(hit=unchanged)
+                if unchanged:
+                    yield from self._replay_events(user_message, session, cached, results)
+                    return
             
-            # Call OpenAI with tools
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                tools=TOOLS,
-                tool_choice="auto",
-                temperature=0.7,
-                max_tokens=1000
-            )
+            messages = self._messages(user_message, history)
+            
+            calls = self.intents.match(user_message, session.users) if INTENT_FAST_PATH else None
+            if calls is not None:
+                # Recognized phrasing: call the tools directly and skip the tool-selection round trip
+                metrics.increment('chat_intent_routes', route='local')
+                call_ids, message = self._local_tool_calls(calls)
+                direct_answer = None
+            else:
+                metrics.increment('chat_intent_routes', route='model')
+                # Call OpenAI with tools
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    tools=TOOLS,
+                    tool_choice="auto",
+                    temperature=0.7,
+                    max_tokens=1000
+                )
+                
+                message = response.choices[0].message
+                calls, call_ids = self._model_tool_calls(message)
+                direct_answer = message.content
             
-            message = response.choices[0].message
+            results = []
             
             # Check if the model wants to call tools
-            if message.tool_calls:
-                # Execute tool calls
-                tool_results = []
-                for tool_call in message.tool_calls:
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    
-                    logger.info(f"Executing tool: {function_name} with args: {arguments}")
-                    
-                    # Execute the tool
-                    result = self.tool_executor.execute_function(function_name, arguments)
-                    
-                    tool_results.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "content": json.dumps(result)
-                    })
+            if calls:
+                # Follow-ups reuse results fetched earlier in the session
+                results = [session.tool_result(name, arguments) for name, arguments in calls]
+                for index, result in enumerate(results):
+                    if result is not None:
+                        yield {'event': 'tool_end', 'tool': calls[index][0], 'success': True, 'reused': True}
+                
+                # Execute the remaining tool calls, reporting each as it finishes
+                pending = [index for index, result in enumerate(results) if result is None]
+                futures = self._submit_tools([calls[index] for index in pending])
+                for index in pending:
+                    yield {'event': 'tool_start', 'tool': calls[index][0], 'arguments': calls[index][1]}
+                for position, result in self._iter_results([calls[index] for index in pending], futures):
+                    index = pending[position]
+                    results[index] = result
+                    yield {'event': 'tool_end', 'tool': calls[index][0], 'success': bool(result.get('success'))}
                 
                 # Add tool call and results to conversation
                 messages.append(message)
-                messages.extend(tool_results)
+                messages.extend(self._tool_messages(user_message, calls, call_ids, results))
                 
-                # Get final response with tool results
-                final_response = self.client.chat.completions.create(
+                # Stream the final response with tool results
+                stream = self.client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=messages,
                     temperature=0.7,
-                    max_tokens=1000
+                    max_tokens=1000,
+                    stream=True
                 )
                 
-                final_message = final_response.choices[0].message.content
+                parts = []
+                for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        parts.append(text)
+                        yield {'event': 'token', 'text': text}
+                final_message = ''.join(parts)
             else:
                 # No tools needed, use direct response
-                final_message = message.content
+                final_message = direct_answer or ''
+                yield {'event': 'token', 'text': final_message}
             
-            return {
-                'success': True,
-                'response': final_message,
-                'tools_used': [call.function.name for call in (message.tool_calls or [])]
-            }
+            yield self._finish_turn(user_message, session, history, final_message, calls, results)
             
         except Exception as e:
             logger.error(f"Chatbot error: {str(e)}")
-            return {
-                'success': False,
-                'error': f"Failed to process message: {str(e)}"
-            }
\ No newline at end of file
+            yield {'event': 'error', 'error': f"Failed to process message: {str(e)}"}
+    
+    def _replay_events(self, user_message: str, session, cached: CachedAnswer,
+                       results: List[Dict]) -> List[Dict[str, Any]]:
+        """Events answering a question from the answer cache"""
+        session.add_turn(user_message, cached.response['response'], [], [])
+        return [
+            {'event': 'token', 'text': cached.response['response']},
+            {'event': 'done', 'tools_used': cached.response['tools_used'], 'cached': True,
+             'session_id': session.session_id, 'data_freshness': self._data_freshness(results)}
+        ]
+    
+    def _messages(self, user_message: str, history: List[Dict[str, str]]) -> List[Dict]:
+        """Messages for OpenAI: instructions, earlier turns, then the question"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            *history,
+            {"role": "user", "content": user_message}
+        ]
+    
+    def _local_tool_calls(self, calls: List[Tuple[str, Dict]]) -> Tuple[List[str], Dict]:
+        """Call ids and the assistant message for tool calls chosen by the intent matcher"""
+        call_ids = [f'call_local_{i}' for i in range(len(calls))]
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(arguments)}
+            } for call_id, (name, arguments) in zip(call_ids, calls)]
+        }
+        return call_ids, message
+    
+    def _model_tool_calls(self, message) -> Tuple[List[Tuple[str, Dict]], List[str]]:
+        """Tool calls and their ids from the model's tool-selection message"""
+        tool_calls = message.tool_calls or []
+        calls = [(call.function.name, json.loads(call.function.arguments)) for call in tool_calls]
+        return calls, [call.id for call in tool_calls]
+    
+    def _tool_messages(self, user_message: str, calls: List[Tuple[str, Dict]], call_ids: List[str],
+                       results: List[Dict]) -> List[Dict]:
+        """Tool result messages, compacted for the question"""
+        return [{
+            "tool_call_id": call_id,
+            "role": "tool",
+            "content": compact_tool_result(name, result, user_message)
+        } for call_id, (name, _), result in zip(call_ids, calls, results)]
+    
+    def _finish_turn(self, user_message: str, session, history: List[Dict[str, str]], final_message: str,
+                     calls: List[Tuple[str, Dict]], results: List[Dict]) -> Dict[str, Any]:
+        """Record a finished turn in the session and answer cache, returning its done event"""
+        result = {
+            'success': True,
+            'response': final_message,
+            'tools_used': [name for name, _ in calls],
+            'cached': False
+        }
+        # Answers built on failed lookups are not worth replaying, and ones built on stale data may say so
+        freshness = self._data_freshness(results)
+        if (not history and not (freshness and freshness['stale'])
+                and all(r.get('success') or r.get('error_type') == 'user_not_found' for r in results)):
+            answer_cache.set(user_message, CachedAnswer(result, calls, fingerprint(results)))
+        
+        session.add_turn(user_message, final_message, calls, results)
+        users = list(dict.fromkeys(arguments['identifier'] for _, arguments in calls if 'identifier' in arguments))
+        if users:
+            session.users = users
+        return {'event': 'done', 'tools_used': result['tools_used'], 'cached': False,
+                'session_id': session.session_id, 'data_freshness': freshness}
+    
+    def _data_freshness(self, results: List[Dict]) -> Optional[Dict[str, Any]]:
+        """When the oldest tool data behind an answer was fetched and whether any of it was stale"""
+        data = [r['data'] for r in results if r and r.get('success') and 'as_of' in r.get('data', {})]
+        if not data:
+            return None
+        return {'as_of': min(d['as_of'] for d in data), 'stale': any(d['stale'] for d in data)}
+    
+    def _run_tools(self, calls: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Run tool calls concurrently and return their results in call order"""
+        results = [None] * len(calls)
+        for index, result in self._iter_results(calls, self._submit_tools(calls)):
+            results[index] = result
+        return results
+    
+    def _submit_tools(self, calls: List[Tuple[str, Dict]]) -> List[Future]:
+        """Start every tool call on the shared tools pool"""
+        pool = get_pool('tools', TOOL_MAX_WORKERS)
+        
+        futures = []
+        for function_name, arguments in calls:
+            logger.info(f"Executing tool: {function_name} with args: {arguments}")
+            futures.append(pool.submit(self.tool_executor.execute_function, function_name, arguments))
+        return futures
+    
+    def _iter_results(self, calls: List[Tuple[str, Dict]], futures: List[Future]) -> Iterator[Tuple[int, Dict]]:
+        """Yield (call index, result) as tool calls finish, timing out the stragglers"""
+        # All calls start together, so one deadline bounds each of them
+        indexes = {future: index for index, future in enumerate(futures)}
+        try:
+            for future in as_completed(futures, timeout=TOOL_CALL_TIMEOUT):
+                yield indexes.pop(future), future.result()
+        except FutureTimeoutError:
+            for index in sorted(indexes.values()):
+                yield index, self._timeout_result(calls[index][0])
+    
+    def _timeout_result(self, function_name: str) -> Dict:
+        """Result standing in for a tool call that did not finish in time"""
+        logger.warning(f"Tool {function_name} timed out after {TOOL_CALL_TIMEOUT}s")
+        return {
+            'success': False,
+            'error': f'{function_name} did not respond within {TOOL_CALL_TIMEOUT:g} seconds',
+            'error_type': 'api_error'
+        }
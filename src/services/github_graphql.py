@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from .activity_cache import activity_cache
+from .github_service import (
+    GitHubService, COMMIT_STATS_ENABLED, GITHUB_API_URL, GITHUB_MAX_RATE_WAIT, PULL_REQUESTS_LIMIT, commit_record,
+    response_cache
+)
+from .identity_store import identity_store
+from .immutable_store import immutable_store
+from .rate_limiter import github_rate_limiter, INTERACTIVE
+from .resilience import send_with_retry
+from .response_cache import ResponseCache
+from .single_flight import activity_flights
+
+logger = logging.getLogger(__name__)
+
+GITHUB_GRAPHQL_URL = os.getenv('GITHUB_GRAPHQL_URL', f'{GITHUB_API_URL}/graphql')
+# Users aliased into one query for team requests
+GITHUB_GRAPHQL_BATCH_SIZE = int(os.getenv('GITHUB_GRAPHQL_BATCH_SIZE', 5))
+GITHUB_GRAPHQL_CACHE_TTL = int(os.getenv('GITHUB_GRAPHQL_CACHE_TTL', 60))
+
+# Commit stats come in the same query, so enriching costs no extra requests here
+COMMIT_FIELDS = 'oid message committedDate author { user { login } }' + (
+    ' additions deletions changedFilesIfAvailable' if COMMIT_STATS_ENABLED else '')
+
+USER_ACTIVITY_FRAGMENT = """
+fragment UserActivity on User {
+  login
+  databaseId
+  name
+  company
+  publicRepositories: repositories(privacy: PUBLIC) { totalCount }
+  repositories(first: 20, ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes { name nameWithOwner description primaryLanguage { name } updatedAt isPrivate }
+  }
+  contributionsCollection(from: $since) {
+    commitContributionsByRepository(maxRepositories: 10) {
+      repository {
+        nameWithOwner
+        defaultBranchRef {
+          target {
+            ... on Commit {
+              history(first: 30, since: $commitsSince) {
+                nodes { %s }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+""" % COMMIT_FIELDS
+
+# The REST client's pull request search, so the list and its total match
+PULL_REQUEST_SEARCH = """search(query: $prs%%d, type: ISSUE, first: %d) {
+    issueCount
+    nodes { ... on PullRequest { number title state createdAt updatedAt url repository { name } } }
+  }""" % PULL_REQUESTS_LIMIT
+
+
+class GitHubGraphQLService(GitHubService):
+    """GitHub client that fetches profile, repos, commits and PRs in one GraphQL query
+
+    Produces the same activity shape as the REST client. Commits come
+    from the default branch of the repositories the user contributed to
+    in the last 30 days, filtered to the user's own commits. Pull
+    requests come from the same search as the REST client's.
+    """
+
+    BATCH_SIZE = GITHUB_GRAPHQL_BATCH_SIZE
+
+    def _fetch_user_activity(self, username: str) -> Dict:
+        """Fetch GitHub activity for a user with a single GraphQL query"""
+        return self._fetch_batch([username])[username]
+
+    def get_users_activity(self, usernames: List[str]) -> Dict[str, Dict]:
+        """Get GitHub activity for several users through the activity cache
+
+        The users it has nothing for are aliased into one query per batch;
+        stale ones are refreshed in the background one query each, as for
+        get_user_activity.
+        """
+        missing = [key[1] for key in activity_cache.missing([('github', username) for username in usernames])]
+        fetched = {}
+        for start in range(0, len(missing), self.BATCH_SIZE):
+            fetched.update(self._load_batch(missing[start:start + self.BATCH_SIZE]))
+
+        def fetch(username: str) -> Dict:
+            generation, result = fetched.get(username, (None, None))
+            # A batch result from before an invalidation is not stored as the new one
+            if result is None or generation != activity_cache.generation(('github', username)):
+                return self._load_user_activity(username)
+            return result
+
+        return {username: activity_cache.get(('github', username), lambda username=username: fetch(username))
+                for username in usernames}
+
+    def _load_batch(self, usernames: List[str]) -> Dict[str, Tuple[int, Dict]]:
+        """Fetch a batch, sharing the fetch with concurrent lookups of the same users, with the generation of each"""
+        generations = [activity_cache.generation(('github', username)) for username in usernames]
+        key = ('github-batch',) + tuple(zip(usernames, generations))
+        results = activity_flights.do(key, lambda: self._fetch_batch(usernames))
+        return {username: (generation, results[username]) for username, generation in zip(usernames, generations)}
+
+    def _build_query(self, count: int) -> str:
+        """Build a query with one aliased user field per login variable"""
+        logins = ', '.join(f'$login{i}: String!, $prs{i}: String!' for i in range(count))
+        fields = '\n'.join(f'  u{i}: user(login: $login{i}) {{ ...UserActivity }}\n  p{i}: {PULL_REQUEST_SEARCH % i}'
+                           for i in range(count))
+        return (f'query({logins}, $since: DateTime!, $commitsSince: GitTimestamp!) {{\n'
+                f'{fields}\n}}\n{USER_ACTIVITY_FRAGMENT}')
+
+    def _fetch_batch(self, usernames: List[str]) -> Dict[str, Dict]:
+        """Fetch activity for up to BATCH_SIZE users in one round trip"""
+        # Day granularity, like the REST search, so repeated queries share a cache key
+        since = (datetime.now(timezone.utc) - timedelta(days=30)).strftime('%Y-%m-%dT00:00:00Z')
+        variables = {f'login{i}': username for i, username in enumerate(usernames)}
+        variables.update({f'prs{i}': self._pull_request_params(username)['q'] + ' sort:updated-desc'
+                          for i, username in enumerate(usernames)})
+        variables['since'] = since
+        variables['commitsSince'] = since
+
+        try:
+            result = self._graphql_request(self._build_query(len(usernames)), variables)
+            if not result['success']:
+                return {username: self._profile_error(username, result['error']) for username in usernames}
+
+            errors_by_alias = {}
+            for error in result.get('errors', []):
+                if error.get('path'):
+                    errors_by_alias[error['path'][0]] = error
+
+            results = {}
+            for i, username in enumerate(usernames):
+                node = result['data'].get(f'u{i}')
+                if node is None:
+                    error = errors_by_alias.get(f'u{i}', {})
+                    if error.get('type') == 'NOT_FOUND':
+                        identity_store.put('github', username, None)
+                        results[username] = self._profile_error(username, "GitHub user not found.")
+                    else:
+                        results[username] = self._profile_error(username, error.get('message', 'No data returned'))
+                    continue
+
+                profile, repos, commits = self._parse_user(username, node)
+                prs, pr_total = self._parse_pull_request_search(result['data'].get(f'p{i}'))
+                identity_store.put('github', username, {'login': node['login'], 'id': node.get('databaseId')})
+                totals = self._merge_totals(profile, repos, commits, pr_total, None)
+                results[username] = self._build_activity(username, profile, repos, commits, prs, totals)
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error getting GitHub user activity: {str(e)}")
+            return {
+                username: {
+                    'success': False,
+                    'error': f"Failed to get GitHub activity for '{username}': {str(e)}",
+                    'error_type': 'api_error'
+                }
+                for username in usernames
+            }
+
+    def _graphql_request(self, query: str, variables: Dict) -> Dict:
+        """Make authenticated request to the GitHub GraphQL API"""
+        cache_key = ResponseCache.make_key('/graphql', {
+            'query': hashlib.sha1(query.encode()).hexdigest(),
+            'variables': json.dumps(variables, sort_keys=True)
+        })
+        cached = response_cache.lookup(cache_key)
+        if cached and cached.is_fresh():
+            return {'success': True, 'data': cached.data}
+
+        max_wait = GITHUB_MAX_RATE_WAIT if self.priority == INTERACTIVE else GITHUB_MAX_RATE_WAIT * 6
+        if not github_rate_limiter.acquire('graphql', self.priority, max_wait):
+            logger.error("GitHub API error: graphql rate limit budget exhausted")
+            return {'success': False, 'error': "GitHub API rate limit exceeded."}
+
+        try:
+            response = send_with_retry('github', lambda: self.session.post(
+                GITHUB_GRAPHQL_URL, json={'query': query, 'variables': variables}, timeout=self.timeout
+            ))
+            github_rate_limiter.record_response('graphql', response)
+            response.raise_for_status()
+            payload = response.json()
+
+            errors = payload.get('errors', [])
+            data = payload.get('data') or {}
+            if not errors:
+                response_cache.set(cache_key, data, GITHUB_GRAPHQL_CACHE_TTL)
+            return {'success': True, 'data': data, 'errors': errors}
+        except requests.exceptions.RequestException as e:
+            error_msg = str(e)
+            if hasattr(e, 'response') and e.response is not None:
+                if e.response.status_code == 401:
+                    error_msg = "GitHub authentication failed. Check token."
+                elif e.response.status_code in (403, 429):
+                    error_msg = "GitHub API rate limit exceeded."
+
+            logger.error(f"GitHub API error: {error_msg}")
+            return {'success': False, 'error': error_msg}
+
+    def _parse_user(self, username: str, node: Dict) -> Tuple[Dict, List[Dict], List[Dict]]:
+        """Convert one user node into the REST client's profile, repository and commit shapes"""
+        profile = {
+            'login': node['login'],
+            'name': node.get('name'),
+            'company': node.get('company'),
+            'public_repos': node['publicRepositories']['totalCount']
+        }
+
+        repositories = []
+        for repo in node['repositories']['nodes']:
+            repositories.append({
+                'name': repo['name'],
+                'full_name': repo['nameWithOwner'],
+                'description': repo['description'][:100] if repo.get('description') else 'No description',
+                'language': (repo.get('primaryLanguage') or {}).get('name'),
+                'updated_at': repo['updatedAt'],
+                'private': repo['isPrivate']
+            })
+
+        commits = []
+        login = node['login'].lower()
+        for contribution in node['contributionsCollection']['commitContributionsByRepository']:
+            repository = contribution['repository']
+            target = (repository.get('defaultBranchRef') or {}).get('target') or {}
+            for commit in (target.get('history') or {}).get('nodes', []):
+                author = ((commit.get('author') or {}).get('user') or {}).get('login', '')
+                if author.lower() != login:
+                    continue
+                record = commit_record(commit['oid'], commit['message'], repository['nameWithOwner'],
+                                       commit['committedDate'])
+                if 'additions' in commit:
+                    record.update(additions=commit['additions'], deletions=commit['deletions'],
+                                  files_changed=commit.get('changedFilesIfAvailable') or 0)
+                commits.append(record)
+        commits.sort(key=lambda c: c['date'], reverse=True)
+
+        return profile, repositories, commits[:20]
+
+    def _parse_pull_request_search(self, search: Optional[Dict]) -> Tuple[List[Dict], Optional[int]]:
+        """Pull request records and the total the search matched, like _search_pull_requests"""
+        if search is None:
+            return [], None
+
+        pull_requests = []
+        for pr in search['nodes']:
+            if pr['state'] == 'OPEN':
+                pull_requests.append(self._graphql_pull_request_record(pr))
+            else:
+                pull_requests.append(immutable_store.intern('pull_request', (pr['url'], pr['updatedAt']),
+                                                            lambda: self._graphql_pull_request_record(pr)))
+        return pull_requests, search['issueCount']
+
+    def _graphql_pull_request_record(self, pr: Dict) -> Dict:
+        """Convert one pull request search node into the REST client's record"""
+        return {
+            'number': pr['number'],
+            'title': pr['title'][:100],
+            'state': 'open' if pr['state'] == 'OPEN' else 'closed',
+            'repository': pr['repository']['name'],
+            'created_at': pr['createdAt'],
+            'updated_at': pr['updatedAt'],
+            'url': pr['url']
+        }
+
+
+def create_github_service(priority: str = INTERACTIVE) -> GitHubService:
+    """Create the GitHub client selected by GITHUB_BACKEND (rest or graphql)"""
+    if os.getenv('GITHUB_BACKEND', 'rest').lower() == 'graphql':
+        return GitHubGraphQLService(priority=priority)
+    return GitHubService(priority=priority)
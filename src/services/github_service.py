@@ -1,113 +1,266 @@
 import requests
 import os
-from typing import Dict, List
+import re
+from concurrent.futures import Future, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
 import logging
 from datetime import datetime, timedelta
+from .activity_cache import activity_cache
+from .identity_store import identity_store
+from .immutable_store import immutable_store
+from .rate_limiter import github_rate_limiter, INTERACTIVE
+from .resilience import send_with_retry
+from .response_cache import ResponseCache
+from .single_flight import activity_flights
+from .upstream_clients import get_session, upstream_timeout
+from .workers import get_pool
 
 logger = logging.getLogger(__name__)
 
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+# Upper bound on concurrent GitHub calls shared by all requests in the process
+GITHUB_MAX_WORKERS = int(os.getenv('GITHUB_MAX_WORKERS', 8))
+# Seconds an interactive request may wait for rate limit budget before failing
+GITHUB_MAX_RATE_WAIT = float(os.getenv('GITHUB_MAX_RATE_WAIT', 10))
+# Items per page and the most pages / items one paginated fetch may pull
+GITHUB_PAGE_SIZE = int(os.getenv('GITHUB_PAGE_SIZE', 30))
+GITHUB_MAX_PAGES = int(os.getenv('GITHUB_MAX_PAGES', 3))
+GITHUB_MAX_ITEMS = int(os.getenv('GITHUB_MAX_ITEMS', 100))
+# Add additions, deletions and files changed to commits, one request per commit not seen before
+COMMIT_STATS_ENABLED = os.getenv('COMMIT_STATS_ENABLED', 'false').lower() == 'true'
+# Commit detail requests in flight at once, shared by all lookups
+COMMIT_STATS_CONCURRENCY = int(os.getenv('COMMIT_STATS_CONCURRENCY', 4))
+# Seconds a lookup waits for commit stats; commits not enriched by then are returned without them
+COMMIT_STATS_DEADLINE = float(os.getenv('COMMIT_STATS_DEADLINE', 2))
+# Commit detail statuses that will not change on retry (gone, empty repository, unresolvable SHA)
+COMMIT_STATS_UNAVAILABLE = (404, 409, 422)
+
+# Records returned per user; totals beyond these come from search counts
+COMMITS_LIMIT = 20
+REPOSITORIES_LIMIT = 20
+PULL_REQUESTS_LIMIT = 20
+
+# Seconds a response is served without revalidation, by endpoint. Link header
+# next pages address the user by numeric ID, as /user/{id}/events?page=2
+GITHUB_CACHE_TTLS = [
+    (re.compile(r'^/users?/[^/]+$'), 3600),
+    (re.compile(r'^/users?/[^/]+/repos$'), 600),
+    (re.compile(r'^/users?/[^/]+/events$'), 60),
+    (re.compile(r'^/search/(issues|commits)$'), 120),
+]
+
+response_cache = ResponseCache(int(os.getenv('GITHUB_CACHE_MAX_ENTRIES', 1000)))
+
+
+def commit_record(sha: str, message: str, repository: str, date: str) -> Dict:
+    """A recent commit as the activity response and the activity store hold it"""
+    return {
+        'sha': sha[:7],
+        'full_sha': sha,
+        'message': message[:100],
+        'repository': repository,
+        'date': date
+    }
+
 
 class GitHubService:
     """GitHub API client for fetching user activity"""
     
-    def __init__(self):
+    # Users fetched per get_users_activity round trip
+    BATCH_SIZE = 1
+    
+    def __init__(self, priority: str = INTERACTIVE):
         self.token = os.getenv('GITHUB_TOKEN')
+        self.priority = priority
         
         if not self.token:
             logger.warning("GitHub token not found. Check GITHUB_TOKEN environment variable.")
         
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = get_session('github', headers=self._headers())
+        self.timeout = upstream_timeout('github')
+    
+    def _headers(self) -> Dict[str, str]:
+        """Headers sent with every GitHub API request"""
+        return {
             'Authorization': f'token {self.token}',
             'Accept': 'application/vnd.github.v3+json',
             'User-Agent': 'JIRA-GitHub-Chatbot'
-        })
+        }
+    
+    def _cache_ttl(self, endpoint: str) -> int:
+        """Get the cache TTL for an endpoint, 0 if it is not cached"""
+        for pattern, ttl in GITHUB_CACHE_TTLS:
+            if pattern.match(endpoint):
+                return ttl
+        return 0
+    
+    def _rate_limit_resource(self, endpoint: str) -> str:
+        """Get the GitHub rate limit bucket an endpoint is charged to"""
+        return 'search' if endpoint.startswith('/search/') else 'core'
+    
+    def _max_rate_wait(self) -> float:
+        """Seconds a request may wait for rate limit budget at this client's priority"""
+        return GITHUB_MAX_RATE_WAIT if self.priority == INTERACTIVE else GITHUB_MAX_RATE_WAIT * 6
     
     def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
         """Make authenticated request to GitHub API"""
+        ttl = self._cache_ttl(endpoint)
+        cache_key = ResponseCache.make_key(endpoint, params)
+        cached = response_cache.lookup(cache_key) if ttl else None
+        if cached and cached.is_fresh():
+            return {'success': True, 'data': cached.data, 'links': cached.links}
+        
+        resource = self._rate_limit_resource(endpoint)
+        if not github_rate_limiter.acquire(resource, self.priority, self._max_rate_wait()):
+            logger.error(f"GitHub API error: {resource} rate limit budget exhausted")
+            return {'success': False, 'error': "GitHub API rate limit exceeded."}
+        
         try:
-            url = f"https://api.github.com{endpoint}"
-            response = self.session.get(url, params=params, timeout=10)
+            url = f"{GITHUB_API_URL}{endpoint}"
+            # Conditional requests answered with 304 do not count against the rate limit
+            headers = cached.validators() if cached else None
+            response = send_with_retry(
+                'github', lambda: self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            )
+            github_rate_limiter.record_response(resource, response)
+            
+            if response.status_code == 304 and cached:
+                response_cache.revalidated(cache_key, ttl)
+                return {'success': True, 'data': cached.data, 'links': cached.links}
+            
             response.raise_for_status()
-            return {'success': True, 'data': response.json()}
+            data = response.json()
+            if ttl:
+                response_cache.set(
+                    cache_key, data, ttl,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    links=response.links
+                )
+            return {'success': True, 'data': data, 'links': response.links}
         except requests.exceptions.RequestException as e:
-            error_msg = str(e)
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 401:
-                    error_msg = "GitHub authentication failed. Check token."
-                elif e.response.status_code == 404:
-                    error_msg = "GitHub user not found."
-                elif e.response.status_code == 403:
-                    error_msg = "GitHub API rate limit exceeded."
-                else:
-                    try:
-                        error_data = e.response.json()
-                        error_msg = error_data.get('message', error_msg)
-                    except:
-                        pass
-            
+            error_msg = self._error_message(e)
             logger.error(f"GitHub API error: {error_msg}")
-            return {'success': False, 'error': error_msg}
+            return {'success': False, 'error': error_msg, 'status_code': self._status_code(e)}
+    
+    def _status_code(self, e: Exception) -> Optional[int]:
+        """HTTP status of a failed request, None if no response came back"""
+        response = getattr(e, 'response', None)
+        return response.status_code if response is not None else None
+    
+    def _error_message(self, e: Exception) -> str:
+        """Describe a failed request, using GitHub's error response when there is one"""
+        error_msg = str(e)
+        response = getattr(e, 'response', None)
+        if response is not None:
+            if response.status_code == 401:
+                error_msg = "GitHub authentication failed. Check token."
+            elif response.status_code == 404:
+                error_msg = "GitHub user not found."
+            elif response.status_code in (403, 429):
+                error_msg = "GitHub API rate limit exceeded."
+            else:
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get('message', error_msg)
+                except:
+                    pass
+        return error_msg
     
     def get_user_activity(self, username: str) -> Dict:
-        """Get GitHub activity for a user"""
+        """Get GitHub activity for a user, served stale-while-revalidate from the activity cache"""
+        return activity_cache.get(('github', username), lambda: self._load_user_activity(username))
+    
+    def _load_user_activity(self, username: str) -> Dict:
+        """Fetch GitHub activity for a user, sharing the fetch with concurrent lookups"""
+        # Lookups after an invalidation do not join a fetch that began before it
+        key = ('github', username)
+        return activity_flights.do(key + (activity_cache.generation(key),), lambda: self._fetch_user_activity(username))
+    
+    def _fetch_user_activity(self, username: str) -> Dict:
+        """Fetch GitHub activity for a user from the API"""
         try:
-            # Get user profile first to validate user exists
-            profile_result = self._make_request(f'/users/{username}')
+            # Fetch the profile alongside the data calls so latency is the slowest call
+            pool = get_pool('github', GITHUB_MAX_WORKERS)
+            profile_future = pool.submit(self._get_profile, username)
+            repos_future = pool.submit(self._get_user_repositories, username)
+            commits_future = pool.submit(self._get_recent_commits, username)
+            prs_future = pool.submit(self._search_pull_requests, username)
+            
+            profile_result = profile_future.result()
             if not profile_result['success']:
-                if "user not found" in profile_result['error'].lower():
-                    return {
-                        'success': False,
-                        'error': f"GitHub user '{username}' not found. Please check the username.",
-                        'error_type': 'user_not_found'
-                    }
-                else:
-                    return {
-                        'success': False,
-                        'error': f"Failed to access GitHub user '{username}': {profile_result['error']}",
-                        'error_type': 'api_error'
-                    }
+                for future in (repos_future, commits_future, prs_future):
+                    future.cancel()
+                return self._profile_error(username, profile_result['error'])
             
             profile = profile_result['data']
             
-            # Get repositories
-            repos = self._get_user_repositories(username)
-            
-            # Get recent commits
-            commits = self._get_recent_commits(username)
+            # A failed sub-call contributes no records instead of failing the whole lookup
+            repos = self._collect(repos_future, 'repositories', username)
+            commits = self._collect(commits_future, 'commits', username)
+            if COMMIT_STATS_ENABLED:
+                # Runs while the pull request search is still in flight
+                commits = self._enrich_commits(commits)
+            prs, pr_total = self._collect(prs_future, 'pull requests', username) or ([], None)
             
-            # Get pull requests
-            prs = self._get_user_pull_requests(username)
-            
-            # Check if user has any activity
-            if not repos and not commits and not prs:
-                return {
-                    'success': True,
-                    'data': {
-                        'user': {
-                            'username': username,
-                            'name': profile.get('name', username),
-                            'company': profile.get('company', ''),
-                            'public_repos': profile.get('public_repos', 0)
-                        },
-                        'summary': {
-                            'total_repositories': 0,
-                            'total_commits': 0,
-                            'total_pull_requests': 0,
-                            'recent_commits_7d': 0,
-                            'recent_prs_7d': 0
-                        },
-                        'recent_commits': [],
-                        'repositories': [],
-                        'pull_requests': [],
-                        'message': f"{profile.get('name', username)} has no visible activity on GitHub (may be private repositories)."
-                    }
-                }
-            
-            # Recent activity (last 7 days)
-            recent_commits = [c for c in commits if self._is_recent(c['date'], 7)]
-            recent_prs = [pr for pr in prs if self._is_recent(pr['updated_at'], 7)]
+            totals = self._activity_totals(username, profile, repos, commits, pr_total)
+            return self._build_activity(username, profile, repos, commits, prs, totals)
             
+        except Exception as e:
+            logger.error(f"Error getting GitHub user activity: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Failed to get GitHub activity for '{username}': {str(e)}",
+                'error_type': 'api_error'
+            }
+    
+    def get_users_activity(self, usernames: List[str]) -> Dict[str, Dict]:
+        """Get GitHub activity for several users"""
+        return {username: self.get_user_activity(username) for username in usernames}
+    
+    def _profile_error(self, username: str, error: str) -> Dict:
+        """Build the error response for a failed profile lookup"""
+        if "user not found" in error.lower():
+            return {
+                'success': False,
+                'error': f"GitHub user '{username}' not found. Please check the username.",
+                'error_type': 'user_not_found'
+            }
+        else:
+            return {
+                'success': False,
+                'error': f"Failed to access GitHub user '{username}': {error}",
+                'error_type': 'api_error'
+            }
+    
+    def _activity_totals(self, username: str, profile: Dict, repos: List[Dict],
+                         commits: List[Dict], pr_total: Optional[int]) -> Dict:
+        """Totals for lists that may have been cut off, from counts GitHub already reports
+        
+        The commit search is only made when the commit list hit its limit.
+        """
+        commit_total = self._count_commits(username) if len(commits) >= COMMITS_LIMIT else None
+        return self._merge_totals(profile, repos, commits, pr_total, commit_total)
+    
+    def _merge_totals(self, profile: Dict, repos: List[Dict], commits: List[Dict],
+                      pr_total: Optional[int], commit_total: Optional[int]) -> Dict:
+        """Totals from the counts GitHub reported, never below the records already fetched"""
+        totals = {}
+        if pr_total is not None:
+            totals['pull_requests'] = pr_total
+        if len(repos) >= REPOSITORIES_LIMIT:
+            totals['repositories'] = max(len(repos), profile.get('public_repos', 0))
+        if commit_total is not None:
+            totals['commits'] = max(len(commits), commit_total)
+        return totals
+    
+    def _build_activity(self, username: str, profile: Dict, repos: List[Dict],
+                        commits: List[Dict], prs: List[Dict], totals: Optional[Dict] = None) -> Dict:
+        """Assemble the activity response from a profile and its records"""
+        totals = totals or {}
+        # Check if user has any activity
+        if not repos and not commits and not prs:
             return {
                 'success': True,
                 'data': {
@@ -118,38 +271,136 @@ class GitHubService:
                         'public_repos': profile.get('public_repos', 0)
                     },
                     'summary': {
-                        'total_repositories': len(repos),
-                        'total_commits': len(commits),
-                        'total_pull_requests': len(prs),
-                        'recent_commits_7d': len(recent_commits),
-                        'recent_prs_7d': len(recent_prs)
+                        'total_repositories': 0,
+                        'total_commits': 0,
+                        'total_pull_requests': 0,
+                        'recent_commits_7d': 0,
+                        'recent_prs_7d': 0
                     },
-                    'recent_commits': commits[:10],
-                    'repositories': repos[:10],
-                    'pull_requests': prs[:5]
+                    'recent_commits': [],
+                    'repositories': [],
+                    'pull_requests': [],
+                    'message': f"{profile.get('name', username)} has no visible activity on GitHub (may be private repositories)."
                 }
             }
-            
-        except Exception as e:
-            logger.error(f"Error getting GitHub user activity: {str(e)}")
-            return {
-                'success': False,
-                'error': f"Failed to get GitHub activity for '{username}': {str(e)}",
-                'error_type': 'api_error'
+        
+        # Recent activity (last 7 days)
+        recent_commits = [c for c in commits if self._is_recent(c['date'], 7)]
+        recent_prs = [pr for pr in prs if self._is_recent(pr['updated_at'], 7)]
+        
+        summary = {
+            'total_repositories': totals.get('repositories', len(repos)),
+            'total_commits': totals.get('commits', len(commits)),
+            'total_pull_requests': totals.get('pull_requests', len(prs)),
+            'recent_commits_7d': len(recent_commits),
+            'recent_prs_7d': len(recent_prs)
+        }
+        with_stats = [c for c in recent_commits if 'additions' in c]
+        if with_stats:
+            # Sums over the commits that have stats, which may be fewer than recent_commits_7d
+            summary.update(
+                recent_commits_with_stats_7d=len(with_stats),
+                recent_additions_7d=sum(c['additions'] for c in with_stats),
+                recent_deletions_7d=sum(c['deletions'] for c in with_stats)
+            )
+        
+        return {
+            'success': True,
+            'data': {
+                'user': {
+                    'username': username,
+                    'name': profile.get('name', username),
+                    'company': profile.get('company', ''),
+                    'public_repos': profile.get('public_repos', 0)
+                },
+                'summary': summary,
+                'recent_commits': commits[:10],
+                'repositories': repos[:10],
+                'pull_requests': prs[:5]
             }
+        }
+    
+    def _get_profile(self, username: str, use_cache: bool = True) -> Dict:
+        """Get a user's profile, skipping the request for users the identity cache knows do not exist
+        
+        Fields such as public_repos change, so the profile itself comes from
+        /users/{username}, which the response cache serves for up to an hour.
+        """
+        if use_cache and identity_store.get('github', username) is None:
+            return {'success': False, 'error': "GitHub user not found."}
+        
+        result = self._make_request(f'/users/{username}')
+        self._store_profile(username, result)
+        return result
+    
+    def _store_profile(self, username: str, result: Dict):
+        """Remember what a username resolved to, or that it does not exist, in the identity cache"""
+        if result['success']:
+            profile = result['data']
+            identity_store.put('github', username, {'login': profile.get('login', username), 'id': profile.get('id')})
+        elif result['error'] == "GitHub user not found.":
+            identity_store.put('github', username, None)
+    
+    def _collect(self, future: Future, label: str, username: str) -> List[Dict]:
+        """Wait for a sub-call and fall back to no records if it raised"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"Failed to get GitHub {label} for '{username}': {str(e)}")
+            return []
+    
+    def _iter_pages(self, endpoint: str, params: Dict, max_items: int = GITHUB_MAX_ITEMS) -> Iterator[Dict]:
+        """Yield items from a list endpoint lazily, following the Link header's next page
+        
+        Stops after max_items items or GITHUB_MAX_PAGES pages. A failed page
+        ends the iteration with whatever was already yielded.
+        """
+        params = dict(params, per_page=min(GITHUB_PAGE_SIZE, max_items))
+        yielded = 0
+        for _ in range(GITHUB_MAX_PAGES):
+            result = self._make_request(endpoint, params)
+            if not result['success']:
+                return
+            
+            for item in result['data']:
+                yield item
+                yielded += 1
+                if yielded >= max_items:
+                    return
+            
+            next_page = self._next_page(result)
+            if not next_page:
+                return
+            endpoint, params = next_page
+    
+    def _next_page(self, result: Dict) -> Optional[Tuple[str, Dict]]:
+        """Endpoint and params of the page after a result, from its Link header"""
+        next_url = result.get('links', {}).get('next', {}).get('url')
+        if not next_url or not next_url.startswith(GITHUB_API_URL):
+            return None
+        parts = urlsplit(next_url[len(GITHUB_API_URL):])
+        return parts.path, dict(parse_qsl(parts.query))
     
     def _get_user_repositories(self, username: str) -> List[Dict]:
         """Get user repositories"""
+        return self._fetch_user_repositories(username) or []
+    
+    def _fetch_user_repositories(self, username: str) -> Optional[List[Dict]]:
+        """Get user repositories, None if the request failed"""
         result = self._make_request(f'/users/{username}/repos', {
             'sort': 'updated',
-            'per_page': 20
+            'per_page': REPOSITORIES_LIMIT
         })
         
         if not result['success']:
-            return []
+            return None
         
+        return self._parse_repositories(result['data'])
+    
+    def _parse_repositories(self, repos: List[Dict]) -> List[Dict]:
+        """Convert repository list items into repository records"""
         repositories = []
-        for repo in result['data']:
+        for repo in repos:
             repositories.append({
                 'name': repo['name'],
                 'full_name': repo['full_name'],
@@ -162,56 +413,167 @@ class GitHubService:
         return repositories
     
     def _get_recent_commits(self, username: str) -> List[Dict]:
-        """Get recent commits by user"""
-        result = self._make_request(f'/users/{username}/events', {
-            'per_page': 30
-        })
+        """Get recent commits by user, paging through events until enough are found or known ones are reached"""
+        commits = []
+        for event in self._iter_pages(f'/users/{username}/events', {}):
+            if self._collect_commits(username, commits, event):
+                break
+        
+        return self._remember_commits(username, commits)
+    
+    def _collect_commits(self, username: str, commits: List[Dict], event: Dict) -> bool:
+        """Add an event's commits to the list, True once it is full
+        
+        The events feed only grows at the front, so reaching the newest
+        commit of an earlier full list means the rest of that list follows;
+        it is taken from the immutable store instead of paging on.
+        """
+        parsed = self._parse_push_events([event])
+        if parsed:
+            earlier = immutable_store.get('commit_history', (username, parsed[0]['repository'], parsed[0]['full_sha']))
+            if earlier is not None:
+                commits.extend(earlier['commits'])
+                return True
+            commits.extend(parsed)
+        return len(commits) >= COMMITS_LIMIT
+    
+    def _remember_commits(self, username: str, commits: List[Dict]) -> List[Dict]:
+        """The first COMMITS_LIMIT commits, stored under the newest when the list is full"""
+        commits = commits[:COMMITS_LIMIT]
+        # Shorter lists may be cut by a failed page, so only full ones are reused
+        if len(commits) == COMMITS_LIMIT:
+            immutable_store.put('commit_history', (username, commits[0]['repository'], commits[0]['full_sha']),
+                                {'commits': commits})
+        return commits
+    
+    def _enrich_commits(self, commits: List[Dict]) -> List[Dict]:
+        """Copies of the commits with additions, deletions and files changed, within COMMIT_STATS_DEADLINE
         
+        Stats are immutable by SHA and kept in the immutable store, so each
+        commit is fetched once, COMMIT_STATS_CONCURRENCY at a time. Commits
+        whose stats are not back by the deadline are returned without them;
+        their fetches keep running and are stored for the next lookup.
+        Commits GitHub cannot return stats for are remembered as such and
+        not asked about again.
+        """
+        missing = [key for key in dict.fromkeys((c['repository'], c['full_sha']) for c in commits)
+                   if immutable_store.get('commit_stats', key) is None]
+        if missing:
+            pool = get_pool('commit-stats', COMMIT_STATS_CONCURRENCY)
+            wait([pool.submit(self._get_commit_stats, *key) for key in missing], timeout=COMMIT_STATS_DEADLINE)
+        return self._with_commit_stats(commits)
+    
+    def _with_commit_stats(self, commits: List[Dict]) -> List[Dict]:
+        """Commits with the stats already in the immutable store merged in"""
+        enriched = []
+        for commit in commits:
+            # An empty record marks a commit without stats
+            stats = immutable_store.get('commit_stats', (commit['repository'], commit['full_sha']))
+            enriched.append(dict(commit, **stats) if stats else commit)
+        return enriched
+    
+    def _get_commit_stats(self, repository: str, sha: str) -> Optional[Dict]:
+        """Fetch one commit's diff stats and keep them in the immutable store"""
+        return self._store_commit_stats(repository, sha, self._make_request(f'/repos/{repository}/commits/{sha}'))
+    
+    def _store_commit_stats(self, repository: str, sha: str, result: Dict) -> Optional[Dict]:
+        """Keep the stats from a commit detail response, None if the request failed and may succeed later"""
         if not result['success']:
-            return []
+            if result.get('status_code') in COMMIT_STATS_UNAVAILABLE:
+                return immutable_store.put('commit_stats', (repository, sha), {})
+            return None
+        stats = result['data'].get('stats') or {}
+        return immutable_store.put('commit_stats', (repository, sha), {
+            'additions': stats.get('additions', 0),
+            'deletions': stats.get('deletions', 0),
+            'files_changed': len(result['data'].get('files') or [])
+        })
+    
+    def _count_commits(self, username: str) -> Optional[int]:
+        """Count the user's commits in the last 30 days with the commit search API"""
+        result = self._make_request('/search/commits', self._commit_count_params(username))
         
+        if not result['success']:
+            return None
+        return result['data'].get('total_count')
+    
+    def _commit_count_params(self, username: str) -> Dict:
+        """Commit search parameters counting the user's commits in the last 30 days"""
+        return {
+            'q': f'author:{username} author-date:>={self._get_date_30_days_ago()}',
+            'per_page': 1
+        }
+    
+    def _parse_push_events(self, events: List[Dict]) -> List[Dict]:
+        """Extract commit records from PushEvents, reusing commits already seen by SHA"""
         commits = []
-        for event in result['data']:
+        for event in events:
             if event['type'] == 'PushEvent':
                 repo_name = event['repo']['name']
                 for commit in event['payload'].get('commits', []):
-                    commits.append({
-                        'sha': commit['sha'][:7],
-                        'message': commit['message'][:100],
-                        'repository': repo_name,
-                        'date': event['created_at']
-                    })
+                    commits.append(immutable_store.intern('commit', (repo_name, commit['sha']), lambda: commit_record(
+                        commit['sha'], commit['message'], repo_name, event['created_at'])))
         
-        return commits[:20]
+        return commits
     
     def _get_user_pull_requests(self, username: str) -> List[Dict]:
         """Get user pull requests"""
-        result = self._make_request('/search/issues', {
-            'q': f'type:pr author:{username} updated:>={self._get_date_30_days_ago()}',
-            'sort': 'updated',
-            'per_page': 20
-        })
+        return self._search_pull_requests(username)[0]
+    
+    def _fetch_pull_requests(self, username: str) -> Optional[List[Dict]]:
+        """Get user pull requests, None if the search failed"""
+        result = self._make_request('/search/issues', self._pull_request_params(username))
         
         if not result['success']:
-            return []
+            return None
+        
+        return self._parse_pull_requests(result['data'].get('items', []))
+    
+    def _search_pull_requests(self, username: str) -> Tuple[List[Dict], Optional[int]]:
+        """Get user pull requests and the total the search matched"""
+        result = self._make_request('/search/issues', self._pull_request_params(username))
+        
+        if not result['success']:
+            return [], None
         
+        return self._parse_pull_requests(result['data'].get('items', [])), result['data'].get('total_count')
+    
+    def _pull_request_params(self, username: str) -> Dict:
+        """Issue search parameters for the user's pull requests updated in the last 30 days"""
+        return {
+            'q': f'type:pr author:{username} updated:>={self._get_date_30_days_ago()}',
+            'sort': 'updated',
+            'per_page': PULL_REQUESTS_LIMIT
+        }
+    
+    def _parse_pull_requests(self, items: List[Dict]) -> List[Dict]:
+        """Convert issue search items into pull request records, reusing closed ones already seen"""
         pull_requests = []
-        for pr in result['data'].get('items', []):
-            # Extract repo name from repository URL
-            repo_name = pr['repository_url'].split('/')[-1] if pr.get('repository_url') else 'Unknown'
-            
-            pull_requests.append({
-                'number': pr['number'],
-                'title': pr['title'][:100],
-                'state': pr['state'],
-                'repository': repo_name,
-                'created_at': pr['created_at'],
-                'updated_at': pr['updated_at'],
-                'url': pr['html_url']
-            })
+        for pr in items:
+            if pr['state'] == 'closed':
+                # A closed PR only changes again if it is reopened or edited, which moves updated_at
+                pull_requests.append(immutable_store.intern('pull_request', (pr['html_url'], pr['updated_at']),
+                                                            lambda: self._pull_request_record(pr)))
+            else:
+                pull_requests.append(self._pull_request_record(pr))
         
         return pull_requests
     
+    def _pull_request_record(self, pr: Dict) -> Dict:
+        """Convert one issue search item into a pull request record"""
+        # Extract repo name from repository URL
+        repo_name = pr['repository_url'].split('/')[-1] if pr.get('repository_url') else 'Unknown'
+        
+        return {
+            'number': pr['number'],
+            'title': pr['title'][:100],
+            'state': pr['state'],
+            'repository': repo_name,
+            'created_at': pr['created_at'],
+            'updated_at': pr['updated_at'],
+            'url': pr['html_url']
+        }
+    
     def _get_date_30_days_ago(self) -> str:
         """Get ISO date string for 30 days ago"""
         from datetime import datetime, timedelta
@@ -227,10 +589,58 @@ class GitHubService:
         except:
             return False
     
+    def poll_events(self, username: str, etag: Optional[str] = None) -> Dict:
+        """Poll a user's public events, honoring ETag and X-Poll-Interval"""
+        resource = 'core'
+        if not github_rate_limiter.acquire(resource, self.priority, self._max_rate_wait()):
+            return {'success': False, 'error': "GitHub API rate limit exceeded."}
+        
+        try:
+            url = f"{GITHUB_API_URL}/users/{username}/events"
+            headers = {'If-None-Match': etag} if etag else None
+            response = send_with_retry(
+                'github', lambda: self.session.get(url, params={'per_page': 100}, headers=headers, timeout=self.timeout)
+            )
+            github_rate_limiter.record_response(resource, response)
+            poll_interval = int(response.headers.get('X-Poll-Interval', 60))
+            
+            if response.status_code == 304:
+                return {'success': True, 'modified': False, 'etag': etag, 'poll_interval': poll_interval}
+            
+            response.raise_for_status()
+            return {
+                'success': True,
+                'modified': True,
+                'data': response.json(),
+                'etag': response.headers.get('ETag'),
+                'poll_interval': poll_interval
+            }
+        except requests.exceptions.RequestException as e:
+            logger.error(f"GitHub API error: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
+    def get_rate_limit(self) -> Dict:
+        """Get the remaining rate limit budget, asking GitHub if none has been seen yet"""
+        snapshot = github_rate_limiter.snapshot()
+        if not snapshot:
+            # /rate_limit is free and does not count against any bucket
+            try:
+                response = self.session.get(f'{GITHUB_API_URL}/rate_limit', timeout=self.timeout)
+                response.raise_for_status()
+                github_rate_limiter.record_limits(response.json().get('resources', {}))
+                snapshot = github_rate_limiter.snapshot()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"GitHub API error: {str(e)}")
+                return {'success': False, 'error': str(e)}
+        
+        return {'success': True, 'data': snapshot}
+    
     def test_connection(self) -> Dict:
         """Test GitHub API connection"""
-        result = self._make_request('/user')
-        
+        return self._connection_result(self._make_request('/user'))
+    
+    def _connection_result(self, result: Dict) -> Dict:
+        """Summarize the authenticated account from a /user response"""
         if not result['success']:
             return result
         
@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Returned by IdentityStore.get when nothing usable is cached
+MISSING = object()
+
+
+class IdentityStore:
+    """SQLite-backed cache of resolved upstream identities
+
+    Maps an identifier (email, GitHub login) to what the upstream resolved
+    it to, such as a JIRA account ID. Lookups that found nobody are cached
+    too, with a shorter TTL, so unknown users do not cost a round trip each
+    time they are asked about.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 86400, negative_ttl: float = 3600):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS identities (
+                service TEXT NOT NULL,
+                identifier TEXT NOT NULL,
+                value TEXT,
+                resolved_at REAL NOT NULL,
+                PRIMARY KEY (service, identifier)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, service: str, identifier: str):
+        """Get the cached resolution (None if the user does not exist) or MISSING"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, resolved_at FROM identities WHERE service = ? AND identifier = ?',
+                (service, identifier.lower())
+            ).fetchone()
+
+        if row is None:
+            return MISSING
+
+        value, resolved_at = row
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if time.time() - resolved_at > ttl:
+            return MISSING
+        return json.loads(value) if value is not None else None
+
+    def put(self, service: str, identifier: str, value: Optional[Dict]):
+        """Store a resolution, or None when the upstream has no such user"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO identities (service, identifier, value, resolved_at) VALUES (?, ?, ?, ?)',
+                (service, identifier.lower(), json.dumps(value) if value is not None else None, time.time())
+            )
+            self._conn.commit()
+
+    def needs_refresh(self, service: str, identifiers: List[str]) -> List[str]:
+        """Identifiers that are missing or past half their TTL"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT identifier, value, resolved_at FROM identities WHERE service = ?', (service,)
+            ).fetchall()
+
+        resolved = {identifier: (value, resolved_at) for identifier, value, resolved_at in rows}
+        now = time.time()
+        stale = []
+        for identifier in identifiers:
+            entry = resolved.get(identifier.lower())
+            if entry is None:
+                stale.append(identifier)
+                continue
+            ttl = self.ttl if entry[0] is not None else self.negative_ttl
+            if now - entry[1] > ttl / 2:
+                stale.append(identifier)
+        return stale
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM identities')
+            self._conn.commit()
+
+
+identity_store = IdentityStore(
+    os.getenv('IDENTITY_CACHE_FILE', 'data/identity_cache.db'),
+    ttl=float(os.getenv('IDENTITY_CACHE_TTL', 7 * 86400)),
+    negative_ttl=float(os.getenv('IDENTITY_CACHE_NEGATIVE_TTL', 3600))
+)
+
+
+class IdentityRefresher:
+    """Background thread that resolves mapped users' identities in bulk"""
+
+    def __init__(self, jira, github, mapping, interval: float = None):
+        self.jira = jira
+        self.github = github
+        self.mapping = mapping
+        self.interval = interval or float(os.getenv('IDENTITY_REFRESH_INTERVAL', 6 * 3600))
+        self._stop = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='identity-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # The first pass runs at startup so the first question finds identities warm
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Identity refresh failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def refresh(self) -> Tuple[int, int]:
+        """Resolve every mapped identity that is missing or getting stale"""
+        emails, logins = [], []
+        for user in self.mapping.users.values():
+            if user.get('email'):
+                emails.append(user['email'])
+            if user.get('github'):
+                logins.append(user['github'])
+
+        stale_emails = identity_store.needs_refresh('jira', emails)
+        stale_logins = identity_store.needs_refresh('github', logins)
+
+        jira_refreshed = sum(
+            1 for email in stale_emails if self.jira._find_user(email, use_cache=False)['success']
+        )
+        github_refreshed = 0
+        for login in stale_logins:
+            result = self.github._get_profile(login, use_cache=False)
+            # A 404 is a successful negative resolution and is cached as such
+            if result['success'] or identity_store.get('github', login) is None:
+                github_refreshed += 1
+
+        if stale_emails or stale_logins:
+            logger.info(f"Refreshed {jira_refreshed}/{len(stale_emails)} JIRA and "
+                        f"{github_refreshed}/{len(stale_logins)} GitHub identities")
+        return jira_refreshed, github_refreshed
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import os
+import threading
+
+IMMUTABLE_STORE_MAX_ENTRIES = int(os.getenv('IMMUTABLE_STORE_MAX_ENTRIES', 20000))
+
+
+class ImmutableStore:
+    """Bounded in-process store of records that never change once written
+
+    Keys address an object's content rather than a query: a commit by
+    repository and SHA, a closed pull request or Done issue by its URL or
+    key together with its last update time. A closed item that changes
+    again gets a new key instead of a stale entry, so nothing here expires
+    or needs invalidating; the least recently used records are evicted
+    when full. It is kept apart from the TTL'd response caches, so churn in
+    mutable data never evicts immutable records.
+
+    Stored records are shared between results and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = IMMUTABLE_STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Tuple[str, Hashable], Dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind: str, key: Hashable) -> Optional[Dict]:
+        """The stored record, None if it has not been seen or was evicted"""
+        with self._lock:
+            record = self._entries.get((kind, key))
+            if record is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((kind, key))
+            self.hits += 1
+            return record
+
+    def put(self, kind: str, key: Hashable, record: Dict) -> Dict:
+        """Store a record, keeping the one already stored under the key"""
+        with self._lock:
+            stored = self._entries.setdefault((kind, key), record)
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return stored
+
+    def intern(self, kind: str, key: Hashable, build: Callable[[], Dict]) -> Dict:
+        """The stored record for key, building and storing it on first sight"""
+        record = self.get(kind, key)
+        if record is None:
+            record = self.put(kind, key, build())
+        return record
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries by kind, and hit, miss and eviction counters"""
+        with self._lock:
+            kinds: Dict[str, int] = {}
+            for kind, _ in self._entries:
+                kinds[kind] = kinds.get(kind, 0) + 1
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'kinds': kinds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+immutable_store = ImmutableStore()
@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional, Tuple
+import os
+import re
+
+from .answer_cache import normalize_question
+
+INTENT_FAST_PATH = os.getenv('INTENT_FAST_PATH', 'true').lower() == 'true'
+
+# Questions about what someone is doing overall, answered from both tools
+BROAD_PATTERN = re.compile(
+    r'\b(working on|work on|doing|up to|been up|activit(y|ies)|progress|status update|contribut\w*|busy)\b'
+)
+JIRA_PATTERN = re.compile(
+    r'\b(jira|tickets?|issues?|tasks?|stor(y|ies)|bugs?|epics?|sprint|backlog|assigned)\b'
+)
+GITHUB_PATTERN = re.compile(
+    r'\b(github|prs?|pull requests?|commits?|committed|push(ed|es)?|repos?|repositor(y|ies)|code|merged?)\b'
+)
+# Follow-ups that refer back to the people of the previous turn
+PRONOUN_PATTERN = re.compile(r'\b(he|him|his|she|her|hers|they|them|their|theirs)\b')
+
+
+class IntentMatcher:
+    """Local router for common activity questions
+
+    Recognizes the people a question names with the user mapping index and
+    which tools the phrasing asks for, producing the same tool calls the
+    model would choose. Returns None whenever it is unsure (nobody or an
+    ambiguous name is mentioned, or the phrasing asks for neither tool) so
+    the question goes to the LLM router instead.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def match(self, question: str, recent_users: Optional[List[str]] = None) -> Optional[List[Tuple[str, Dict]]]:
+        """Tool calls for a recognized question, None to fall back to the model
+
+        recent_users are the people the previous turn of a conversation was
+        about, used when the question names nobody but refers back to them.
+        """
+        text = normalize_question(question)
+        jira = bool(JIRA_PATTERN.search(text))
+        github = bool(GITHUB_PATTERN.search(text))
+        if not jira and not github:
+            if not BROAD_PATTERN.search(text):
+                return None
+            jira = github = True
+
+        users = self.mapping.find_mentions(question)
+        if users == [] and recent_users and PRONOUN_PATTERN.search(text):
+            users = recent_users
+        if not users:
+            return None
+
+        calls = []
+        for key in users:
+            if jira:
+                calls.append(('get_jira_activity', {'identifier': key}))
+            if github:
+                calls.append(('get_github_activity', {'identifier': key}))
+        return calls
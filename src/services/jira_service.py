@@ -1,10 +1,181 @@
 import requests
+import heapq
+import math
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
+from datetime import datetime, timedelta, timezone
+from .activity_cache import activity_cache
+from .identity_store import identity_store, MISSING
+from .immutable_store import immutable_store
+from .resilience import send_with_retry
+from .response_cache import ResponseCache
+from .single_flight import activity_flights
+from .upstream_clients import get_session, upstream_timeout
+from .workers import get_pool
 
 logger = logging.getLogger(__name__)
 
+# 'union' serves current issues and recent activity from one JQL search,
+# 'parallel' runs the two searches at the same time
+JIRA_ACTIVITY_QUERY = os.getenv('JIRA_ACTIVITY_QUERY', 'union')
+JIRA_MAX_WORKERS = int(os.getenv('JIRA_MAX_WORKERS', 8))
+
+# Issues per search page and the most issues one search may pull
+JIRA_PAGE_SIZE = int(os.getenv('JIRA_PAGE_SIZE', 50))
+JIRA_MAX_ITEMS = int(os.getenv('JIRA_MAX_ITEMS', 200))
+JIRA_MAX_PAGES = int(os.getenv('JIRA_MAX_PAGES', 10))
+
+# Records returned per user; totals beyond these come from count queries
+CURRENT_ISSUES_LIMIT = 20
+RECENT_ACTIVITY_LIMIT = 10
+
+# Seconds a response is served from the cache, by endpoint
+JIRA_CACHE_TTLS = {
+    '/user/search': 3600,
+    '/search/jql': 60,
+    '/search/approximate-count': 60,
+}
+
+response_cache = ResponseCache(int(os.getenv('JIRA_CACHE_MAX_ENTRIES', 1000)))
+
+# Earliest time an issue record can sort at, for timestamps that do not parse
+_NO_TIME = datetime.min.replace(tzinfo=timezone.utc)
+# Done issues count as recent activity for this long
+DONE_WINDOW = 7 * 24 * 3600
+# Narrowed searches look back in steps of this many minutes, so repeated ones share a response cache key
+DONE_SINCE_STEP_MINUTES = 5
+# Most stored Done issues a narrowed search re-checks by key; users with more get the week-wide search
+DONE_INDEX_MAX_KEYS = 50
+# Most issues one search pulls before _iter_issues stops early
+SEARCH_LIMIT = min(JIRA_MAX_ITEMS, JIRA_MAX_PAGES * JIRA_PAGE_SIZE)
+
+
+def _updated_at(record: Dict) -> datetime:
+    try:
+        return datetime.fromisoformat(record['updated'])
+    except (TypeError, ValueError):
+        return _NO_TIME
+
+
+class DoneIssueIndex:
+    """Per assignee, when their issues were last searched and every Done issue of the week as of then
+
+    Only keys into the immutable store are kept here, so the next search
+    can ask JIRA for the Done issues updated since and take the others
+    from the store. An entry is only written when the search proved it
+    saw all of the week's Done issues.
+    """
+
+    def __init__(self, max_entries: int = int(os.getenv('JIRA_CACHE_MAX_ENTRIES', 1000))):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, List[Tuple[str, str]]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Tuple[float, List[Tuple[str, str]]]]:
+        with self._lock:
+            return self._entries.get(user_id)
+
+    def put(self, user_id: str, searched_at: float, keys: List[Tuple[str, str]]):
+        with self._lock:
+            self._entries[user_id] = (searched_at, keys)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop(self, user_id: str):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+done_issue_index = DoneIssueIndex()
+
+
+class DoneIssueMerge:
+    """One union search's results merged newest first with the stored Done issues it did not ask for
+
+    An issue's newest record wins. Issues the search returns that are no
+    longer assigned to the user (re-checked stored keys) are dropped along
+    with their stored record. Results come newest first, so the search was
+    read far enough to have seen every Done issue in its window once a
+    result older than the window was read, or once it ended before
+    SEARCH_LIMIT; only then is the index updated from it.
+    """
+
+    def __init__(self, jira, user_id: str, known_done: List[Dict], window_start: float):
+        self.jira = jira
+        self.user_id = user_id
+        self.known_done = known_done
+        self.window_start = datetime.fromtimestamp(window_start, timezone.utc)
+        self.fresh: List[Dict] = []
+        # None marks an issue that left the user; its record still sorts it ahead of the stored one
+        self.searched: Dict[str, Optional[Dict]] = {}
+        self.complete = False
+
+    def add(self, issue: Dict) -> Dict:
+        """Take one raw search result, returning its record"""
+        record = self.jira._parse_issue(issue)
+        assignee = (issue['fields'].get('assignee') or {}).get('accountId')
+        self.searched[record['key']] = record if assignee in (None, self.user_id) else None
+        self.fresh.append(record)
+        if _updated_at(record) < self.window_start:
+            self.complete = True
+        return record
+
+    def ended(self):
+        """Note that the search ran out of results"""
+        if len(self.fresh) < SEARCH_LIMIT:
+            self.complete = True
+
+    def read(self, raw_issues: Iterable[Dict]) -> Iterator[Dict]:
+        """Records for raw search results, taken as they are pulled"""
+        for issue in raw_issues:
+            yield self.add(issue)
+        self.ended()
+
+    def finish(self, raw_issues: Iterator[Dict]):
+        """Keep pulling the search until its whole window was seen, giving up if a page fails"""
+        try:
+            while not self.complete:
+                issue = next(raw_issues, None)
+                if issue is None:
+                    self.ended()
+                    return
+                self.add(issue)
+        except JiraSearchError:
+            return
+
+    def records(self, fresh: Iterable[Dict]) -> Iterator[Dict]:
+        """Searched records merged with the stored ones, newest first"""
+        keys = set()
+        for record in heapq.merge(fresh, self.known_done, key=_updated_at, reverse=True):
+            if record['key'] in keys:
+                continue
+            keys.add(record['key'])
+            if self.searched.get(record['key'], record) is not None:
+                yield record
+
+    def done_keys(self) -> Optional[List[Tuple[str, str]]]:
+        """Store keys of every Done issue of the week, None if the search was not read far enough to know"""
+        if not self.complete:
+            return None
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=DONE_WINDOW)
+        records = [record for record in self.searched.values() if record is not None]
+        records += [record for record in self.known_done if record['key'] not in self.searched]
+        return [(record['key'], record['updated']) for record in records
+                if record['status'] == 'Done' and _updated_at(record) >= cutoff]
+
+
+class JiraSearchError(Exception):
+    """Raised by paginated searches when a page cannot be fetched"""
+
 
 class JiraService:
     """JIRA API client for fetching user activity"""
@@ -17,39 +188,67 @@ class JiraService:
         if not all([self.base_url, self.email, self.api_token]):
             logger.warning("JIRA configuration incomplete. Check environment variables.")
         
-        self.session = requests.Session()
-        self.session.auth = (self.email, self.api_token)
-        self.session.headers.update({
+        self.session = get_session('jira', headers={
             'Accept': 'application/json',
             'Content-Type': 'application/json'
-        })
+        }, auth=(self.email, self.api_token))
+        self.timeout = upstream_timeout('jira')
     
-    def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
-        """Make authenticated request to JIRA API"""
+    def _make_request(self, endpoint: str, params: Dict = None, body: Dict = None) -> Dict:
+        """Make authenticated request to JIRA API, POSTing body for read-only query endpoints"""
+        ttl = JIRA_CACHE_TTLS.get(endpoint, 0)
+        cache_key = ResponseCache.make_key(endpoint, dict(params or {}, **(body or {})))
+        if ttl:
+            cached = response_cache.lookup(cache_key)
+            if cached and cached.is_fresh():
+                return {'success': True, 'data': cached.data}
+        
         try:
             url = f"{self.base_url}/rest/api/3{endpoint}"
-            response = self.session.get(url, params=params, timeout=10)
+            if body is not None:
+                send = lambda: self.session.post(url, params=params, json=body, timeout=self.timeout)
+            else:
+                send = lambda: self.session.get(url, params=params, timeout=self.timeout)
+            response = send_with_retry('jira', send)
             response.raise_for_status()
-            return {'success': True, 'data': response.json()}
+            data = response.json()
+            if ttl:
+                response_cache.set(cache_key, data, ttl)
+            return {'success': True, 'data': data}
         except requests.exceptions.RequestException as e:
-            error_msg = str(e)
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 401:
-                    error_msg = "Authentication failed. Check JIRA credentials."
-                elif e.response.status_code == 404:
-                    error_msg = "User not found in JIRA."
-                else:
-                    try:
-                        error_data = e.response.json()
-                        error_msg = error_data.get('errorMessages', [error_msg])[0]
-                    except:
-                        pass
-            
+            error_msg = self._error_message(e)
             logger.error(f"JIRA API error: {error_msg}")
             return {'success': False, 'error': error_msg}
     
+    def _error_message(self, e: Exception) -> str:
+        """Describe a failed request, using JIRA's error response when there is one"""
+        error_msg = str(e)
+        response = getattr(e, 'response', None)
+        if response is not None:
+            if response.status_code == 401:
+                error_msg = "Authentication failed. Check JIRA credentials."
+            elif response.status_code == 404:
+                error_msg = "User not found in JIRA."
+            else:
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get('errorMessages', [error_msg])[0]
+                except:
+                    pass
+        return error_msg
+    
     def get_user_activity(self, username: str) -> Dict:
-        """Get JIRA activity for a user"""
+        """Get JIRA activity for a user, served stale-while-revalidate from the activity cache"""
+        return activity_cache.get(('jira', username), lambda: self._load_user_activity(username))
+    
+    def _load_user_activity(self, username: str) -> Dict:
+        """Fetch JIRA activity for a user, sharing the fetch with concurrent lookups"""
+        # Lookups after an invalidation do not join a fetch that began before it
+        key = ('jira', username)
+        return activity_flights.do(key + (activity_cache.generation(key),), lambda: self._fetch_user_activity(username))
+    
+    def _fetch_user_activity(self, username: str) -> Dict:
+        """Fetch JIRA activity for a user from the API"""
         try:
             # Find user
             user_search = self._find_user(username)
@@ -64,40 +263,30 @@ class JiraService:
                     'error_type': 'user_not_found'
                 }
             
+            # Get assigned issues and recent activity
             user_id = found_user['account_id']
-            user_display_name = found_user['display_name']
-            
-            # Get assigned issues
-            current_issues = self._get_assigned_issues(user_id)
-            recent_activity = self._get_recent_activity(user_id)
-            
-            # If no issues found at all, be explicit
-            if not current_issues and not recent_activity:
-                return {
-                    'success': True,
-                    'data': {
-                        'user': {
-                            'username': username,
-                            'display_name': user_display_name,
-                            'account_id': user_id
-                        },
-                        'summary': {
-                            'total_assigned_issues': 0,
-                            'recent_activity_count': 0,
-                            'status_breakdown': {}
-                        },
-                        'current_issues': [],
-                        'recent_activity': [],
-                        'message': f"{user_display_name} has no assigned issues or recent activity in JIRA."
-                    }
-                }
+            current_issues, recent_activity = self._get_issues_and_activity(user_id)
+            totals = self._issue_totals(user_id, current_issues, recent_activity)
             
-            # Status breakdown
-            status_counts = {}
-            for issue in current_issues:
-                status = issue['status']
-                status_counts[status] = status_counts.get(status, 0) + 1
+            return self._build_activity(username, found_user, current_issues, recent_activity, totals)
             
+        except Exception as e:
+            logger.error(f"Error getting JIRA user activity: {str(e)}")
+            return {
+                'success': False,
+                'error': f"Failed to get JIRA activity for '{username}': {str(e)}",
+                'error_type': 'api_error'
+            }
+    
+    def _build_activity(self, username: str, found_user: Dict, current_issues: List[Dict],
+                        recent_activity: List[Dict], totals: Optional[Dict] = None) -> Dict:
+        """Assemble the activity response for a resolved user"""
+        totals = totals or {}
+        user_id = found_user['account_id']
+        user_display_name = found_user['display_name']
+        
+        # If no issues found at all, be explicit
+        if not current_issues and not recent_activity:
             return {
                 'success': True,
                 'data': {
@@ -107,31 +296,210 @@ class JiraService:
                         'account_id': user_id
                     },
                     'summary': {
-                        'total_assigned_issues': len(current_issues),
-                        'recent_activity_count': len(recent_activity),
-                        'status_breakdown': status_counts
+                        'total_assigned_issues': 0,
+                        'recent_activity_count': 0,
+                        'status_breakdown': {}
                     },
-                    'current_issues': current_issues[:10],
-                    'recent_activity': recent_activity[:5]
+                    'current_issues': [],
+                    'recent_activity': [],
+                    'message': f"{user_display_name} has no assigned issues or recent activity in JIRA."
                 }
             }
-            
-        except Exception as e:
-            logger.error(f"Error getting JIRA user activity: {str(e)}")
-            return {
-                'success': False,
-                'error': f"Failed to get JIRA activity for '{username}': {str(e)}",
-                'error_type': 'api_error'
+        
+        # Status breakdown
+        status_counts = {}
+        for issue in current_issues:
+            status = issue['status']
+            status_counts[status] = status_counts.get(status, 0) + 1
+        
+        return {
+            'success': True,
+            'data': {
+                'user': {
+                    'username': username,
+                    'display_name': user_display_name,
+                    'account_id': user_id
+                },
+                'summary': {
+                    'total_assigned_issues': totals.get('assigned', len(current_issues)),
+                    'recent_activity_count': totals.get('recent', len(recent_activity)),
+                    'status_breakdown': status_counts
+                },
+                'current_issues': current_issues[:10],
+                'recent_activity': recent_activity[:5]
             }
+        }
+    
+    def get_team_activity(self, usernames: List[str], batch_size: int = 20) -> Dict[str, Dict]:
+        """Get JIRA activity for many users with one assignee-in search per batch"""
+        results, resolved = self._resolve_team({username: self._find_user(username) for username in usernames})
+        
+        names = list(resolved)
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            account_ids = [resolved[username]['account_id'] for username in batch]
+            issues_by_assignee = self._search_assigned_batch(account_ids)
+            results.update(self._team_batch_results(batch, resolved, issues_by_assignee))
+        
+        return results
+    
+    def _resolve_team(self, user_searches: Dict[str, Dict]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """Split user searches into error results and resolved users"""
+        results = {}
+        resolved = {}
+        for username, user_search in user_searches.items():
+            if not user_search['success']:
+                results[username] = user_search
+            elif not user_search['data']:
+                results[username] = {
+                    'success': False,
+                    'error': f"User '{username}' not found in JIRA. Please check the username or email address.",
+                    'error_type': 'user_not_found'
+                }
+            else:
+                resolved[username] = user_search['data']
+        return results, resolved
+    
+    def _team_batch_results(self, batch: List[str], resolved: Dict[str, Dict],
+                            issues_by_assignee: Optional[Dict[str, List[Dict]]]) -> Dict[str, Dict]:
+        """Activity for each user of a batch from its grouped search results"""
+        results = {}
+        for username in batch:
+            if issues_by_assignee is None:
+                results[username] = {
+                    'success': False,
+                    'error': f"Failed to get JIRA activity for '{username}'",
+                    'error_type': 'api_error'
+                }
+                continue
+            
+            found_user = resolved[username]
+            records = [self._parse_issue(issue) for issue in issues_by_assignee.get(found_user['account_id'], [])]
+            current_issues, recent_activity = self._split_records(records)
+            results[username] = self._build_activity(
+                username, found_user, current_issues, recent_activity, self._record_totals(records)
+            )
+        return results
+    
+    def _search_assigned_batch(self, account_ids: List[str]) -> Optional[Dict[str, List[Dict]]]:
+        """Get raw open or recently updated issues for several assignees, grouped by assignee"""
+        raw_issues = self._search_issues(self._assigned_batch_params(account_ids),
+                                         max_items=JIRA_MAX_ITEMS * len(account_ids))
+        if raw_issues is None:
+            return None
+        return self._group_by_assignee(raw_issues)
+    
+    def _assigned_batch_params(self, account_ids: List[str]) -> Dict:
+        """Search parameters for the open or recently updated issues of several assignees"""
+        assignees = ', '.join(f'"{account_id}"' for account_id in account_ids)
+        return {
+            'jql': f'assignee in ({assignees}) AND (status != Done OR updated >= -7d) ORDER BY updated DESC',
+            'maxResults': 100,
+            'fields': 'key,summary,status,priority,updated,created,assignee'
+        }
+    
+    def _group_by_assignee(self, raw_issues: List[Dict]) -> Dict[str, List[Dict]]:
+        """Group raw issues by their assignee's account ID"""
+        grouped: Dict[str, List[Dict]] = {}
+        for issue in raw_issues:
+            assignee = (issue['fields'].get('assignee') or {}).get('accountId')
+            grouped.setdefault(assignee, []).append(issue)
+        return grouped
+    
+    def _iter_issues(self, params: Dict, page_size: int = JIRA_PAGE_SIZE,
+                     max_items: int = JIRA_MAX_ITEMS) -> Iterator[Dict]:
+        """Yield raw issues from a JQL search lazily, following nextPageToken
+        
+        Stops after max_items issues or JIRA_MAX_PAGES pages. Raises
+        JiraSearchError if a page cannot be fetched.
+        """
+        params = dict(params, maxResults=min(page_size, max_items))
+        yielded = 0
+        for _ in range(JIRA_MAX_PAGES):
+            result = self._make_request('/search/jql', params)
+            if not result['success']:
+                raise JiraSearchError(result['error'])
+            
+            for issue in result['data'].get('issues', []):
+                yield issue
+                yielded += 1
+                if yielded >= max_items:
+                    return
+            
+            next_page = result['data'].get('nextPageToken')
+            if not next_page or result['data'].get('isLast', False):
+                return
+            params = dict(params, nextPageToken=next_page)
+    
+    def _search_issues(self, params: Dict, max_items: int = JIRA_MAX_ITEMS) -> Optional[List[Dict]]:
+        """Run a JQL search across pages, None if any page fails"""
+        try:
+            return list(self._iter_issues(params, params.get('maxResults', JIRA_PAGE_SIZE), max_items))
+        except JiraSearchError:
+            return None
+    
+    def _count_issues(self, jql: str) -> Optional[int]:
+        """Get JIRA's approximate count of issues matching a JQL query"""
+        result = self._make_request('/search/approximate-count', body={'jql': jql})
+        if not result['success']:
+            return None
+        return result['data'].get('count')
+    
+    def _issue_totals(self, user_id: str, current_issues: List[Dict], recent_activity: List[Dict]) -> Dict:
+        """Count queries for whichever lists hit their limit and may be truncated"""
+        queries = self._total_queries(user_id, current_issues, recent_activity)
+        if not queries:
+            return {}
+        
+        pool = get_pool('jira', JIRA_MAX_WORKERS)
+        futures = {name: pool.submit(self._count_issues, jql) for name, jql in queries.items()}
+        totals = {}
+        for name, future in futures.items():
+            count = future.result()
+            if count is not None:
+                totals[name] = count
+        return totals
+    
+    def _total_queries(self, user_id: str, current_issues: List[Dict], recent_activity: List[Dict]) -> Dict[str, str]:
+        """JQL to count each list that hit its limit, by total name"""
+        queries = {}
+        if len(current_issues) >= CURRENT_ISSUES_LIMIT:
+            queries['assigned'] = f'assignee = "{user_id}" AND status != Done'
+        if len(recent_activity) >= RECENT_ACTIVITY_LIMIT:
+            queries['recent'] = f'assignee = "{user_id}" AND updated >= -7d'
+        return queries
+    
+    def _record_totals(self, records: List[Dict]) -> Dict:
+        """Totals over a complete set of issue records"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+        return {
+            'assigned': sum(1 for record in records if record['status'] != 'Done'),
+            'recent': sum(1 for record in records if self._updated_since(record['updated'], cutoff))
+        }
     
-    def _find_user(self, username: str) -> Dict:
+    def _find_user(self, username: str, use_cache: bool = True) -> Dict:
         """Find user by username, email, or display name"""
+        if use_cache:
+            cached = identity_store.get('jira', username)
+            if cached is not MISSING:
+                return {'success': True, 'data': cached}
+        
+        result = self._search_user(username)
+        if result['success']:
+            identity_store.put('jira', username, result['data'])
+        return result
+    
+    def _search_user(self, username: str) -> Dict:
+        """Search JIRA for the best matching user"""
         result = self._make_request('/user/search', {'query': username})
         
         if not result['success']:
             return result
         
-        users = result['data']
+        return self._match_user(username, result['data'])
+    
+    def _match_user(self, username: str, users: List[Dict]) -> Dict:
+        """Pick the best matching user from a user search"""
         if not users:
             return {'success': True, 'data': None}
         
@@ -164,66 +532,215 @@ class JiraService:
         
         return {'success': True, 'data': None}
     
+    def _get_issues_and_activity(self, user_id: str) -> Tuple[List[Dict], List[Dict]]:
+        """Get assigned issues and recent activity using the configured query mode"""
+        if JIRA_ACTIVITY_QUERY == 'union':
+            return self._get_issues_and_activity_union(user_id)
+        
+        pool = get_pool('jira', JIRA_MAX_WORKERS)
+        assigned_future = pool.submit(self._get_assigned_issues, user_id)
+        recent_future = pool.submit(self._get_recent_activity, user_id)
+        return assigned_future.result(), recent_future.result()
+    
+    def _get_issues_and_activity_union(self, user_id: str) -> Tuple[List[Dict], List[Dict]]:
+        """Get assigned issues and recent activity from one JQL search split locally"""
+        searched_at = time.time()
+        since_minutes, known_done = self._known_done_issues(user_id)
+        try:
+            return self._search_union(user_id, searched_at, since_minutes, known_done)
+        except JiraSearchError:
+            if since_minutes is None:
+                return [], []
+        # A re-checked key may have been deleted, which fails the whole search
+        try:
+            return self._search_union(user_id, searched_at, None, [])
+        except JiraSearchError:
+            return [], []
+    
+    def _search_union(self, user_id: str, searched_at: float, since_minutes: Optional[int],
+                      known_done: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        merge = self._done_merge(user_id, searched_at, since_minutes, known_done)
+        issues = self._iter_issues(self._union_params(user_id, since_minutes, known_done))
+        # Pages are only pulled until both lists are full, then until the Done issues' window is covered
+        current_issues, recent_activity = self._split_records(merge.records(merge.read(issues)))
+        merge.finish(issues)
+        self._remember_done_issues(user_id, searched_at, merge)
+        return current_issues, recent_activity
+    
+    def _known_done_issues(self, user_id: str) -> Tuple[Optional[int], List[Dict]]:
+        """Minutes back to search for Done issues, and the week's Done records already stored
+        
+        None and no records when the user has no complete index from the
+        last week, it holds too many keys, or a stored record was evicted,
+        so the search covers the week.
+        """
+        seen = done_issue_index.get(user_id)
+        if seen is None:
+            return None, []
+        searched_at, keys = seen
+        if len(keys) > DONE_INDEX_MAX_KEYS:
+            return None, []
+        # Covers a search answered from the response cache and a minute of clock skew,
+        # as relative JQL dates round to the minute
+        elapsed = time.time() - searched_at + JIRA_CACHE_TTLS['/search/jql'] + 60
+        since_minutes = math.ceil(elapsed / 60 / DONE_SINCE_STEP_MINUTES) * DONE_SINCE_STEP_MINUTES
+        if since_minutes * 60 >= DONE_WINDOW:
+            return None, []
+        records = [immutable_store.get('issue', key) for key in keys]
+        if any(record is None for record in records):
+            return None, []
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=DONE_WINDOW)
+        records = [record for record in records if _updated_at(record) >= cutoff]
+        return since_minutes, sorted(records, key=_updated_at, reverse=True)
+    
+    def _done_merge(self, user_id: str, searched_at: float, since_minutes: Optional[int],
+                    known_done: List[Dict]) -> DoneIssueMerge:
+        window = since_minutes * 60 if since_minutes else DONE_WINDOW
+        return DoneIssueMerge(self, user_id, known_done, searched_at - window)
+    
+    def _remember_done_issues(self, user_id: str, searched_at: float, merge: DoneIssueMerge):
+        """Index the week's Done issues for the next search, or drop the index if the search did not see them all"""
+        keys = merge.done_keys()
+        if keys is None:
+            done_issue_index.drop(user_id)
+        else:
+            done_issue_index.put(user_id, searched_at, keys)
+    
+    def _union_params(self, user_id: str, since_minutes: Optional[int] = None, known_done: List[Dict] = ()) -> Dict:
+        """Search parameters for a user's open and recently updated issues
+        
+        With since_minutes, Done issues are only asked for if updated within
+        that many minutes, and the stored Done issues (known_done) if they
+        changed since, wherever they are assigned now; the rest of the
+        week's come from the store.
+        """
+        if since_minutes:
+            jql = f'assignee = "{user_id}" AND (status != Done OR updated >= -{since_minutes}m)'
+            if known_done:
+                keys = ', '.join(sorted(record['key'] for record in known_done))
+                jql = f'({jql}) OR (key in ({keys}) AND updated >= -{since_minutes}m)'
+        else:
+            jql = f'assignee = "{user_id}" AND (status != Done OR updated >= -7d)'
+        
+        return {
+            'jql': f'{jql} ORDER BY updated DESC',
+            'fields': 'key,summary,status,priority,updated,created,assignee'
+        }
+    
+    def _split_records(self, records: Iterable[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split issue records, newest first, into assigned issues and recent activity"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+        issues = []
+        activity = []
+        for record in records:
+            if len(issues) >= CURRENT_ISSUES_LIMIT and len(activity) >= RECENT_ACTIVITY_LIMIT:
+                break
+            if record['status'] != 'Done' and len(issues) < CURRENT_ISSUES_LIMIT:
+                issues.append(record)
+            if self._updated_since(record['updated'], cutoff) and len(activity) < RECENT_ACTIVITY_LIMIT:
+                activity.append({
+                    'key': record['key'],
+                    'summary': record['summary'],
+                    'status': record['status'],
+                    'updated': record['updated']
+                })
+        
+        return issues, activity
+    
+    def _parse_issue(self, issue: Dict) -> Dict:
+        """Convert a JIRA search result into an issue record, reusing Done issues already seen"""
+        fields = issue['fields']
+        if fields['status']['name'] == 'Done':
+            # A resolved issue that changes again moves its updated time, and so its key
+            return immutable_store.intern('issue', (issue['key'], fields['updated']), lambda: self._issue_record(issue))
+        return self._issue_record(issue)
+    
+    def _issue_record(self, issue: Dict) -> Dict:
+        """Build the issue record for a JIRA search result"""
+        fields = issue['fields']
+        return {
+            'key': issue['key'],
+            'summary': fields['summary'],
+            'status': fields['status']['name'],
+            'priority': (fields.get('priority') or {}).get('name', 'None'),
+            'updated': fields['updated'],
+            'created': fields['created']
+        }
+    
+    def _updated_since(self, date_str: str, cutoff: datetime) -> bool:
+        """Check if a JIRA timestamp is after the cutoff"""
+        try:
+            return datetime.fromisoformat(date_str) >= cutoff
+        except (TypeError, ValueError):
+            return False
+    
     def _get_assigned_issues(self, user_id: str) -> List[Dict]:
         """Get issues assigned to user"""
+        result = self._make_request('/search/jql', self._assigned_issues_params(user_id))
+        
+        if not result['success']:
+            return []
+        
+        return [self._parse_issue(issue) for issue in result['data'].get('issues', [])]
+    
+    def _assigned_issues_params(self, user_id: str) -> Dict:
+        """Search parameters for a user's open issues"""
         jql = f'assignee = "{user_id}" AND status != Done ORDER BY updated DESC'
         
-        params = {
+        return {
             'jql': jql,
-            'maxResults': 20,
+            'maxResults': CURRENT_ISSUES_LIMIT,
             'fields': 'key,summary,status,priority,updated,created'
         }
-        
-        result = self._make_request('/search/jql', params)
+    
+    def _get_recent_activity(self, user_id: str) -> List[Dict]:
+        """Get recent activity for user (last 7 days)"""
+        result = self._make_request('/search/jql', self._recent_activity_params(user_id))
         
         if not result['success']:
             return []
         
-        issues = []
-        for issue in result['data'].get('issues', []):
-            fields = issue['fields']
-            issues.append({
-                'key': issue['key'],
-                'summary': fields['summary'],
-                'status': fields['status']['name'],
-                'priority': fields.get('priority', {}).get('name', 'None'),
-                'updated': fields['updated'],
-                'created': fields['created']
-            })
-        
-        return issues
+        return self._parse_activity(result['data'].get('issues', []))
     
-    def _get_recent_activity(self, user_id: str) -> List[Dict]:
-        """Get recent activity for user (last 7 days)"""
+    def _recent_activity_params(self, user_id: str) -> Dict:
+        """Search parameters for the issues a user updated in the last 7 days"""
         jql = f'assignee = "{user_id}" AND updated >= -7d ORDER BY updated DESC'
         
-        params = {
+        return {
             'jql': jql,
-            'maxResults': 10,
+            'maxResults': RECENT_ACTIVITY_LIMIT,
             'fields': 'key,summary,status,updated'
         }
-        
-        result = self._make_request('/search/jql', params)
-        
-        if not result['success']:
-            return []
-        
+    
+    def _parse_activity(self, issues: List[Dict]) -> List[Dict]:
+        """Convert JIRA search results into recent activity records"""
         activity = []
-        for issue in result['data'].get('issues', []):
+        for issue in issues:
             fields = issue['fields']
-            activity.append({
-                'key': issue['key'],
-                'summary': fields['summary'],
-                'status': fields['status']['name'],
-                'updated': fields['updated']
-            })
+            if fields['status']['name'] == 'Done':
+                activity.append(immutable_store.intern('issue_activity', (issue['key'], fields['updated']),
+                                                       lambda: self._activity_record(issue)))
+            else:
+                activity.append(self._activity_record(issue))
         
         return activity
     
+    def _activity_record(self, issue: Dict) -> Dict:
+        """Build the recent activity record for a JIRA search result"""
+        fields = issue['fields']
+        return {
+            'key': issue['key'],
+            'summary': fields['summary'],
+            'status': fields['status']['name'],
+            'updated': fields['updated']
+        }
+    
     def test_connection(self) -> Dict:
         """Test JIRA API connection"""
-        result = self._make_request('/myself')
-        
+        return self._connection_result(self._make_request('/myself'))
+    
+    def _connection_result(self, result: Dict) -> Dict:
+        """Summarize the authenticated account from a /myself response"""
         if not result['success']:
             return result
         
@@ -0,0 +1,39 @@
+from typing import Any, Dict, Tuple
+import threading
+
+
+class Metrics:
+    """In-process counters and gauges, labelled like Prometheus series"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple, float] = {}
+        self._gauges: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple:
+        return (name,) + tuple(sorted(labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All series grouped by metric name"""
+        result: Dict[str, Any] = {}
+        with self._lock:
+            for kind, series in (('counters', self._counters), ('gauges', self._gauges)):
+                for (name, *labels), value in series.items():
+                    result.setdefault(kind, {}).setdefault(name, []).append({
+                        'labels': dict(labels),
+                        'value': value
+                    })
+        return result
+
+
+metrics = Metrics()
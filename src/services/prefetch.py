@@ -0,0 +1,143 @@
+from typing import Any, Dict, Optional, Tuple
+import logging
+import os
+import random
+import threading
+import time
+
+from .activity_cache import activity_cache
+from .metrics import metrics
+from .rate_limiter import github_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = os.getenv('PREFETCH_ENABLED', 'true').lower() == 'true'
+# Seconds between prefetch passes; kept under ACTIVITY_HARD_TTL so warm users never expire
+PREFETCH_INTERVAL = float(os.getenv('PREFETCH_INTERVAL', 300))
+# Each wait is randomized by up to this fraction of the interval, so instances do not pass in lockstep
+PREFETCH_JITTER = float(os.getenv('PREFETCH_JITTER', 0.2))
+# Share of each GitHub rate limit window the prefetcher may spend
+PREFETCH_GITHUB_BUDGET_SHARE = float(os.getenv('PREFETCH_GITHUB_BUDGET_SHARE', 0.1))
+# Users nobody asked about for this many seconds are not prefetched
+PREFETCH_INTEREST_WINDOW = float(os.getenv('PREFETCH_INTEREST_WINDOW', 86400))
+
+
+class UserInterest:
+    """When each user's activity was last asked for, by (service, upstream identifier)"""
+
+    def __init__(self):
+        self._asked: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, service: str, username: str):
+        with self._lock:
+            self._asked[(service, username)] = time.time()
+
+    def asked_within(self, service: str, username: str, window: float) -> bool:
+        with self._lock:
+            asked_at = self._asked.get((service, username))
+        return asked_at is not None and time.time() - asked_at <= window
+
+
+user_interest = UserInterest()
+
+
+class GitHubBudgetShare:
+    """Tracks what the prefetcher spent of each GitHub rate limit window
+
+    Spend is the drop in a resource's remaining budget across a prefetch,
+    so chat traffic running at the same time counts against the share too
+    and the prefetcher errs towards spending less.
+    """
+
+    def __init__(self, share: float = PREFETCH_GITHUB_BUDGET_SHARE):
+        self.share = share
+        # resource -> (reset_at of the window, requests spent in it)
+        self._spent: Dict[str, Tuple[Optional[float], int]] = {}
+
+    def exhausted(self) -> bool:
+        """True if the share of any resource's current window is spent"""
+        for resource, info in github_rate_limiter.snapshot().items():
+            window, spent = self._spent.get(resource, (None, 0))
+            if info['limit'] and window == info['reset_at'] and spent >= info['limit'] * self.share:
+                return True
+        return False
+
+    def charge(self, before: Dict[str, Any], after: Dict[str, Any]):
+        """Add the budget used between two rate limiter snapshots"""
+        for resource, info in after.items():
+            previous = before.get(resource)
+            if not previous or previous['remaining'] is None or info['remaining'] is None:
+                continue
+            # A window that rolled over mid-fetch has no meaningful difference
+            if previous['reset_at'] != info['reset_at']:
+                continue
+            window, spent = self._spent.get(resource, (info['reset_at'], 0))
+            if window != info['reset_at']:
+                spent = 0
+            self._spent[resource] = (info['reset_at'], spent + max(previous['remaining'] - info['remaining'], 0))
+
+
+class ActivityPrefetcher:
+    """Background thread keeping mapped users' activity warm in the activity cache
+
+    The first pass runs at startup over every mapped user, so the first
+    question after a deploy is answered from the cache. Later passes, on a
+    jittered PREFETCH_INTERVAL, only refresh users asked about within
+    PREFETCH_INTEREST_WINDOW. Entries still fresh (from a recent question)
+    are skipped, and GitHub refreshes stop for the rest of a rate limit
+    window once PREFETCH_GITHUB_BUDGET_SHARE of it is spent.
+    """
+
+    def __init__(self, jira, github, mapping, interval: float = PREFETCH_INTERVAL):
+        self.jira = jira
+        self.github = github
+        self.mapping = mapping
+        self.interval = interval
+        self.budget = GitHubBudgetShare()
+        self._stop = threading.Event()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='activity-prefetch', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        warm = True
+        while not self._stop.is_set():
+            try:
+                self.prefetch_all(warm)
+            except Exception as e:
+                logger.error(f"Activity prefetch failed: {str(e)}")
+            warm = False
+            self._stop.wait(self.interval * (1 + random.uniform(-PREFETCH_JITTER, PREFETCH_JITTER)))
+
+    def prefetch_all(self, warm: bool = False) -> Tuple[int, int]:
+        """Refresh activity for recently asked-about users, or every mapped user when warming"""
+        jira_refreshed = github_refreshed = 0
+        for user in list(self.mapping.users.values()):
+            if self._stop.is_set():
+                break
+            email, login = user.get('email'), user.get('github')
+
+            if email and (warm or user_interest.asked_within('jira', email, PREFETCH_INTEREST_WINDOW)):
+                if activity_cache.refresh(('jira', email), lambda: self.jira._load_user_activity(email)):
+                    jira_refreshed += 1
+
+            if login and (warm or user_interest.asked_within('github', login, PREFETCH_INTEREST_WINDOW)):
+                if self.budget.exhausted():
+                    metrics.increment('prefetch_skipped', service='github', reason='budget')
+                    continue
+                before = github_rate_limiter.snapshot()
+                if activity_cache.refresh(('github', login), lambda: self.github._load_user_activity(login)):
+                    github_refreshed += 1
+                self.budget.charge(before, github_rate_limiter.snapshot())
+
+        metrics.increment('prefetch_refreshes', jira_refreshed, service='jira')
+        metrics.increment('prefetch_refreshes', github_refreshed, service='github')
+        if jira_refreshed or github_refreshed:
+            logger.info(f"Prefetched activity for {jira_refreshed} JIRA and {github_refreshed} GitHub users")
+        return jira_refreshed, github_refreshed
@@ -0,0 +1,180 @@
+from typing import Any, Dict, Mapping, Optional
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# GitHub asks clients to wait at least a minute after a secondary limit without Retry-After
+SECONDARY_LIMIT_BACKOFF = 60
+
+# How GitHub words secondary limit errors; other 403s (SSO, token scopes) are not rate limits
+SECONDARY_LIMIT_MESSAGE = re.compile(r'secondary rate limit|abuse', re.IGNORECASE)
+
+
+class RateLimitBucket:
+    """Budget for one GitHub rate limit resource (core, search, graphql)"""
+
+    def __init__(self, resource: str, burst: int):
+        self.resource = resource
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.blocked_until = 0.0
+        self.tokens = float(burst)
+        self.last_refill = time.time()
+
+
+class GitHubRateLimiter:
+    """Token bucket scheduler that paces GitHub calls to the advertised rate limits
+
+    The refill rate spreads the remaining budget evenly until the reset
+    time, so a burst of lookups slows down instead of exhausting the limit.
+    Background work keeps a reserve free for interactive chat traffic and
+    yields to interactive callers waiting on the same resource.
+    """
+
+    def __init__(self, burst: int = 10, background_reserve: float = 0.2):
+        self.burst = burst
+        self.background_reserve = background_reserve
+        self._buckets: Dict[str, RateLimitBucket] = {}
+        self._interactive_waiting: Dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    def _bucket(self, resource: str) -> RateLimitBucket:
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            bucket = RateLimitBucket(resource, self.burst)
+            self._buckets[resource] = bucket
+        return bucket
+
+    def _refill(self, bucket: RateLimitBucket, now: float):
+        """Add tokens at the rate that spends the remaining budget by the reset time"""
+        if bucket.reset_at is not None and now >= bucket.reset_at:
+            # The window rolled over since the last response we saw
+            bucket.remaining = bucket.limit
+            bucket.reset_at = None
+
+        if bucket.remaining is None or bucket.reset_at is None:
+            bucket.tokens = float(self.burst)
+        else:
+            rate = bucket.remaining / max(bucket.reset_at - now, 1.0)
+            bucket.tokens = min(float(self.burst), bucket.tokens + (now - bucket.last_refill) * rate)
+        bucket.last_refill = now
+
+    def _wait_time(self, bucket: RateLimitBucket, priority: str, now: float) -> float:
+        """Seconds until a request with this priority may be sent"""
+        if now < bucket.blocked_until:
+            return bucket.blocked_until - now
+
+        self._refill(bucket, now)
+
+        if bucket.remaining is not None:
+            reserve = math.ceil((bucket.limit or 0) * self.background_reserve) if priority == BACKGROUND else 0
+            if bucket.remaining <= reserve:
+                return max((bucket.reset_at or now) - now, 1.0)
+
+        if bucket.tokens >= 1:
+            return 0.0
+
+        rate = bucket.remaining / max(bucket.reset_at - now, 1.0) if bucket.remaining else 0
+        return (1 - bucket.tokens) / rate if rate else max(bucket.reset_at - now, 1.0)
+
+    def acquire(self, resource: str, priority: str = INTERACTIVE, max_wait: float = 10.0) -> bool:
+        """Wait for a request slot, returning False if none frees up within max_wait"""
+        deadline = time.time() + max_wait
+        with self._cond:
+            if priority == INTERACTIVE:
+                self._interactive_waiting[resource] = self._interactive_waiting.get(resource, 0) + 1
+            try:
+                bucket = self._bucket(resource)
+                while True:
+                    now = time.time()
+                    wait = self._wait_time(bucket, priority, now)
+                    if wait == 0 and priority == BACKGROUND and self._interactive_waiting.get(resource):
+                        wait = 0.05
+                    if wait == 0:
+                        bucket.tokens -= 1
+                        if bucket.remaining:
+                            bucket.remaining -= 1
+                        return True
+                    if now + wait > deadline:
+                        return False
+                    self._cond.wait(wait)
+            finally:
+                if priority == INTERACTIVE:
+                    self._interactive_waiting[resource] -= 1
+                self._cond.notify_all()
+
+    def record(self, resource: str, status_code: int, headers: Mapping[str, str], body: str = ''):
+        """Update the budget from a response's rate limit headers
+
+        A 403 or 429 pauses the bucket only when it is a rate limit: with
+        Retry-After, with no budget remaining, or (429, or a 403 whose body
+        names a secondary limit) for SECONDARY_LIMIT_BACKOFF.
+        """
+        with self._cond:
+            bucket = self._bucket(headers.get('X-RateLimit-Resource', resource))
+            if 'X-RateLimit-Remaining' in headers:
+                bucket.limit = int(headers.get('X-RateLimit-Limit', bucket.limit or 0))
+                bucket.remaining = int(headers['X-RateLimit-Remaining'])
+                bucket.reset_at = float(headers.get('X-RateLimit-Reset', time.time() + 3600))
+
+            if status_code in (403, 429):
+                blocked_until = None
+                retry_after = headers.get('Retry-After')
+                if retry_after is not None:
+                    blocked_until = time.time() + float(retry_after)
+                elif bucket.remaining == 0 and bucket.reset_at:
+                    blocked_until = bucket.reset_at
+                elif status_code == 429 or SECONDARY_LIMIT_MESSAGE.search(body or ''):
+                    blocked_until = time.time() + SECONDARY_LIMIT_BACKOFF
+                if blocked_until is not None:
+                    bucket.blocked_until = blocked_until
+                    logger.warning(f"GitHub {bucket.resource} rate limit hit, pausing until {time.ctime(blocked_until)}")
+
+            self._cond.notify_all()
+
+    def record_response(self, resource: str, response):
+        """record() for a requests or httpx response, reading the body only for 403 and 429"""
+        body = response.text if response.status_code in (403, 429) else ''
+        self.record(resource, response.status_code, response.headers, body)
+
+    def record_limits(self, resources: Dict[str, Dict]):
+        """Update every bucket from a /rate_limit response"""
+        with self._cond:
+            for resource, info in resources.items():
+                bucket = self._bucket(resource)
+                bucket.limit = info.get('limit')
+                bucket.remaining = info.get('remaining')
+                bucket.reset_at = float(info.get('reset', time.time() + 3600))
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Remaining budget per resource"""
+        with self._cond:
+            now = time.time()
+            return {
+                resource: {
+                    'limit': bucket.limit,
+                    'remaining': bucket.remaining,
+                    'reset_at': bucket.reset_at,
+                    'reset_in': round(max(bucket.reset_at - now, 0)) if bucket.reset_at else None,
+                    'blocked_for': round(max(bucket.blocked_until - now, 0)),
+                    'interactive_waiting': self._interactive_waiting.get(resource, 0)
+                }
+                for resource, bucket in self._buckets.items()
+            }
+
+
+# One token means one budget, so every GitHubService shares the same limiter
+github_rate_limiter = GitHubRateLimiter(
+    burst=int(os.getenv('GITHUB_RATE_BURST', 10)),
+    background_reserve=float(os.getenv('GITHUB_BACKGROUND_RESERVE', 0.2))
+)
@@ -0,0 +1,199 @@
+from typing import Awaitable, Callable, Dict
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+import httpx
+import requests
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent requests"""
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.5, max_delay: float = 4.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to sleep before retry number attempt (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fail fast while an upstream is down, probing it again after a cool-down
+
+    After failure_threshold consecutive failures the breaker opens and
+    rejects calls for recovery_timeout seconds. It then half-opens and
+    lets one probe through: success closes it, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        metrics.set_gauge('circuit_breaker_state', STATE_VALUES[CLOSED], upstream=name)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker for {self.name}: {self.state} -> {state}")
+        self.state = state
+        metrics.increment('circuit_breaker_transitions', upstream=self.name, state=state)
+        metrics.set_gauge('circuit_breaker_state', STATE_VALUES[state], upstream=self.name)
+
+    def allow(self) -> bool:
+        """Check whether a call may go to the upstream right now"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a probe through"""
+        return max(self.recovery_timeout - (time.monotonic() - self.opened_at), 0)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+
+def _env_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_retries=int(os.getenv('UPSTREAM_MAX_RETRIES', 2)),
+        base_delay=float(os.getenv('UPSTREAM_RETRY_BASE_DELAY', 0.5)),
+        max_delay=float(os.getenv('UPSTREAM_RETRY_MAX_DELAY', 4))
+    )
+
+
+retry_policy = _env_policy()
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for an upstream"""
+    with _breakers_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                upstream,
+                failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5)),
+                recovery_timeout=float(os.getenv('CIRCUIT_RECOVERY_TIMEOUT', 30))
+            )
+            _breakers[upstream] = breaker
+        return breaker
+
+
+def send_with_retry(upstream: str, send: Callable[[], requests.Response],
+                    policy: RetryPolicy = None) -> requests.Response:
+    """Send an idempotent request, retrying transient failures behind the upstream's breaker
+
+    Timeouts, connection errors and 5xx responses are retried. The last
+    5xx response is returned once retries run out so the caller's normal
+    error handling applies.
+    """
+    policy = policy or retry_policy
+    breaker = get_breaker(upstream)
+
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{upstream} is unavailable (circuit open), retrying in {breaker.retry_in():.0f}s")
+
+        try:
+            response = send()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            breaker.record_failure()
+            if attempt >= policy.max_retries:
+                raise
+            logger.warning(f"{upstream} request failed ({e.__class__.__name__}), retrying")
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt >= policy.max_retries:
+                return response
+            logger.warning(f"{upstream} returned {response.status_code}, retrying")
+
+        metrics.increment('upstream_retries', upstream=upstream)
+        time.sleep(policy.delay(attempt))
+        attempt += 1
+
+
+async def async_send_with_retry(upstream: str, send: Callable[[], Awaitable[httpx.Response]],
+                                policy: RetryPolicy = None) -> httpx.Response:
+    """send_with_retry for async httpx requests, sharing the upstream's breaker and retry policy"""
+    policy = policy or retry_policy
+    breaker = get_breaker(upstream)
+
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{upstream} is unavailable (circuit open), retrying in {breaker.retry_in():.0f}s")
+
+        try:
+            response = await send()
+        except (httpx.TimeoutException, httpx.NetworkError) as e:
+            breaker.record_failure()
+            if attempt >= policy.max_retries:
+                raise
+            logger.warning(f"{upstream} request failed ({e.__class__.__name__}), retrying")
+        except httpx.HTTPError:
+            breaker.record_failure()
+            raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt >= policy.max_retries:
+                return response
+            logger.warning(f"{upstream} returned {response.status_code}, retrying")
+
+        metrics.increment('upstream_retries', upstream=upstream)
+        await asyncio.sleep(policy.delay(attempt))
+        attempt += 1
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+import threading
+import time
+
+
+class CacheEntry:
+    """Cached upstream response with its expiry and validators"""
+
+    def __init__(self, data: Any, ttl: float, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 links: Optional[Dict] = None):
+        self.data = data
+        self.expires_at = time.monotonic() + ttl
+        self.etag = etag
+        self.last_modified = last_modified
+        # Pagination links of the cached page, so cached pages can still be followed
+        self.links = links or {}
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Bounded in-process cache of upstream responses with TTL expiry and LRU eviction
+
+    Expired entries stay until evicted so they can be revalidated with
+    their ETag / Last-Modified instead of being downloaded again.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict] = None) -> str:
+        """Build a cache key from an endpoint and its query parameters"""
+        if not params:
+            return endpoint
+        return f"{endpoint}?{urlencode(sorted(params.items()))}"
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry for a key, fresh or expired, counting a hit only if fresh"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if entry.is_fresh():
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def set(self, key: str, data: Any, ttl: float, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            links: Optional[Dict] = None):
+        """Store a response, evicting the least recently used entries when full"""
+        with self._lock:
+            self._entries[key] = CacheEntry(data, ttl, etag, last_modified, links)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, key: str, ttl: float) -> Optional[CacheEntry]:
+        """Extend an entry after the upstream confirmed it is unchanged (304)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = time.monotonic() + ttl
+            self.revalidations += 1
+            return entry
+
+    def invalidate(self, fragment: str) -> int:
+        """Drop every entry whose key contains the fragment"""
+        with self._lock:
+            keys = [key for key in self._entries if fragment in key]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, eviction and revalidation counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'revalidations': self.revalidations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
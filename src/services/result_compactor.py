@@ -0,0 +1,163 @@
+from typing import Any, Dict, List, Optional, Set
+import json
+import os
+import re
+
+from .metrics import metrics
+
+# Tokens a single tool result may use in the follow-up completion
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv('TOOL_RESULT_TOKEN_BUDGET', 600))
+
+# Tables per tool, with the question words that ask for each. When the
+# question names none of a tool's tables, every table is included.
+SECTION_KEYWORDS = {
+    'get_jira_activity': {
+        'current_issues': ('issue', 'ticket', 'task', 'assign', 'backlog', 'story', 'bug', 'status', 'open'),
+        'recent_activity': ('done', 'finish', 'complet', 'close', 'resolv'),
+    },
+    'get_github_activity': {
+        'recent_commits': ('commit', 'push', 'code', 'coding', 'change'),
+        'repositories': ('repo', 'project', 'language', 'codebase'),
+        'pull_requests': ('pr', 'prs', 'pull', 'review', 'merge'),
+    },
+}
+
+# Columns only sent when the question asks for them
+OPTIONAL_COLUMNS = {
+    'priority': ('priorit', 'urgent', 'blocker', 'critical'),
+    'created': ('created', 'opened', 'since', 'old'),
+    'sha': ('sha', 'hash'),
+    'stats': ('line', 'much', 'diff', 'churn', 'addition', 'added', 'delet', 'size', 'big', 'files'),
+    'url': ('link', 'url'),
+}
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when installed, else estimate ~4 characters per token"""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _words(question: str) -> Set[str]:
+    return set(re.findall(r'[a-z0-9]+', (question or '').lower()))
+
+
+def _asks_for(words: Set[str], keywords) -> bool:
+    # 'pr' style keywords must match whole words, longer ones match as prefixes
+    return any(word == keyword or (len(keyword) > 3 and word.startswith(keyword))
+               for word in words for keyword in keywords)
+
+
+def _table(columns: List[str], records: List[Dict], ditto: Optional[str] = None) -> Dict:
+    """Encode records as column names plus value rows, dates cut to the day
+
+    With ditto set, that column is left empty when it repeats the row above.
+    """
+    rows = []
+    previous = None
+    for record in records:
+        row = []
+        for column in columns:
+            value = record.get(column)
+            if column in ('updated', 'created', 'date', 'updated_at', 'created_at') and value:
+                value = value[:10]
+            if column == ditto:
+                value, previous = ('' if value == previous else value), value
+            row.append(value)
+        rows.append(row)
+    return {'columns': columns, 'rows': rows}
+
+
+def _jira_tables(data: Dict, words: Set[str]) -> Dict[str, Dict]:
+    columns = ['key', 'summary', 'status', 'updated']
+    if _asks_for(words, OPTIONAL_COLUMNS['priority']):
+        columns.insert(3, 'priority')
+    if _asks_for(words, OPTIONAL_COLUMNS['created']):
+        columns.append('created')
+
+    current = data.get('current_issues', [])
+    # Recent activity mostly repeats current issues, which already carry their update date
+    current_keys = {issue['key'] for issue in current}
+    recent = [item for item in data.get('recent_activity', []) if item['key'] not in current_keys]
+    return {
+        'current_issues': _table(columns, current),
+        'recent_activity': _table(['key', 'summary', 'status', 'updated'], recent),
+    }
+
+
+def _github_tables(data: Dict, words: Set[str]) -> Dict[str, Dict]:
+    commit_columns = ['repository', 'date', 'message']
+    if _asks_for(words, OPTIONAL_COLUMNS['sha']):
+        commit_columns.insert(1, 'sha')
+    commits = data.get('recent_commits', [])
+    # Only when commits were enriched with stats and the question is about how much changed
+    if _asks_for(words, OPTIONAL_COLUMNS['stats']) and any('additions' in commit for commit in commits):
+        commit_columns.extend(['additions', 'deletions', 'files_changed'])
+    pr_columns = ['number', 'title', 'state', 'repository', 'updated_at']
+    if _asks_for(words, OPTIONAL_COLUMNS['url']):
+        pr_columns.append('url')
+
+    return {
+        'recent_commits': _table(commit_columns, commits, ditto='repository'),
+        'repositories': _table(['name', 'language', 'updated_at', 'description'], data.get('repositories', [])),
+        'pull_requests': _table(pr_columns, data.get('pull_requests', [])),
+    }
+
+
+TABLE_BUILDERS = {
+    'get_jira_activity': _jira_tables,
+    'get_github_activity': _github_tables,
+}
+
+
+def compact_tool_result(function_name: str, result: Dict[str, Any], question: str,
+                        budget: int = TOOL_RESULT_TOKEN_BUDGET) -> str:
+    """Encode a tool result for the model within a token budget
+
+    Records become tables of only the columns the question needs, tables
+    the question does not ask about are left out, and the oldest rows of
+    the largest table are dropped until the result fits. Dropped rows are
+    reported under 'omitted' so the model knows the lists are partial;
+    the summary totals are always kept.
+    """
+    raw = json.dumps(result)
+    if not result.get('success') or function_name not in TABLE_BUILDERS:
+        return raw
+
+    data = result['data']
+    words = _words(question)
+    tables = TABLE_BUILDERS[function_name](data, words)
+    wanted = [name for name, keywords in SECTION_KEYWORDS[function_name].items() if _asks_for(words, keywords)]
+    if wanted:
+        tables = {name: table for name, table in tables.items() if name in wanted}
+
+    compact = {key: data[key] for key in ('user', 'summary', 'message', 'as_of', 'stale') if key in data}
+    compact.update({name: table for name, table in tables.items() if table['rows']})
+    omitted = {}
+
+    content = json.dumps(compact, separators=(',', ':'))
+    while count_tokens(content) > budget:
+        largest = max(tables, key=lambda name: len(tables[name]['rows']), default=None)
+        if largest is None or not tables[largest]['rows']:
+            break
+        tables[largest]['rows'].pop()
+        omitted[largest] = omitted.get(largest, 0) + 1
+        if not tables[largest]['rows']:
+            compact.pop(largest, None)
+        compact['omitted'] = omitted
+        content = json.dumps(compact, separators=(',', ':'))
+
+    raw_tokens, compact_tokens = count_tokens(raw), count_tokens(content)
+    metrics.increment('tool_result_tokens', raw_tokens, form='raw')
+    metrics.increment('tool_result_tokens', compact_tokens, form='compact')
+    return content
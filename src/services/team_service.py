@@ -0,0 +1,68 @@
+from concurrent.futures import as_completed
+from typing import Dict, Iterator
+import logging
+import os
+
+from .workers import get_pool
+
+logger = logging.getLogger(__name__)
+
+# Concurrent GitHub lookups for one team request; each lookup fans out further
+TEAM_GITHUB_CONCURRENCY = int(os.getenv('TEAM_GITHUB_CONCURRENCY', 4))
+TEAM_JIRA_BATCH_SIZE = int(os.getenv('TEAM_JIRA_BATCH_SIZE', 20))
+
+
+class TeamActivityService:
+    """Activity for every mapped user, yielded per user as results arrive"""
+
+    def __init__(self, jira, github, mapping):
+        self.jira = jira
+        self.github = github
+        self.mapping = mapping
+
+    def iter_activity(self) -> Iterator[Dict]:
+        """Yield one record per (user, service) as soon as it is ready"""
+        users = dict(self.mapping.users)
+        emails = {data['email']: key for key, data in users.items() if data.get('email')}
+        logins = {data['github']: key for key, data in users.items() if data.get('github')}
+
+        jira_pool = get_pool('team-jira', 2)
+        github_pool = get_pool('team-github', TEAM_GITHUB_CONCURRENCY)
+
+        futures = {}
+        email_list = list(emails)
+        for start in range(0, len(email_list), TEAM_JIRA_BATCH_SIZE):
+            batch = email_list[start:start + TEAM_JIRA_BATCH_SIZE]
+            futures[jira_pool.submit(self.jira.get_team_activity, batch, TEAM_JIRA_BATCH_SIZE)] = ('jira', batch)
+        # Backends that can fetch several users per round trip get them in batches
+        login_list = list(logins)
+        batch_size = max(self.github.BATCH_SIZE, 1)
+        for start in range(0, len(login_list), batch_size):
+            batch = login_list[start:start + batch_size]
+            futures[github_pool.submit(self.github.get_users_activity, batch)] = ('github', batch)
+
+        for future in as_completed(futures):
+            service, target = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                logger.error(f"Team {service} lookup failed: {str(e)}")
+                failed = {'success': False, 'error': str(e), 'error_type': 'api_error'}
+                outcome = {identifier: failed for identifier in target}
+
+            keys = emails if service == 'jira' else logins
+            for identifier, result in outcome.items():
+                yield self._record(users, keys[identifier], service, result)
+
+    def _record(self, users: Dict[str, Dict], key: str, service: str, result: Dict) -> Dict:
+        record = {
+            'user': key,
+            'name': users[key].get('name', key),
+            'service': service,
+            'success': result['success']
+        }
+        if result['success']:
+            record['data'] = result['data']
+        else:
+            record['error'] = result['error']
+        return record
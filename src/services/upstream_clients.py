@@ -0,0 +1,114 @@
+from typing import Any, Dict, Optional, Tuple
+import os
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts whose connections a session keeps pooled
+UPSTREAM_POOL_CONNECTIONS = int(os.getenv('UPSTREAM_POOL_CONNECTIONS', 10))
+# Connections kept alive per host; sized above the worker pools so concurrent calls never discard one
+UPSTREAM_POOL_MAXSIZE = int(os.getenv('UPSTREAM_POOL_MAXSIZE', 32))
+# Connections one async client may open at once; further requests wait for a free one
+UPSTREAM_ASYNC_MAX_CONNECTIONS = int(os.getenv('UPSTREAM_ASYNC_MAX_CONNECTIONS', 100))
+# Seconds an idle async connection is kept open
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv('UPSTREAM_KEEPALIVE_EXPIRY', 60))
+
+# (connect, read) seconds by upstream
+DEFAULT_TIMEOUTS = {
+    'jira': (3.05, 10),
+    'github': (3.05, 10),
+    'openai': (5, 60),
+}
+
+# Compressed responses and kept-alive connections for every upstream
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+_sessions: Dict[str, requests.Session] = {}
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+_lock = threading.Lock()
+
+
+def upstream_timeout(upstream: str) -> Tuple[float, float]:
+    """(connect, read) timeout for an upstream, from <UPSTREAM>_CONNECT_TIMEOUT / _READ_TIMEOUT"""
+    connect, read = DEFAULT_TIMEOUTS.get(upstream, (3.05, 10))
+    prefix = upstream.upper()
+    return (float(os.getenv(f'{prefix}_CONNECT_TIMEOUT', connect)),
+            float(os.getenv(f'{prefix}_READ_TIMEOUT', read)))
+
+
+def httpx_timeout(upstream: str) -> httpx.Timeout:
+    """An upstream's timeouts for httpx based clients"""
+    connect, read = upstream_timeout(upstream)
+    return httpx.Timeout(read, connect=connect)
+
+
+def get_session(upstream: str, headers: Optional[Dict[str, str]] = None,
+                auth: Optional[Tuple[str, str]] = None) -> requests.Session:
+    """Get the process-wide session for an upstream, creating it on first use
+
+    Every service instance talking to the upstream shares its connection
+    pool, so connections and TLS sessions are reused across blueprints,
+    tools and background workers. headers and auth apply when the session
+    is created.
+    """
+    with _lock:
+        session = _sessions.get(upstream)
+        if session is None:
+            session = requests.Session()
+            # Retries are handled by send_with_retry behind the circuit breaker
+            adapter = HTTPAdapter(pool_connections=UPSTREAM_POOL_CONNECTIONS,
+                                  pool_maxsize=UPSTREAM_POOL_MAXSIZE, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            session.headers.update(headers or {})
+            session.auth = auth
+            _sessions[upstream] = session
+        return session
+
+
+def get_async_client(upstream: str, headers: Optional[Dict[str, str]] = None,
+                     auth: Optional[Tuple[str, str]] = None) -> httpx.AsyncClient:
+    """Get the process-wide async client for an upstream, creating it on first use"""
+    with _lock:
+        client = _async_clients.get(upstream)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers={**DEFAULT_HEADERS, **(headers or {})},
+                auth=auth,
+                timeout=httpx_timeout(upstream),
+                limits=httpx.Limits(max_connections=UPSTREAM_ASYNC_MAX_CONNECTIONS,
+                                    max_keepalive_connections=UPSTREAM_POOL_MAXSIZE,
+                                    keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY)
+            )
+            _async_clients[upstream] = client
+        return client
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Connections opened and currently idle in each upstream session's pools"""
+    with _lock:
+        sessions = dict(_sessions)
+
+    stats = {}
+    for upstream, session in sessions.items():
+        manager = session.get_adapter('https://').poolmanager
+        opened = idle = 0
+        for key in manager.pools.keys():
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            # The pool's queue holds None placeholders for connections not yet opened
+            idle += sum(1 for conn in list(pool.pool.queue) if conn) if pool.pool else 0
+        stats[upstream] = {
+            'pool_maxsize': UPSTREAM_POOL_MAXSIZE,
+            'connections_opened': opened,
+            'idle_connections': idle
+        }
+    return stats
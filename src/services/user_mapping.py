@@ -1,17 +1,197 @@
 import os
+import re
 import json
-from typing import Dict, Optional, List
+import threading
+import time
+from typing import Dict, Optional, List, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Everyday words that are also first or last names; alone they never count as naming someone
+COMMON_WORDS = frozenset('''
+    a about after all also am an and any are as at be been before being but by can could day did do
+    does done for from get got had has have he her him his how i if in into is it its just last like
+    made make may me might min more most must my new next no not now of off on one open or our out
+    over page past see she should so some than that the their them then there these they this those
+    to today too up us very was way we week well were what when where which while who why will with
+    would year yet you your
+    art bill bob chase dawn dean drew faith frank grace hope iris ivy jack joy june king lane long
+    mark max may nick pat ray rich rob rose sky summer sue ted will young
+'''.split())
+# Lowercase name tokens shorter than this only count as a mention when capitalized
+MIN_NAME_TOKEN_LENGTH = 5
+
+
+def normalize_name(value: str) -> str:
+    """Lowercase and collapse whitespace for name comparisons"""
+    return ' '.join(value.lower().split())
+
+
+def name_tokens(value: str) -> List[str]:
+    """Split a name into lowercase word tokens"""
+    return re.findall(r"[a-z0-9]+", value.lower())
+
+
+class UserIndex:
+    """Lookup indexes over one snapshot of the user mapping"""
+    
+    def __init__(self, users: Dict[str, Dict]):
+        self.users = users
+        self.by_key: Dict[str, str] = {}
+        self.by_name: Dict[str, str] = {}
+        self.by_email: Dict[str, str] = {}
+        self.by_github: Dict[str, str] = {}
+        # Prefix of any name token -> keys, for partial names like "adam" or "adam lo"
+        self.by_prefix: Dict[str, Set[str]] = {}
+        # Whole name token -> keys, for spotting names in free text
+        self.by_token: Dict[str, Set[str]] = {}
+        # Tokens of full names with more than one token -> keys, and the most tokens in one
+        self.by_full_name: Dict[Tuple[str, ...], Set[str]] = {}
+        self.longest_name = 0
+        self.order: Dict[str, int] = {}
+        
+        for position, (key, data) in enumerate(users.items()):
+            self.order[key] = position
+            self.by_key.setdefault(key.lower(), key)
+            if data.get('name'):
+                if self.by_name.setdefault(normalize_name(data['name']), key) == key:
+                    tokens = tuple(name_tokens(data['name']))
+                    if len(tokens) > 1:
+                        self.by_full_name.setdefault(tokens, set()).add(key)
+                        self.longest_name = max(self.longest_name, len(tokens))
+                for token in name_tokens(data['name']):
+                    self.by_token.setdefault(token, set()).add(key)
+                    for end in range(1, len(token) + 1):
+                        self.by_prefix.setdefault(token[:end], set()).add(key)
+            if data.get('email'):
+                self.by_email.setdefault(data['email'].lower(), key)
+            if data.get('github'):
+                self.by_github.setdefault(data['github'].lower(), key)
+    
+    def find_key(self, identifier: str) -> Optional[str]:
+        """Find the mapping key for a key, name, email, GitHub login or partial name"""
+        identifier = identifier.lower().strip()
+        if not identifier:
+            return None
+        
+        for index in (self.by_key, self.by_email, self.by_github):
+            if identifier in index:
+                return index[identifier]
+        
+        name = normalize_name(identifier)
+        if name in self.by_name:
+            return self.by_name[name]
+        
+        # Every token of the identifier must prefix a token of the name
+        candidates = None
+        for token in name_tokens(identifier):
+            matches = self.by_prefix.get(token, set())
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return None
+        
+        if not candidates:
+            return None
+        # Prefer the user listed first, as the original linear scan did
+        return min(candidates, key=self.order.__getitem__)
+    
+    def find_mentions(self, text: str) -> Optional[List[str]]:
+        """Keys of the users a free-text question names, None if a name is ambiguous
+        
+        Matches full names, mapping keys, emails and GitHub logins. A lone
+        name token ("adam") only counts if it is not a common word and is
+        capitalized or at least MIN_NAME_TOKEN_LENGTH letters, so ordinary
+        words such as "will" or "page" are not mistaken for names.
+        """
+        # Runs of the question's words that spell a full name
+        words = name_tokens(text)
+        named: Set[str] = set()
+        covered: Set[str] = set()
+        for start in range(len(words)):
+            for end in range(start + 2, min(start + self.longest_name, len(words)) + 1):
+                keys = self.by_full_name.get(tuple(words[start:end]))
+                if keys:
+                    named |= keys
+                    covered.update(words[start:end])
+        found = sorted(named, key=self.order.__getitem__)
+        
+        for word in re.findall(r"[A-Za-z0-9@._-]+", text):
+            word = word.strip('.')
+            lowered = word.lower()
+            key = self.by_email.get(lowered)
+            if not key and lowered not in COMMON_WORDS:
+                key = self.by_key.get(lowered) or self.by_github.get(lowered)
+            keys = {key} if key else set()
+            if not keys:
+                for token in re.findall(r"[A-Za-z0-9]+", word):
+                    if not self._names_someone(token) or token.lower() in covered:
+                        continue
+                    if len(self.by_token[token.lower()]) > 1:
+                        return None
+                    keys |= self.by_token[token.lower()]
+            for key in sorted(keys, key=self.order.__getitem__):
+                if key not in found:
+                    found.append(key)
+        return found
+    
+    def _names_someone(self, token: str) -> bool:
+        """Whether a lone word of a question is a confident mention of a name token"""
+        lowered = token.lower()
+        if lowered not in self.by_token or lowered in COMMON_WORDS:
+            return False
+        return token[0].isupper() or len(lowered) >= MIN_NAME_TOKEN_LENGTH
+
+
 class UserMapping:
     """Simple user mapping for demo purposes"""
     
-    def __init__(self):
+    def __init__(self, reload_interval: float = None):
         self.mapping_file = os.getenv('USER_MAPPING_FILE', 'config/users.json')
-        self.users = self._load_users()
+        self.reload_interval = (reload_interval if reload_interval is not None
+                                else float(os.getenv('USER_MAPPING_RELOAD_INTERVAL', 5)))
+        users = self._load_users()
+        self._mtime = self._current_mtime()
+        self._index = UserIndex(users)
+    
+    def start(self):
+        """Reload the mapping file in a background thread whenever it changes, if a reload interval is set"""
+        if self.reload_interval > 0:
+            threading.Thread(target=self._watch, name='user-mapping-reload', daemon=True).start()
+    
+    @property
+    def users(self) -> Dict[str, Dict]:
+        return self._index.users
+    
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.mapping_file)
+        except OSError:
+            return None
+    
+    def _watch(self):
+        """Reload the mapping whenever the file's mtime changes"""
+        while True:
+            time.sleep(self.reload_interval)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Error reloading user mapping: {e}")
+    
+    def reload_if_changed(self) -> bool:
+        """Rebuild the indexes if the mapping file changed, swapping them in atomically"""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        
+        with open(self.mapping_file, 'r') as f:
+            users = json.load(f)
+        # Readers keep using the old snapshot until this single reference swap
+        self._index = UserIndex(users)
+        self._mtime = mtime
+        logger.info(f"Reloaded user mapping with {len(users)} users")
+        return True
     
     def _load_users(self) -> Dict[str, Dict]:
         """Load user mapping from file"""
@@ -53,22 +233,15 @@ class UserMapping:
         except Exception as e:
             logger.error(f"Error saving user mapping: {e}")
     
+    def find_mentions(self, text: str) -> Optional[List[str]]:
+        """Keys of the users named in free text, None if a name is ambiguous"""
+        return self._index.find_mentions(text)
+    
     def find_user(self, identifier: str) -> Optional[Dict]:
-        """Find user by name, email, or key"""
-        identifier = identifier.lower().strip()
-        
-        # Direct key match
-        if identifier in self.users:
-            return self.users[identifier]
-        
-        # Search by name or email
-        for user_data in self.users.values():
-            if (identifier == user_data.get('name', '').lower() or
-                identifier == user_data.get('email', '').lower() or
-                identifier in user_data.get('name', '').lower()):
-                return user_data
-        
-        return None
+        """Find user by name, email, GitHub login, or key"""
+        index = self._index
+        key = index.find_key(identifier)
+        return index.users[key] if key else None
     
     def get_jira_identifier(self, identifier: str) -> Optional[str]:
         """Get JIRA identifier (email) for a user"""
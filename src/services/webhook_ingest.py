@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional
+from urllib.parse import quote_plus
+import hashlib
+import hmac
+import logging
+import os
+import queue
+import threading
+
+from . import github_service, jira_service
+from .activity_cache import activity_cache
+from .identity_store import identity_store
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000))
+
+GITHUB_EVENTS = ('push', 'pull_request')
+JIRA_EVENTS = ('jira:issue_created', 'jira:issue_updated')
+
+
+def verify_signature(secret: Optional[str], body: bytes, signature: Optional[str]) -> bool:
+    """Check an 'sha256=<hex>' HMAC signature header against the raw request body"""
+    if not secret or not signature or not signature.startswith('sha256='):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature[len('sha256='):])
+
+
+class WebhookIngestor:
+    """Queue of webhook events applied to cached activity by a worker thread
+
+    Flask request threads only enqueue, so bursts of events never wait
+    on the store or the caches. Pushes and pull requests are mapped into
+    the records _get_recent_commits / _get_user_pull_requests produce,
+    and issue events into _get_assigned_issues records. Each event
+    updates the activity store (when enabled) and drops the affected
+    user's cached upstream responses and assembled activity.
+    """
+
+    def __init__(self, jira, mapping, activity_sync=None):
+        self.jira = jira
+        self.mapping = mapping
+        self.activity = activity_sync
+        self.queue: queue.Queue = queue.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name='webhook-ingest', daemon=True)
+        thread.start()
+        return thread
+
+    def submit(self, source: str, event: str, payload: Dict) -> bool:
+        """Enqueue an event without blocking, False if the queue is full"""
+        try:
+            self.queue.put_nowait((source, event, payload))
+        except queue.Full:
+            metrics.increment('webhook_events_dropped', source=source)
+            return False
+        metrics.increment('webhook_events_received', source=source, event=event)
+        return True
+
+    def _run(self):
+        while True:
+            source, event, payload = self.queue.get()
+            try:
+                if source == 'github':
+                    self.handle_github(event, payload)
+                else:
+                    self.handle_jira(event, payload)
+            except Exception as e:
+                logger.error(f"Failed to ingest {source} {event} webhook: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def _mapped_login(self, login: str) -> Optional[str]:
+        user = self.mapping.find_user(login)
+        return user.get('github') if user else None
+
+    def handle_github(self, event: str, payload: Dict):
+        """Apply a push or pull_request event to the author's cached activity"""
+        if event == 'push':
+            sender = payload.get('sender') or {}
+            login = self._mapped_login(sender.get('login', ''))
+            if not login:
+                return
+            repo_name = payload['repository']['full_name']
+            commits = [github_service.commit_record(commit['id'], commit['message'], repo_name, commit['timestamp'])
+                       for commit in payload.get('commits', [])]
+            if self.activity and commits:
+                self.activity.store.upsert('github', login, 'commits', commits, ('repository', 'sha'), 'date')
+            github_service.response_cache.invalidate(f'/users/{login}/events')
+            if sender.get('id'):
+                # Later pages, reached through Link headers that address the user by ID
+                github_service.response_cache.invalidate(f'/user/{sender["id"]}/events')
+            activity_cache.invalidate('github', login)
+
+        elif event == 'pull_request':
+            pr = payload['pull_request']
+            login = self._mapped_login(pr['user']['login'])
+            if not login:
+                return
+            record = {
+                'number': pr['number'],
+                'title': pr['title'][:100],
+                'state': pr['state'],
+                'repository': payload['repository']['name'],
+                'created_at': pr['created_at'],
+                'updated_at': pr['updated_at'],
+                'url': pr['html_url']
+            }
+            if self.activity:
+                self.activity.store.upsert('github', login, 'prs', [record], 'url', 'updated_at')
+            github_service.response_cache.invalidate(quote_plus(f'author:{login}'))
+            activity_cache.invalidate('github', login)
+
+    def _mapped_emails(self, account_id: str, email: Optional[str]) -> List[str]:
+        """Mapped emails for a JIRA assignee, resolving account IDs through the identity cache"""
+        if email and self.mapping.find_user(email):
+            return [self.mapping.find_user(email)['email']]
+        emails = []
+        for user in self.mapping.users.values():
+            resolved = identity_store.get('jira', user.get('email', ''))
+            if isinstance(resolved, dict) and resolved.get('account_id') == account_id:
+                emails.append(user['email'])
+        return emails
+
+    def handle_jira(self, event: str, payload: Dict):
+        """Apply an issue created/updated event to the assignee's cached activity"""
+        issue = payload['issue']
+        assignees = []
+        current = issue['fields'].get('assignee')
+        if current:
+            assignees.append((current['accountId'], current.get('emailAddress')))
+        # A reassigned issue also changes the previous assignee's activity
+        for item in (payload.get('changelog') or {}).get('items', []):
+            if item.get('field') == 'assignee' and item.get('from'):
+                assignees.append((item['from'], None))
+
+        record = self.jira._parse_issue(issue)
+        for account_id, email in assignees:
+            jira_service.response_cache.invalidate(quote_plus(account_id))
+            for mapped_email in self._mapped_emails(account_id, email):
+                activity_cache.invalidate('jira', mapped_email)
+                if not self.activity:
+                    continue
+                if current and account_id == current['accountId']:
+                    self.activity.store.upsert('jira', mapped_email, 'issues', [record], 'key', 'updated')
+                else:
+                    self.activity.store.delete('jira', mapped_email, 'issues', record['key'])
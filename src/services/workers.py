@@ -0,0 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import threading
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Get a named worker pool shared across requests, creating it on first use"""
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            _pools[name] = pool
+        return pool